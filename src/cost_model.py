@@ -0,0 +1,262 @@
+"""
+Render cost model.
+
+Predicts how long each VideoEngine stage will take from cheap project
+features (no media decoding) and learns from the timings of finished jobs.
+Each stage is an online ridge regression over a handful of features,
+regularised towards hand-tuned priors so predictions are sensible before any
+job has finished. Sufficient statistics are persisted in a small JSON file
+shared by every API and worker process on the host.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config_loader import ROOT_DIR, settings
+from .schemas import JobStatus, VideoProject
+
+logger = logging.getLogger(__name__)
+
+# Named output sizes accepted in VideoProject.resolution
+RESOLUTIONS = {
+    "sd": (854, 480), "480p": (854, 480),
+    "hd": (1280, 720), "720p": (1280, 720),
+    "full-hd": (1920, 1080), "1080p": (1920, 1080), "youtube-video": (1920, 1080),
+    "4k": (3840, 2160),
+    "tiktok": (1080, 1920), "youtube-short": (1080, 1920), "instagram-story": (1080, 1920),
+    "instagram-post": (1080, 1080), "squared": (1080, 1080),
+}
+
+# Speaking rate used to guess narration length before TTS runs
+WORDS_PER_SECOND = 2.5
+
+# Per-stage regressors and their prior coefficients (seconds)
+STAGE_FEATURES = {
+    "tts": ["bias", "script_kchars"],
+    "images": ["bias", "image_count", "image_mbytes"],
+    "sync": ["bias", "script_kchars"],
+    "encode": ["bias", "output_mpixel_seconds", "visual_count", "audio_tracks"],
+}
+PRIORS = {
+    "tts": [1.0, 4.0],
+    "images": [0.05, 0.25, 0.1],
+    "sync": [0.01, 0.01],
+    "encode": [1.0, 0.05, 0.2, 0.5],
+}
+STAGES = list(STAGE_FEATURES)
+
+
+def resolve_resolution(project: VideoProject) -> tuple:
+    if project.width and project.height:
+        return project.width, project.height
+    name = (project.resolution or "hd").lower()
+    match = re.fullmatch(r"(\d+)x(\d+)", name)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return RESOLUTIONS.get(name, RESOLUTIONS["hd"])
+
+
+def extract_features(project: VideoProject) -> Dict[str, float]:
+    """Features the model is fitted on; all cheap to compute in the API process."""
+    width, height = resolve_resolution(project)
+    # Renditions are encoded alongside the main output, so they add encoded pixels
+    mpixels = (width * height + sum(w * h for w, h in (r.size(width, height) for r in project.renditions))) / 1e6
+    script = " ".join(voice.text for voice in project.voices)
+    # Voices are placed at their own offsets, so narration ends with the latest one
+    narration_seconds = max(
+        ((voice.videoBegin or 0.0) + len(voice.text.split()) / WORDS_PER_SECOND for voice in project.voices),
+        default=0.0
+    )
+    output_seconds = max(project.duration, narration_seconds)
+
+    image_count = 0
+    image_bytes = 0
+    for visual in project.visuals:
+        if not visual.src:
+            continue
+        image_count += 1
+        path = Path(visual.src)
+        if not path.is_absolute():
+            path = ROOT_DIR / visual.src
+        try:
+            image_bytes += path.stat().st_size
+        except OSError:
+            pass  # remote or missing source; counted but not sized
+
+    return {
+        "bias": 1.0,
+        "duration": float(project.duration),
+        "output_seconds": output_seconds,
+        "output_mpixel_seconds": output_seconds * mpixels,
+        "script_kchars": len(script) / 1000,
+        "image_count": float(image_count),
+        "image_mbytes": image_bytes / 1e6,
+        "visual_count": float(len(project.visuals)),
+        "audio_tracks": float(len(project.audios)),
+    }
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Solve a small dense linear system by Gaussian elimination with partial pivoting."""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        if abs(a[col][col]) < 1e-12:
+            continue
+        for r in range(n):
+            if r != col:
+                factor = a[r][col] / a[col][col]
+                a[r] = [x - factor * y for x, y in zip(a[r], a[col])]
+    return [a[i][n] / a[i][i] if abs(a[i][i]) > 1e-12 else 0.0 for i in range(n)]
+
+
+class CostModel:
+    """
+    Per-stage ridge regression y = w.x fitted online.
+
+    For each stage we keep A = XtX + lambda*I and b = Xty + lambda*prior, so
+    w = A^-1 b equals the prior with no data and converges to the least
+    squares fit as samples accumulate. Older samples are down-weighted by
+    `decay` so the model follows hardware or code changes.
+    """
+
+    def __init__(self, path: Path, regularization: float = 5.0, decay: float = 0.995, refresh_interval: float = 5.0):
+        self.path = Path(path)
+        self.regularization = regularization
+        self.decay = decay
+        # estimate() looks for updates from other processes at most this often (seconds)
+        self.refresh_interval = refresh_interval
+        self._state: Dict[str, dict] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._coefficients: Dict[str, List[float]] = {}
+
+    def _initial_state(self) -> Dict[str, dict]:
+        state = {}
+        for stage, names in STAGE_FEATURES.items():
+            n = len(names)
+            lam = self.regularization
+            state[stage] = {
+                "A": [[lam if i == j else 0.0 for j in range(n)] for i in range(n)],
+                "b": [lam * p for p in PRIORS[stage]],
+                "samples": 0,
+            }
+        return state
+
+    def _refresh(self, force: bool = False):
+        """Reload the shared state when another process has updated it."""
+        now = time.monotonic()
+        if not force and self._state and self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            if not self._state:
+                self._set_state(self._initial_state())
+            return
+        if mtime != self._loaded_mtime:
+            try:
+                self._set_state(json.loads(self.path.read_text()))
+                self._loaded_mtime = mtime
+            except (ValueError, OSError) as e:
+                logger.warning(f"Ignoring unreadable cost model {self.path}: {e}")
+                self._set_state(self._initial_state())
+
+    def _set_state(self, state: Dict[str, dict]):
+        # Stages added after the file was written start from their prior
+        fresh = self._initial_state()
+        for stage in STAGES:
+            if stage not in state or len(state[stage]["b"]) != len(STAGE_FEATURES[stage]):
+                state[stage] = fresh[stage]
+        self._state = state
+        self._coefficients = {stage: _solve(s["A"], s["b"]) for stage, s in state.items() if stage in STAGE_FEATURES}
+
+    def estimate(self, features: Dict[str, float]) -> Dict[str, float]:
+        """Predicted seconds per stage."""
+        self._refresh()
+        result = {}
+        for stage, names in STAGE_FEATURES.items():
+            x = [features.get(name, 0.0) for name in names]
+            seconds = sum(w * v for w, v in zip(self._coefficients[stage], x))
+            result[stage] = round(max(seconds, 0.01), 3)
+        return result
+
+    def record(self, features: Dict[str, float], timings: Dict[str, float]):
+        """Fold one finished job's stage timings into the shared model."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = self.path.with_suffix(".lock")
+        with open(lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._loaded_mtime = None
+            self._refresh(force=True)
+            for stage, names in STAGE_FEATURES.items():
+                if stage not in timings:
+                    continue
+                x = [features.get(name, 0.0) for name in names]
+                y = timings[stage]
+                s = self._state[stage]
+                n = len(names)
+                lam = self.regularization
+                prior = PRIORS[stage]
+                # Decay the data part only, keeping the prior's weight constant
+                s["A"] = [
+                    [(s["A"][i][j] - (lam if i == j else 0.0)) * self.decay + x[i] * x[j] + (lam if i == j else 0.0)
+                     for j in range(n)]
+                    for i in range(n)
+                ]
+                s["b"] = [(s["b"][i] - lam * prior[i]) * self.decay + x[i] * y + lam * prior[i] for i in range(n)]
+                s["samples"] += 1
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self._state))
+            os.replace(tmp_path, self.path)
+            self._set_state(self._state)
+
+
+def create_cost_model() -> CostModel:
+    path = Path(settings.get("scheduler", "cost_model_path", fallback="data/cost_model.json"))
+    if not path.is_absolute():
+        path = ROOT_DIR / path
+    return CostModel(
+        path,
+        regularization=settings.getfloat("scheduler", "cost_model_regularization", fallback=5.0),
+        decay=settings.getfloat("scheduler", "cost_model_decay", fallback=0.995),
+        refresh_interval=settings.getfloat("scheduler", "cost_model_refresh", fallback=5.0)
+    )
+
+
+cost_model = create_cost_model()
+
+
+def eta_seconds(job: dict, now: Optional[float] = None) -> Optional[float]:
+    """
+    Estimated seconds until a job finishes, or None if it has no estimate.
+
+    Running jobs count down the per-stage estimate stored at submission from
+    the stage the pipeline last reported; queued jobs use the completion time
+    predicted at submission, which includes the backlog ahead of them.
+    """
+    estimate = job.get("estimate")
+    if not estimate:
+        return None
+    if job["status"] not in (JobStatus.QUEUED, JobStatus.PROCESSING):
+        return 0.0
+    now = now or time.time()
+    total = sum(estimate.values())
+    stage = job.get("stage")
+    if job["status"] == JobStatus.QUEUED or stage not in STAGES:
+        return round(max(job.get("eta_at", 0.0) - now, total), 1)
+
+    index = STAGES.index(stage)
+    in_stage = now - job.get("stage_started_at", now)
+    current_left = max(estimate.get(stage, 0.0) - in_stage, 0.0)
+    later = sum(estimate.get(s, 0.0) for s in STAGES[index + 1:])
+    return round(current_left + later, 1)
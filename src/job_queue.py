@@ -0,0 +1,349 @@
+"""
+Durable local render queue backed by SQLite.
+
+The API enqueues validated projects; render workers (python -m src.worker)
+claim them with a time-limited lease and keep extending it with heartbeats
+while they render. If a worker dies, its lease expires and another worker
+picks the job up again, up to max_attempts.
+
+Claim order, in this order of precedence:
+1. Starvation guard: an item waiting longer than [scheduler] max_wait seconds
+   goes first (oldest first), whatever its lane or client.
+2. Priority lane: interactive before standard before bulk.
+3. Fair share between clients: the client with the least recent render time
+   (cost of claimed items, decaying with a half-life of fair_share_half_life
+   seconds) divided by its [client_weights] weight. A client submitting a
+   500-job batch then takes turns with everyone else instead of going first.
+4. Within one client, [scheduler] policy:
+   - fifo: oldest first (default).
+   - sjf: shortest estimated job first, using the cost model's estimate given
+     at enqueue time. Waiting time is credited at `aging` seconds of cost per
+     second queued, so long renders are not starved by a stream of short ones.
+"""
+
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config_loader import ROOT_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueueError(Exception):
+    """Raised when the render queue cannot be used."""
+    pass
+
+
+# Priority lanes, claimed in this order
+PRIORITIES = ("interactive", "standard", "bulk")
+
+# Items a worker may claim: never leased, or leased by a worker that stopped heartbeating
+RUNNABLE = "(state = 'pending' OR (state = 'leased' AND lease_expires < ? AND attempts < ?))"
+
+
+@dataclass
+class QueueItem:
+    job_id: str
+    payload: str
+    attempts: int
+
+
+class JobQueue:
+    """
+    Lease-based job queue in a WAL-mode SQLite file.
+
+    States: pending -> leased -> done | failed, and cancelled from either of the
+    first two. A leased item whose lease has expired counts as pending again.
+    """
+
+    POLICIES = ("fifo", "sjf")
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_attempts: int = 3,
+        policy: str = "fifo",
+        aging: float = 0.1,
+        max_wait: float = 0.0,
+        weights: Optional[Dict[str, float]] = None,
+        half_life: float = 3600.0
+    ):
+        if policy not in self.POLICIES:
+            raise QueueError(f"Unknown scheduling policy '{policy}' (expected 'fifo' or 'sjf')")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.policy = policy
+        self.aging = aging
+        self.max_wait = max_wait
+        self.weights = weights or {}
+        self.half_life = half_life
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queue (
+                job_id        TEXT PRIMARY KEY,
+                payload       TEXT NOT NULL,
+                state         TEXT NOT NULL DEFAULT 'pending',
+                enqueued_at   REAL NOT NULL,
+                worker_id     TEXT,
+                lease_expires REAL,
+                attempts      INTEGER NOT NULL DEFAULT 0,
+                error         TEXT,
+                cost          REAL NOT NULL DEFAULT 0,
+                client        TEXT NOT NULL DEFAULT '',
+                priority      INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE INDEX IF NOT EXISTS idx_queue_pending ON queue(state, enqueued_at);
+            CREATE INDEX IF NOT EXISTS idx_queue_leases ON queue(state, lease_expires);
+            CREATE TABLE IF NOT EXISTS client_usage (
+                client     TEXT PRIMARY KEY,
+                usage      REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        # Queue files created before these columns existed
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(queue)")}
+        for column, definition in (
+            ("cost", "REAL NOT NULL DEFAULT 0"),
+            ("client", "TEXT NOT NULL DEFAULT ''"),
+            ("priority", "INTEGER NOT NULL DEFAULT 1"),
+        ):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE queue ADD COLUMN {column} {definition}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, job_id: str, payload: str, cost: float = 0.0, client: str = "", priority: str = "standard"):
+        """
+        Add a job; `cost` is its estimated render time in seconds (used by sjf
+        and fair sharing), `client` who submitted it and `priority` its lane.
+        """
+        if priority not in PRIORITIES:
+            raise QueueError(f"Unknown priority '{priority}' (expected one of {', '.join(PRIORITIES)})")
+        self._conn().execute(
+            "INSERT INTO queue (job_id, payload, enqueued_at, cost, client, priority) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, payload, time.time(), cost, client, PRIORITIES.index(priority))
+        )
+
+    def weight(self, client: str) -> float:
+        # configparser lower-cases option names
+        return max(self.weights.get(client.lower(), 1.0), 1e-6)
+
+    def _runnable(self, conn: sqlite3.Connection, now: float) -> List[sqlite3.Row]:
+        return conn.execute(
+            f"SELECT job_id, attempts, enqueued_at, cost, client, priority FROM queue WHERE {RUNNABLE}",
+            (now, self.max_attempts)
+        ).fetchall()
+
+    def _usage(self, conn: sqlite3.Connection, clients: Iterable[str], now: float) -> Dict[str, float]:
+        """Recent render seconds per client, decayed to `now`."""
+        usage = {}
+        for row in conn.execute("SELECT client, usage, updated_at FROM client_usage"):
+            if row["client"] in clients:
+                usage[row["client"]] = row["usage"] * 0.5 ** ((now - row["updated_at"]) / self.half_life)
+        return usage
+
+    def _order_key(self, row: sqlite3.Row, now: float) -> tuple:
+        """Policy order of one client's items."""
+        if self.policy == "sjf":
+            return (row["cost"] - (now - row["enqueued_at"]) * self.aging, row["enqueued_at"])
+        return (row["enqueued_at"],)
+
+    def _share_key(self, client: str, head: sqlite3.Row, usage: Dict[str, float]) -> tuple:
+        # Least served relative to its weight; ties go to the client whose next item waited longest
+        return (usage.get(client, 0.0) / self.weight(client), head["enqueued_at"])
+
+    def _starving(self, rows: List[sqlite3.Row], now: float) -> List[sqlite3.Row]:
+        if not self.max_wait:
+            return []
+        return sorted((row for row in rows if now - row["enqueued_at"] > self.max_wait), key=lambda row: row["enqueued_at"])
+
+    def _pick(self, rows: List[sqlite3.Row], usage: Dict[str, float], now: float) -> sqlite3.Row:
+        """The item to claim next among runnable `rows` (see the module docstring)."""
+        starving = self._starving(rows, now)
+        if starving:
+            return starving[0]
+        lane = min(row["priority"] for row in rows)
+        heads: Dict[str, sqlite3.Row] = {}
+        for row in rows:
+            if row["priority"] != lane:
+                continue
+            head = heads.get(row["client"])
+            if head is None or self._order_key(row, now) < self._order_key(head, now):
+                heads[row["client"]] = row
+        client = min(heads, key=lambda c: self._share_key(c, heads[c], usage))
+        return heads[client]
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[QueueItem]:
+        """Lease the next runnable item by lane, fair share and policy, or return None if the queue is empty."""
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can't claim the same row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._runnable(conn, now)
+            if not rows:
+                conn.execute("COMMIT")
+                return None
+            usage = self._usage(conn, {row["client"] for row in rows}, now)
+            row = self._pick(rows, usage, now)
+            conn.execute(
+                "UPDATE queue SET state = 'leased', worker_id = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE job_id = ?",
+                (worker_id, now + lease_seconds, row["job_id"])
+            )
+            # Unknown estimates still count, so cost-less jobs are shared fairly too
+            conn.execute(
+                "INSERT INTO client_usage (client, usage, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(client) DO UPDATE SET usage = ?, updated_at = excluded.updated_at",
+                (row["client"], max(row["cost"], 1.0), now, usage.get(row["client"], 0.0) + max(row["cost"], 1.0))
+            )
+            payload = conn.execute("SELECT payload FROM queue WHERE job_id = ?", (row["job_id"],)).fetchone()["payload"]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return QueueItem(job_id=row["job_id"], payload=payload, attempts=row["attempts"] + 1)
+
+    def positions(self, job_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        1-based place in line of each waiting job in `job_ids`, simulating the
+        claims ahead of it with the current usage (not-yet-waiting jobs are left out).
+        """
+        wanted = set(job_ids)
+        conn = self._conn()
+        now = time.time()
+        rows = self._runnable(conn, now)
+        usage = self._usage(conn, {row["client"] for row in rows}, now)
+
+        # The same order repeated _pick calls would give, in O(n log n):
+        # starving items first, then lane by lane a heap of client queues
+        def claimed():
+            starving = self._starving(rows, now)
+            yield from starving
+            skip = {row["job_id"] for row in starving}
+            for lane in sorted({row["priority"] for row in rows}):
+                queues: Dict[str, List[sqlite3.Row]] = {}
+                for row in rows:
+                    if row["priority"] == lane and row["job_id"] not in skip:
+                        queues.setdefault(row["client"], []).append(row)
+                for queue in queues.values():
+                    queue.sort(key=lambda row: self._order_key(row, now), reverse=True)
+                heap = [(self._share_key(c, queue[-1], usage), c) for c, queue in queues.items()]
+                heapq.heapify(heap)
+                while heap:
+                    _, client = heapq.heappop(heap)
+                    row = queues[client].pop()
+                    yield row
+                    if queues[client]:
+                        heapq.heappush(heap, (self._share_key(client, queues[client][-1], usage), client))
+
+        positions = {}
+        for place, row in enumerate(claimed(), start=1):
+            usage[row["client"]] = usage.get(row["client"], 0.0) + max(row["cost"], 1.0)
+            if row["job_id"] in wanted:
+                positions[row["job_id"]] = place
+                if len(positions) == len(wanted):
+                    break
+        return positions
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend the lease; False means the lease was lost to another worker."""
+        cursor = self._conn().execute(
+            "UPDATE queue SET lease_expires = ? WHERE job_id = ? AND worker_id = ? AND state = 'leased'",
+            (time.time() + lease_seconds, job_id, worker_id)
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, worker_id: str):
+        self._conn().execute(
+            "UPDATE queue SET state = 'done', lease_expires = NULL WHERE job_id = ? AND worker_id = ?",
+            (job_id, worker_id)
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str):
+        self._conn().execute(
+            "UPDATE queue SET state = 'failed', lease_expires = NULL, error = ? WHERE job_id = ? AND worker_id = ?",
+            (error, job_id, worker_id)
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Withdraw a pending or leased item so no worker claims it (again); False if it already finished."""
+        cursor = self._conn().execute(
+            "UPDATE queue SET state = 'cancelled', lease_expires = NULL WHERE job_id = ? AND state IN ('pending', 'leased')",
+            (job_id,)
+        )
+        return cursor.rowcount > 0
+
+    def expire_exhausted(self) -> list:
+        """Fail expired leases that already used every attempt; returns their job ids."""
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT job_id FROM queue WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (time.time(), self.max_attempts)
+        ).fetchall()
+        for row in rows:
+            conn.execute(
+                "UPDATE queue SET state = 'failed', error = 'worker lease expired too many times' WHERE job_id = ?",
+                (row["job_id"],)
+            )
+        return [row["job_id"] for row in rows]
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished items enqueued before `older_than` (epoch seconds); returns how many."""
+        cursor = self._conn().execute(
+            "DELETE FROM queue WHERE state IN ('done', 'failed', 'cancelled') AND enqueued_at < ?",
+            (older_than,)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._conn().execute("SELECT state, COUNT(*) AS n FROM queue GROUP BY state").fetchall()
+        return {row["state"]: row["n"] for row in rows}
+
+
+def get_render_mode() -> str:
+    """'inline' renders inside the API process; 'queue' hands jobs to render workers."""
+    mode = os.getenv("RENDER_MODE") or settings.get("render", "mode", fallback="inline")
+    if mode not in ("inline", "queue"):
+        raise QueueError(f"Unknown render mode '{mode}' (expected 'inline' or 'queue')")
+    return mode
+
+
+def create_job_queue() -> JobQueue:
+    db_path = Path(settings.get("queue", "db_path", fallback="data/queue.db"))
+    if not db_path.is_absolute():
+        db_path = ROOT_DIR / db_path
+    weights = {}
+    if settings.has_section("client_weights"):
+        # items() also yields the [DEFAULT] keys; they are not clients
+        weights = {
+            client: float(weight) for client, weight in settings.items("client_weights")
+            if client not in settings.defaults()
+        }
+    return JobQueue(
+        db_path,
+        max_attempts=settings.getint("queue", "max_attempts", fallback=3),
+        policy=settings.get("scheduler", "policy", fallback="fifo"),
+        aging=settings.getfloat("scheduler", "aging", fallback=0.1),
+        max_wait=settings.getfloat("scheduler", "max_wait", fallback=900.0),
+        weights=weights,
+        half_life=settings.getfloat("scheduler", "fair_share_half_life", fallback=3600.0)
+    )
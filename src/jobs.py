@@ -0,0 +1,301 @@
+"""
+Job bookkeeping for the API.
+
+JobManager keeps job records in a pluggable store:
+- InMemoryJobStore: a plain dict, for a single API process (default).
+- SQLiteJobStore: a WAL-mode SQLite file shared by every uvicorn worker and
+  API replica on the host, so /status and /download work whichever process
+  answers the poll.
+
+Select the store with [jobs] store = memory | sqlite (or JOB_STORE).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from .schemas import JobStatus
+from .config_loader import ROOT_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryJobStore:
+    """Job records in a process-local dict."""
+
+    def __init__(self):
+        self.jobs: Dict[str, dict] = {}
+
+    def create(self, job: dict):
+        self.jobs[job["job_id"]] = {**job, "updated_at": time.time()}
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> bool:
+        if job_id not in self.jobs:
+            return False
+        self.jobs[job_id].update(fields, updated_at=time.time())
+        return True
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.jobs.get(job_id)
+
+    def get_many(self, job_ids: List[str]) -> Dict[str, dict]:
+        return {job_id: self.jobs[job_id] for job_id in job_ids if job_id in self.jobs}
+
+    def list(self, status: Optional[JobStatus] = None, limit: Optional[int] = None) -> List[dict]:
+        # Copy first: the retention sweep lists jobs from another thread
+        jobs = [j for j in list(self.jobs.values()) if status is None or j["status"] == status]
+        jobs.sort(key=lambda j: j["created_at"])
+        return jobs[:limit] if limit else jobs
+
+    def delete(self, job_ids: List[str]):
+        for job_id in job_ids:
+            self.jobs.pop(job_id, None)
+
+
+class SQLiteJobStore:
+    """
+    Job records in a SQLite database in WAL mode.
+
+    Readers never block the writer under WAL, and every update is a single
+    autocommit UPDATE by primary key, so frequent progress ticks stay cheap.
+    Fields without a dedicated column are kept in a JSON `extra` column.
+    """
+
+    COLUMNS = ("job_id", "name", "status", "progress", "created_at", "output_file", "error")
+    # Maintained by the store itself, never written from update() fields
+    RESERVED = ("updated_at",)
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id      TEXT PRIMARY KEY,
+                name        TEXT NOT NULL,
+                status      TEXT NOT NULL,
+                progress    INTEGER NOT NULL DEFAULT 0,
+                created_at  TEXT NOT NULL,
+                updated_at  REAL NOT NULL,
+                output_file TEXT,
+                error       TEXT,
+                extra       TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        if isinstance(value, JobStatus):
+            return value.value
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def _row_to_job(self, row: sqlite3.Row) -> dict:
+        job = {key: row[key] for key in self.COLUMNS}
+        job["updated_at"] = row["updated_at"]
+        job["status"] = JobStatus(job["status"])
+        job["created_at"] = datetime.fromisoformat(job["created_at"])
+        job.update(json.loads(row["extra"]))
+        return job
+
+    def create(self, job: dict):
+        extra = {k: self._encode(v) for k, v in job.items()
+                 if k not in self.COLUMNS and k not in self.RESERVED}
+        self._conn().execute(
+            "INSERT INTO jobs (job_id, name, status, progress, created_at, updated_at, output_file, error, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job["job_id"], job["name"], self._encode(job["status"]), job.get("progress", 0),
+                self._encode(job["created_at"]), time.time(), job.get("output_file"), job.get("error"),
+                json.dumps(extra)
+            )
+        )
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> bool:
+        columns = {k: self._encode(v) for k, v in fields.items() if k in self.COLUMNS and k != "job_id"}
+        extra = {k: self._encode(v) for k, v in fields.items()
+                 if k not in self.COLUMNS and k not in self.RESERVED}
+
+        assignments = [f"{k} = ?" for k in columns] + ["updated_at = ?"]
+        params: List[Any] = list(columns.values()) + [time.time()]
+        if extra:
+            assignments.append("extra = json_patch(extra, ?)")
+            params.append(json.dumps(extra))
+        params.append(job_id)
+
+        cursor = self._conn().execute(
+            f"UPDATE jobs SET {', '.join(assignments)} WHERE job_id = ?", params
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_many(self, job_ids: List[str]) -> Dict[str, dict]:
+        jobs = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i:i + 500]
+            rows = self._conn().execute(
+                f"SELECT * FROM jobs WHERE job_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            jobs.update((row["job_id"], self._row_to_job(row)) for row in rows)
+        return jobs
+
+    def list(self, status: Optional[JobStatus] = None, limit: Optional[int] = None) -> List[dict]:
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(self._encode(status))
+        query += " ORDER BY created_at"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._row_to_job(row) for row in self._conn().execute(query, params)]
+
+    def delete(self, job_ids: List[str]):
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i:i + 500]
+            self._conn().execute(f"DELETE FROM jobs WHERE job_id IN ({', '.join('?' * len(chunk))})", chunk)
+
+
+def create_job_store():
+    """Build the configured store: [jobs] store = memory (default) | sqlite."""
+    kind = os.getenv("JOB_STORE") or settings.get("jobs", "store", fallback="memory")
+    if kind == "sqlite":
+        db_path = Path(settings.get("jobs", "db_path", fallback="data/jobs.db"))
+        if not db_path.is_absolute():
+            db_path = ROOT_DIR / db_path
+        logger.info(f"Using SQLite job store at {db_path}")
+        return SQLiteJobStore(db_path)
+    if kind != "memory":
+        raise ValueError(f"Unknown job store '{kind}' (expected 'memory' or 'sqlite')")
+    return InMemoryJobStore()
+
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.TIMED_OUT}
+
+
+class JobManager:
+    def __init__(self, store=None):
+        self.store = store if store is not None else create_job_store()
+        # Last progress written per job, so repeated ticks with the same value skip the store
+        self._last_progress: Dict[str, int] = {}
+        # Futures of requests waiting for a job to change (long-poll / SSE)
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        # Updates made by other processes (render workers, other API workers)
+        # are only visible by re-reading a shared store
+        self.shared_poll_interval = settings.getfloat("status", "shared_poll_interval", fallback=0.5)
+
+    def create_job(self, project_name: str, **fields) -> str:
+        """Register a queued job; extra fields (e.g. the render estimate) are stored with it."""
+        job_id = str(uuid.uuid4())
+        self.store.create({
+            **fields,
+            "job_id": job_id,
+            "name": project_name,
+            "status": JobStatus.QUEUED,
+            "progress": 0,
+            "created_at": datetime.now(),
+            "output_file": None,
+            "error": None
+        })
+        return job_id
+
+    def update_job(self, job_id: str, **kwargs):
+        if set(kwargs) == {"progress"} and self._last_progress.get(job_id) == kwargs["progress"]:
+            return
+        if "progress" in kwargs:
+            self._last_progress[job_id] = kwargs["progress"]
+        if kwargs.get("status") in TERMINAL_STATUSES:
+            self._last_progress.pop(job_id, None)
+        self.store.update(job_id, kwargs)
+        self._notify(job_id)
+
+    def _notify(self, job_id: str):
+        for future in self._waiters.pop(job_id, ()):
+            # update_job may run outside the waiter's event loop (threads)
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def get_jobs(self, job_ids: List[str]) -> Dict[str, dict]:
+        return self.store.get_many(job_ids)
+
+    def list_jobs(self, status: Optional[JobStatus] = None, limit: Optional[int] = None) -> List[dict]:
+        return self.store.list(status=status, limit=limit)
+
+    def delete_jobs(self, job_ids: List[str]):
+        """Forget finished jobs (retention); their files are the caller's business."""
+        self.store.delete(job_ids)
+        for job_id in job_ids:
+            self._last_progress.pop(job_id, None)
+
+    async def wait_for_update(
+        self,
+        job_id: str,
+        since: Optional[float] = None,
+        timeout: float = 30.0
+    ) -> Optional[dict]:
+        """
+        Return the job once it has changed after `since` (its updated_at
+        token), it is finished, or `timeout` seconds have passed.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        poll = None if isinstance(self.store, InMemoryJobStore) else self.shared_poll_interval
+        while True:
+            job = self.get_job(job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                return job
+            if since is not None and job["updated_at"] != since:
+                return job
+            since = job["updated_at"]
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return job
+
+            future = loop.create_future()
+            self._waiters.setdefault(job_id, set()).add(future)
+            try:
+                await asyncio.wait_for(future, timeout=min(remaining, poll) if poll else remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                waiters = self._waiters.get(job_id)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        self._waiters.pop(job_id, None)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+job_manager = JobManager()
@@ -1,11 +1,25 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, HTMLResponse, Response, StreamingResponse
+from pydantic import ValidationError
+import asyncio
+import hashlib
+import json
 import logging
+import math
 import os
-from .schemas import VideoProject, JobResponse, JobStatus
-from .video_processor import generate_video, VideoProcessingError, job_manager
-from .config_loader import settings, get_log_dir
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import quote
+from .schemas import VideoProject, JobResponse, JobStatus, BulkStatusRequest, BulkStatusResponse, RetimeRequest
+from .jobs import job_manager, TERMINAL_STATUSES
+from .job_queue import PRIORITIES, get_render_mode, create_job_queue
+from .cost_model import cost_model, extract_features, eta_seconds
+from .help_content import HELP_DATA
+from .config_loader import settings, get_log_dir, ROOT_DIR
 
 # Initialize logging based on config
 log_dir = get_log_dir()
@@ -33,7 +47,15 @@ JSON to Video API helps you generate high-quality MP4 videos from JSON specifica
 * **Transitions**: Professional transitions between clips.
 """
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = asyncio.create_task(retention_loop()) if RETENTION_INTERVAL else None
+    yield
+    if sweeper:
+        sweeper.cancel()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="JSON to Video API",
     description=description,
     version="0.3.0",
@@ -43,297 +65,459 @@ app = FastAPI(
     }
 )
 
-# Setup Jinja2 templates
-templates = Jinja2Templates(directory="src/templates")
+_build_openapi = app.openapi
+
+def openapi() -> dict:
+    """OpenAPI document, plus the VideoProject schema /generate validates its raw body against."""
+    if app.openapi_schema is None:
+        schemas = _build_openapi().setdefault("components", {}).setdefault("schemas", {})
+        project_schema = VideoProject.model_json_schema(ref_template="#/components/schemas/{model}")
+        schemas.update(project_schema.pop("$defs", {}))
+        schemas["VideoProject"] = project_schema
+    return app.openapi_schema
+
+app.openapi = openapi
+
+async def generate_video(project: VideoProject, job_id: str) -> str:
+    """
+    Run the render pipeline for a job.
+
+    The pipeline (Pillow, TTS SDKs, .env loading) is imported on first use so
+    freshly started API processes come up fast and only pay for it once.
+    """
+    from .video_processor import JobAborted, generate_video as run_pipeline
+    try:
+        return await run_pipeline(project, job_id)
+    except JobAborted as e:
+        logger.info(f"Job {job_id} stopped: {e}")
+
+async def retime_video(request: RetimeRequest, work_dir: str, job_id: str) -> str:
+    """Re-sync a finished job's stored artifacts (pipeline imported on first use, as above)."""
+    from .video_processor import JobAborted, retime_video as run_retime
+    try:
+        return await run_retime(request, work_dir, job_id)
+    except JobAborted as e:
+        logger.info(f"Job {job_id} stopped: {e}")
+
+@lru_cache(maxsize=1)
+def get_job_queue():
+    """Queue shared with the render workers (python -m src.worker)."""
+    return create_job_queue()
+
+# Seconds between retention sweeps (outputs, work dirs, job records; see src/retention.py); 0 = never
+RETENTION_INTERVAL = settings.getfloat("retention", "interval", fallback=600.0)
+
+@lru_cache(maxsize=1)
+def get_retention():
+    from .retention import RetentionManager
+    return RetentionManager(job_manager)
 
-@app.post("/generate", response_model=JobResponse, status_code=202, tags=["Video Generation"])
-async def generate_video_endpoint(project: VideoProject, background_tasks: BackgroundTasks):
+def run_retention():
+    retention = get_retention()
+    retention.sweep()
+    if retention.job_ttl and get_render_mode() == "queue":
+        get_job_queue().prune(time.time() - retention.job_ttl)
+
+async def retention_loop():
+    while True:
+        try:
+            # File deletion blocks; keep it off the event loop
+            await asyncio.to_thread(run_retention)
+        except Exception:
+            logger.exception("Retention sweep failed")
+        await asyncio.sleep(RETENTION_INTERVAL)
+
+@lru_cache(maxsize=1)
+def render_help_page() -> tuple:
+    """Render the static help page once; returns (html_bytes, strong ETag)."""
+    from jinja2 import Environment, FileSystemLoader
+    env = Environment(loader=FileSystemLoader(str(ROOT_DIR / "src" / "templates")), autoescape=True)
+    html = env.get_template("help.html").render(**HELP_DATA).encode("utf-8")
+    etag = '"' + hashlib.sha256(html).hexdigest()[:32] + '"'
+    return html, etag
+
+# Renders that can run at once across the deployment (API processes in inline
+# mode, worker concurrency summed over workers in queue mode); used for ETAs
+RENDER_SLOTS = max(settings.getint("scheduler", "render_slots", fallback=1), 1)
+# Reject new jobs once this many seconds of estimated work are waiting (0 = never)
+MAX_BACKLOG_SECONDS = settings.getfloat("scheduler", "max_backlog_seconds", fallback=0.0)
+
+# Seconds between full rescans of the job records for the backlog total
+BACKLOG_REFRESH = settings.getfloat("scheduler", "backlog_refresh", fallback=5.0)
+
+def scan_backlog() -> float:
+    """Estimated render time left across all queued and running jobs (reads every such record)."""
+    now = time.time()
+    total = 0.0
+    for status in (JobStatus.QUEUED, JobStatus.PROCESSING):
+        for job in job_manager.list_jobs(status=status):
+            estimate = job.get("estimate")
+            if not estimate:
+                continue
+            # Queued jobs count their own work only; eta_seconds would include their wait
+            total += sum(estimate.values()) if status == JobStatus.QUEUED else eta_seconds(job, now)
+    return total
+
+class Backlog:
     """
-    Submit a video generation request.
+    Running total of estimated render seconds queued or running.
+
+    Submissions through this process are added as they are accepted. Other
+    API processes, workers and finished jobs change the records too, so the
+    total is replaced by a full scan (in a thread) at most every `refresh`
+    seconds rather than on every request.
+    """
+
+    def __init__(self, refresh: float):
+        self.refresh = refresh
+        self.total = 0.0
+        self.scanned_at: Optional[float] = None
+        self._scanning = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        return self.scanned_at is None or time.monotonic() - self.scanned_at >= self.refresh
+
+    async def seconds(self) -> float:
+        if self._stale():
+            async with self._scanning:
+                # Requests that waited for the lock reuse the scan that just finished
+                if self._stale():
+                    self.total = await asyncio.to_thread(scan_backlog)
+                    self.scanned_at = time.monotonic()
+        return self.total
+
+    def add(self, seconds: float):
+        self.total += seconds
+
+backlog = Backlog(BACKLOG_REFRESH)
+
+def with_eta(job: dict) -> dict:
+    return {**job, "eta_seconds": eta_seconds(job)}
+
+async def with_queue_info(jobs: List[dict]) -> List[dict]:
+    """Add queue_position and queued_seconds to the jobs still waiting to start."""
+    queued = [job["job_id"] for job in jobs if job["status"] == JobStatus.QUEUED]
+    if not queued:
+        return jobs
+    # Queue calls take SQLite locks; keep them off the event loop, as RenderWorker does
+    positions = await asyncio.to_thread(get_job_queue().positions, queued) if get_render_mode() == "queue" else {}
+    now = time.time()
+    return [
+        {**job, "queue_position": positions.get(job["job_id"]), "queued_seconds": round(now - job["created_at"].timestamp(), 1)}
+        if job["status"] == JobStatus.QUEUED else job
+        for job in jobs
+    ]
+
+# Jobs estimated to take longer than this are not "interactive" and queue in the standard lane
+INTERACTIVE_MAX_SECONDS = settings.getfloat("scheduler", "interactive_max_seconds", fallback=120.0)
+PRIORITY_QUERY = Query(
+    "standard", pattern=f"^({'|'.join(PRIORITIES)})$",
+    description="Queue lane: interactive (drafts, short renders) goes before standard, standard before bulk"
+)
+
+def client_id(request: Request) -> str:
+    """Who is submitting, for fair sharing: the API key (hashed), X-Client-Id, or else the peer address."""
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return "key-" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return request.headers.get("x-client-id") or f"ip-{request.client.host if request.client else 'unknown'}"
+
+def queue_lane(priority: str, estimated_seconds: float) -> str:
+    if priority == "interactive" and estimated_seconds > INTERACTIVE_MAX_SECONDS:
+        return "standard"
+    return priority
+
+# /generate bodies above this are refused (413) before they are read or parsed
+MAX_BODY_BYTES = int(settings.getfloat("api", "max_body_mb", fallback=16) * 2 ** 20)
+
+async def read_body(request: Request) -> bytes:
+    """The raw request body; 413 as soon as it is known to exceed MAX_BODY_BYTES."""
+    too_large = HTTPException(status_code=413, detail=f"Request body exceeds {MAX_BODY_BYTES} bytes")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BODY_BYTES:
+        raise too_large
+    # Chunked uploads carry no length: count while reading
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def parse_project(body: bytes) -> VideoProject:
+    """
+    Validate a VideoProject straight from JSON bytes. Pydantic parses and
+    validates in one pass, without building an intermediate dict first.
+    """
+    try:
+        return VideoProject.model_validate_json(body)
+    except ValidationError as e:
+        # Same 422 shape as FastAPI's own body validation
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False, include_context=False)]
+        )
+
+@app.post(
+    "/generate", response_model=JobResponse, status_code=202, tags=["Video Generation"],
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/VideoProject"}}}
+    }}
+)
+async def generate_video_endpoint(request: Request, background_tasks: BackgroundTasks, priority: str = PRIORITY_QUERY):
+    """
+    Submit a video generation request (a `VideoProject` JSON body).
     
-    Returns a `job_id` which can be used to poll `/status/{job_id}`.
+    Returns a `job_id` which can be used to poll `/status/{job_id}`, and an
+    `eta_seconds` estimate of when the video will be ready. Queued jobs are
+    shared fairly between clients (`X-API-Key` or `X-Client-Id`) within each
+    `priority` lane.
     """
-    job_id = job_manager.create_job(project.name)
-    logger.info(f"Queued video generation job: {job_id} for project: {project.name}")
-    background_tasks.add_task(generate_video, project, job_id)
+    project = parse_project(await read_body(request))
+    # The model file is only re-read when another process updated it, but that read blocks
+    estimate = await asyncio.to_thread(cost_model.estimate, extract_features(project))
+    estimated_seconds = round(sum(estimate.values()), 1)
+    waiting = await backlog.seconds()
+    if MAX_BACKLOG_SECONDS and waiting + estimated_seconds > MAX_BACKLOG_SECONDS:
+        retry_after = math.ceil((waiting + estimated_seconds - MAX_BACKLOG_SECONDS) / RENDER_SLOTS)
+        raise HTTPException(
+            status_code=503,
+            detail="Render queue is full, try again later.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    eta = round(waiting / RENDER_SLOTS + estimated_seconds, 1)
+    client, priority = client_id(request), queue_lane(priority, estimated_seconds)
+    job_id = job_manager.create_job(
+        project.name, estimate=estimate, estimated_seconds=estimated_seconds, eta_at=time.time() + eta,
+        client=client, priority=priority
+    )
+    backlog.add(estimated_seconds)
+    logger.info(f"Queued video generation job: {job_id} for project: {project.name} (eta {eta}s, {priority}, {client})")
+    if get_render_mode() == "queue":
+        # Render workers pick the job up; the API process never renders
+        await asyncio.to_thread(
+            get_job_queue().enqueue, job_id, project.model_dump_json(),
+            cost=estimated_seconds, client=client, priority=priority
+        )
+    else:
+        background_tasks.add_task(generate_video, project, job_id)
     
     return {
         "job_id": job_id,
         "status": JobStatus.QUEUED,
-        "message": "Video generation job has been queued."
+        "message": "Video generation job has been queued.",
+        "estimated_seconds": estimated_seconds,
+        "eta_seconds": eta
     }
 
+@app.post("/jobs/{job_id}/retime", response_model=JobResponse, status_code=202, tags=["Video Generation"])
+async def retime_job(
+    job_id: str,
+    request: RetimeRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    priority: str = PRIORITY_QUERY
+):
+    """
+    Re-sync a completed narrated video with new `marker_words` or subtitle options.
+
+    The stored speech, word timings and processed images of `job_id` are
+    reused, so only the sync map, subtitles and final encode run again. The
+    result is a new job; poll and download it like any other.
+    """
+    source = job_manager.get_job(job_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if source["status"] != JobStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail=f"Only completed jobs can be retimed. Status: {source['status']}")
+    work_dir = source.get("work_dir")
+    # VideoEngine's ARTIFACTS_FILE; not imported so the API process stays light
+    if not work_dir or not os.path.exists(os.path.join(work_dir, "artifacts.json")):
+        raise HTTPException(status_code=409, detail="Job has no reusable artifacts (only narrated videos can be retimed)")
+
+    timings = source.get("timings") or {}
+    estimate = {stage: timings.get(stage, 0.0) for stage in ("sync", "encode")}
+    estimated_seconds = round(sum(estimate.values()), 1)
+    eta = round(await backlog.seconds() / RENDER_SLOTS + estimated_seconds, 1)
+    client, priority = client_id(http_request), queue_lane(priority, estimated_seconds)
+    retime_id = job_manager.create_job(
+        source["name"], estimate=estimate, estimated_seconds=estimated_seconds, eta_at=time.time() + eta,
+        retimed_from=job_id, client=client, priority=priority
+    )
+    backlog.add(estimated_seconds)
+    logger.info(f"Queued retime job {retime_id} of job {job_id}")
+    if get_render_mode() == "queue":
+        payload = json.dumps({"retime": request.model_dump(), "work_dir": work_dir})
+        await asyncio.to_thread(
+            get_job_queue().enqueue, retime_id, payload, cost=estimated_seconds, client=client, priority=priority
+        )
+    else:
+        background_tasks.add_task(retime_video, request, work_dir, retime_id)
+
+    return {
+        "job_id": retime_id,
+        "status": JobStatus.QUEUED,
+        "message": f"Retime of job {job_id} has been queued.",
+        "estimated_seconds": estimated_seconds,
+        "eta_seconds": eta
+    }
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse, status_code=202, tags=["Video Generation"])
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+
+    Queued jobs are cancelled at once. A running job stops within about a
+    second: its subprocesses are killed, its work dir is removed and its
+    status becomes `cancelled`.
+    """
+    job = job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job has already finished. Status: {job['status']}")
+
+    # The render (in this process, another API worker or a render worker) polls for this flag
+    job_manager.update_job(job_id, cancel_requested=True)
+    if get_render_mode() == "queue":
+        await asyncio.to_thread(get_job_queue().cancel, job_id)
+    if job["status"] == JobStatus.QUEUED:
+        job_manager.update_job(job_id, status=JobStatus.CANCELLED, error="Cancelled by client")
+    logger.info(f"Cancellation requested for job {job_id}")
+    return {**with_eta(job_manager.get_job(job_id)), "message": "Cancellation requested."}
+
+# "accel": /download hands the file to the proxy (X-Accel-Redirect, see Caddyfile)
+# instead of streaming it through this process; "none" serves it directly
+DOWNLOAD_OFFLOAD = os.getenv("DOWNLOAD_OFFLOAD") or settings.get("download", "offload", fallback="none")
+
+def accel_redirect(video_path: str, filename: str) -> Optional[Response]:
+    """Empty response telling the proxy which file to send, or None if it is outside the served root."""
+    try:
+        relative = Path(video_path).resolve().relative_to(ROOT_DIR.resolve())
+    except ValueError:
+        return None
+    if filename.isascii():
+        disposition = f'attachment; filename="{filename}"'
+    else:
+        disposition = f"attachment; filename*=utf-8''{quote(filename)}"
+    return Response(
+        media_type="video/mp4",
+        headers={"X-Accel-Redirect": quote(f"/{relative.as_posix()}"), "Content-Disposition": disposition}
+    )
+
+# Upper bound for ?wait= long-polls and the SSE keep-alive interval (seconds)
+MAX_STATUS_WAIT = settings.getfloat("status", "max_wait", fallback=60.0)
+SSE_KEEPALIVE = settings.getfloat("status", "sse_keepalive", fallback=15.0)
+
 @app.get("/status/{job_id}", response_model=JobResponse, tags=["Video Generation"])
-async def get_job_status(job_id: str):
-    """Check the status of a video generation job."""
+async def get_job_status(
+    job_id: str,
+    wait: Optional[float] = Query(None, ge=0, description="Long-poll: hold the request up to this many seconds until the job changes"),
+    since: Optional[float] = Query(None, description="updated_at from the previous response; return as soon as the job differs")
+):
+    """
+    Check the status of a video generation job.
+    
+    With `?wait=N` the request is held until the job changes (or finishes),
+    so clients can poll once per change instead of once per second.
+    """
+    if wait:
+        job = await job_manager.wait_for_update(job_id, since=since, timeout=min(wait, MAX_STATUS_WAIT))
+    else:
+        job = job_manager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return with_eta((await with_queue_info([job]))[0])
+
+@app.post("/status", response_model=BulkStatusResponse, tags=["Video Generation"])
+async def get_jobs_status(request: BulkStatusRequest):
+    """Check the status of many jobs (up to 1000) in one round trip."""
+    jobs = job_manager.get_jobs(request.job_ids)
+    found = await with_queue_info([jobs[job_id] for job_id in request.job_ids if job_id in jobs])
+    return {
+        "jobs": [with_eta(job) for job in found],
+        "missing": [job_id for job_id in request.job_ids if job_id not in jobs]
+    }
+
+@app.get("/events/{job_id}", tags=["Video Generation"])
+async def job_events(job_id: str):
+    """
+    Server-Sent Events stream of a job's progress.
+    
+    Emits a `status` event on every change and closes after the job
+    completes or fails.
+    """
     job = job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+
+    async def stream():
+        current, since = job, None
+        while current is not None:
+            if current["updated_at"] != since:
+                since = current["updated_at"]
+                payload = JobResponse.model_validate(with_eta(current)).model_dump_json()
+                yield f"id: {since}\nevent: status\ndata: {payload}\n\n"
+                if current["status"] in TERMINAL_STATUSES:
+                    return
+            else:
+                # Nothing new; a comment line keeps proxies from closing the connection
+                yield ": keep-alive\n\n"
+            current = await job_manager.wait_for_update(job_id, since=since, timeout=SSE_KEEPALIVE)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/download/{job_id}", tags=["Video Generation"])
-async def download_video(job_id: str):
-    """Download the completed video file."""
+async def download_video(
+    job_id: str,
+    rendition: Optional[str] = Query(None, description="Name of one of the project's `renditions` (default: main output)")
+):
+    """Download the completed video file, or one of its renditions."""
     job = job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    if job["status"] == JobStatus.FAILED:
+    if job["status"] in (JobStatus.FAILED, JobStatus.TIMED_OUT):
         raise HTTPException(status_code=400, detail=f"Video generation failed: {job.get('error')}")
         
     if job["status"] != JobStatus.COMPLETED:
         raise HTTPException(status_code=400, detail=f"Video is not ready. Status: {job['status']}")
+    if job.get("expired_at"):
+        raise HTTPException(status_code=410, detail="Video has expired and was deleted")
     
     video_path = job["output_file"]
+    filename = f"{job['name']}.mp4"
+    if rendition is not None:
+        video_path = (job.get("renditions") or {}).get(rendition)
+        if not video_path:
+            raise HTTPException(status_code=404, detail=f"Job has no rendition '{rendition}'")
+        filename = f"{job['name']}_{rendition}.mp4"
     if not video_path or not os.path.exists(video_path):
         raise HTTPException(status_code=404, detail="Generated video file not found on disk")
-        
-    return FileResponse(video_path, media_type="video/mp4", filename=f"{job['name']}.mp4")
+    # Retention evicts the least recently downloaded videos first
+    job_manager.update_job(job_id, downloaded_at=time.time())
+
+    if DOWNLOAD_OFFLOAD == "accel":
+        offloaded = accel_redirect(video_path, filename)
+        if offloaded is not None:
+            return offloaded
+        logger.warning(f"Serving {video_path} directly: it is outside the proxy's root")
+    return FileResponse(video_path, media_type="video/mp4", filename=filename)
 
 @app.get("/help", response_class=HTMLResponse, tags=["Utilities"])
 async def api_help(request: Request):
     """Get comprehensive API usage information and help."""
-    help_data = {
-        "title": "JSON to Video API",
-        "description": "Generate high-quality MP4 videos from JSON specifications",
-        "version": "0.3.0",
-        
-        "how_it_works": {
-            "overview": "This API uses an asynchronous workflow for video generation",
-            "steps": [
-                "1. POST your video specification to /generate - receive a job_id",
-                "2. Poll /status/{job_id} to check progress (queued → processing → completed/failed)",
-                "3. Download the video from /download/{job_id} when status is 'completed'"
-            ],
-            "typical_generation_time": "5-30 seconds depending on complexity and duration"
-        },
-        
-        "endpoints": {
-            "POST /generate": {
-                "description": "Submit a video generation request",
-                "body": "JSON video project specification (see examples below)",
-                "response": {"job_id": "string", "status": "queued", "message": "string"}
-            },
-            "GET /status/{job_id}": {
-                "description": "Check job status",
-                "response": {"job_id": "string", "status": "queued|processing|completed|failed", "message": "string", "output_file": "string (when completed)"}
-            },
-            "GET /download/{job_id}": {
-                "description": "Download completed video",
-                "response": "MP4 video file stream"
-            },
-            "GET /health": {
-                "description": "Health check",
-                "response": {"status": "ok"}
-            },
-            "GET /help": {
-                "description": "This help documentation",
-                "response": "API documentation JSON"
-            },
-            "GET /docs": {
-                "description": "Interactive Swagger UI with full schema documentation",
-                "response": "HTML page with interactive API documentation"
-            }
-        },
-        
-        "examples": {
-            "1_basic_text": {
-                "description": "Simple text video with styling",
-                "spec": {
-                    "name": "hello-world",
-                    "duration": 5,
-                    "resolution": "720p",
-                    "visuals": [
-                        {
-                            "type": "TEXT",
-                            "text": "Hello World",
-                            "position": "center",
-                            "style": {
-                                "fontSize": "80px",
-                                "color": "#ffffff"
-                            }
-                        }
-                    ]
-                }
-            },
-            "2_text_with_image": {
-                "description": "Text with fade animations and background image",
-                "spec": {
-                    "name": "text-and-image",
-                    "resolution": "720p",
-                    "duration": 5,
-                    "visuals": [
-                        {
-                            "type": "TEXT",
-                            "text": "Hello World",
-                            "style": {"fontSize": "80px", "color": "#ffffff"},
-                            "position": "center",
-                            "enterBegin": 0,
-                            "enterEnd": 1,
-                            "exitBegin": 4,
-                            "exitEnd": 5
-                        },
-                        {
-                            "type": "IMAGE",
-                            "src": "https://images.unsplash.com/photo-1506744038136-46273834b3fb?w=800",
-                            "position": "center",
-                            "width": 400,
-                            "height": 300,
-                            "enterBegin": 1,
-                            "enterEnd": 2,
-                            "exitBegin": 4,
-                            "exitEnd": 5
-                        }
-                    ]
-                }
-            },
-            "3_subtitles": {
-                "description": "Video with timed subtitles/captions",
-                "spec": {
-                    "name": "with-subtitles",
-                    "resolution": "720p",
-                    "duration": 5,
-                    "visuals": [
-                        {
-                            "type": "TEXT",
-                            "text": "Background Content",
-                            "style": {"fontSize": "40px"},
-                            "position": "center",
-                            "enterBegin": 0,
-                            "exitEnd": 5
-                        }
-                    ],
-                    "subtitle": {
-                        "styles": {
-                            "fontSize": 60,
-                            "color": "#ffff00",
-                            "fontFamily": "Arial"
-                        },
-                        "captions": [
-                            {"start": 0.5, "end": 2.5, "text": "This is the first caption"},
-                            {"start": 3.0, "end": 4.5, "text": "And the second one"}
-                        ]
-                    }
-                }
-            },
-            "4_background_transitions": {
-                "description": "Background color transitions with fade effects",
-                "spec": {
-                    "name": "bg-transitions",
-                    "resolution": "720p",
-                    "duration": 6,
-                    "backgroundColor": "#000000",
-                    "visuals": [
-                        {
-                            "type": "SVG",
-                            "svg": "<svg width=\"1280\" height=\"720\" xmlns=\"http://www.w3.org/2000/svg\"><rect width=\"100%\" height=\"100%\" fill=\"#ff0000\"/></svg>",
-                            "position": "center",
-                            "enterBegin": 0,
-                            "enterEnd": 2,
-                            "exitBegin": 2,
-                            "exitEnd": 4,
-                            "enterAnimation": "fade",
-                            "exitAnimation": "fade"
-                        },
-                        {
-                            "type": "SVG",
-                            "svg": "<svg width=\"1280\" height=\"720\" xmlns=\"http://www.w3.org/2000/svg\"><rect width=\"100%\" height=\"100%\" fill=\"#0000ff\"/></svg>",
-                            "position": "center",
-                            "enterBegin": 4,
-                            "enterEnd": 6,
-                            "enterAnimation": "fade"
-                        }
-                    ]
-                }
-            },
-            "5_complex_overlay_grid": {
-                "description": "Multiple overlapping elements with precise positioning",
-                "spec": {
-                    "name": "overlay-grid",
-                    "resolution": "full-hd",
-                    "duration": 5,
-                    "backgroundColor": "#000000",
-                    "visuals": [
-                        {
-                            "type": "IMAGE",
-                            "src": "https://picsum.photos/seed/g1/400/400",
-                            "x": 100,
-                            "y": 100,
-                            "width": 400,
-                            "height": 400,
-                            "enterBegin": 0,
-                            "enterEnd": 1,
-                            "exitBegin": 4,
-                            "exitEnd": 5,
-                            "enterAnimation": "fade"
-                        },
-                        {
-                            "type": "TEXT",
-                            "text": "GRID LAYOUT",
-                            "x": 600,
-                            "y": 700,
-                            "style": {"fontSize": "80px", "color": "#00ff00"},
-                            "enterBegin": 2,
-                            "exitEnd": 5
-                        }
-                    ]
-                }
-            }
-        },
-        
-        "field_documentation": {
-            "project_level": {
-                "name": "String - Project name (used for output filename)",
-                "duration": "Number - Video duration in seconds",
-                "resolution": "String - '720p', 'hd', 'full-hd', '4k', or custom 'WIDTHxHEIGHT'",
-                "backgroundColor": "String - Hex color code (e.g., '#000000')",
-                "visuals": "Array - List of visual elements (text, images, videos, SVGs, GIFs)",
-                "subtitle": "Object - Subtitle configuration with styles and captions",
-                "audio": "Object - Background audio configuration"
-            },
-            "visual_element": {
-                "type": "String - 'TEXT', 'IMAGE', 'VIDEO', 'SVG', 'GIF'",
-                "position": "String - 'center', 'top-left', 'bottom-right', etc. OR use x/y for precise positioning",
-                "x": "Number - Horizontal position in pixels (from left)",
-                "y": "Number - Vertical position in pixels (from top)",
-                "width": "Number - Width in pixels",
-                "height": "Number - Height in pixels",
-                "enterBegin": "Number - Start time for enter animation (seconds)",
-                "enterEnd": "Number - End time for enter animation (seconds)",
-                "exitBegin": "Number - Start time for exit animation (seconds)",
-                "exitEnd": "Number - End time for exit animation (seconds)",
-                "enterAnimation": "String - 'fade', 'slide', etc.",
-                "exitAnimation": "String - 'fade', 'slide', etc."
-            },
-            "text_specific": {
-                "text": "String - The text content to display",
-                "style": "Object - CSS-like styling (fontSize, color, fontFamily, fontWeight, etc.)"
-            },
-            "image_video_specific": {
-                "src": "String - URL or local path to the media file"
-            },
-            "svg_specific": {
-                "svg": "String - Raw SVG markup"
-            }
-        },
-        
-        "tips": [
-            "Use enterBegin/enterEnd and exitBegin/exitEnd to control when elements appear and disappear",
-            "Animations like 'fade' create smooth transitions between states",
-            "Position can be a preset string ('center', 'top-left') or precise x/y coordinates",
-            "Resolution '720p' = 1280x720, 'full-hd' = 1920x1080, '4k' = 3840x2160",
-            "For complex layouts, use x/y positioning instead of preset positions",
-            "Subtitles are overlaid on top of all visuals automatically"
-        ],
-        
-        "support": {
-            "swagger_ui": "Visit /docs for interactive API documentation with full schemas",
-            "contact": "https://github.com/felix/json2videoapi",
-            "documentation": "See README.md for setup and deployment instructions"
-        }
-    }
-    
-    return templates.TemplateResponse("help.html", {"request": request, **help_data})
+    html, etag = render_help_page()
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=html, headers=headers)
 
 @app.get("/", response_class=HTMLResponse, tags=["Utilities"])
 async def root_redirect(request: Request):
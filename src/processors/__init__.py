@@ -3,11 +3,16 @@ Processors module for handling various media processing tasks.
 
 This middleware layer handles:
 - Audio processing (trimming, downloading, voice generation)
+- Text-to-speech backends (ElevenLabs, offline local)
 - Image processing (downloading, validation, reformatting)
 - Video validation and preprocessing
 """
 
 from .audio_processor import AudioProcessor
 from .voice_generator import VoiceGenerator
+from .tts_backends import TTSBackend, ElevenLabsBackend, LocalTTSBackend, create_tts_backend
 
-__all__ = ['AudioProcessor', 'VoiceGenerator']
+__all__ = [
+    'AudioProcessor', 'VoiceGenerator',
+    'TTSBackend', 'ElevenLabsBackend', 'LocalTTSBackend', 'create_tts_backend'
+]
@@ -2,14 +2,16 @@
 Audio Processor for handling audio-related tasks.
 """
 
-import subprocess
 import asyncio
-import os
+import struct
+import uuid
+import wave
 from pathlib import Path
 from typing import Optional
 import logging
 
-from ..config_loader import ROOT_DIR
+from ..config_loader import ROOT_DIR, settings
+from .process_group import managed_process
 
 logger = logging.getLogger(__name__)
 
@@ -73,13 +75,12 @@ class AudioProcessor:
         logger.info(f"Trimming audio: {input_path} -> {duration}s")
         
         try:
-            process = await asyncio.create_subprocess_exec(
+            async with managed_process(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            ) as process:
+                stdout, stderr = await process.communicate()
             
             if process.returncode != 0:
                 error_msg = stderr.decode().strip()
@@ -126,13 +127,12 @@ class AudioProcessor:
         ]
         
         try:
-            process = await asyncio.create_subprocess_exec(
+            async with managed_process(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            ) as process:
+                stdout, stderr = await process.communicate()
             
             if process.returncode != 0:
                 raise AudioProcessingError(f"FFprobe failed: {stderr.decode()}")
@@ -170,22 +170,161 @@ class AudioProcessor:
         
         return True
 
-    @staticmethod
+    # PCM layout every source is decoded to before mixing
+    SAMPLE_RATE = 48000
+    CHANNELS = 2
+
+    @classmethod
+    async def decode_pcm(cls, audio_path: str, cache_dir: Optional[Path] = None):
+        """
+        Decode an audio (or video) file to float32 PCM once and memory-map it.
+
+        The decoded WAV is cached by content digest, so a music bed shared by
+        many jobs is decoded a single time and later mixes only page in the
+        samples they read.
+
+        Mono stays mono (mixing broadcasts it to both channels at full level,
+        where ffmpeg's upmix would drop it by 3 dB); more than two channels
+        are downmixed to stereo.
+
+        Returns:
+            Read-only array of shape (samples, 1 or CHANNELS)
+        """
+        import numpy as np
+        from .media_cache import cache_lock, content_digest
+
+        path = Path(audio_path)
+        if not path.is_absolute():
+            path = ROOT_DIR / audio_path
+        if not path.exists():
+            raise AudioProcessingError(f"Audio file not found: {audio_path}")
+        if cache_dir is None:
+            cache_dir = Path(settings.get("audio", "pcm_cache_dir", fallback="tmp/pcm_cache"))
+            if not cache_dir.is_absolute():
+                cache_dir = ROOT_DIR / cache_dir
+
+        digest = await asyncio.to_thread(content_digest, str(path))
+        key = f"{digest[:32]}-{cls.SAMPLE_RATE}"
+        wav_path = Path(cache_dir) / key[:2] / f"{key}.wav"
+        if not wav_path.exists():
+            wav_path.parent.mkdir(parents=True, exist_ok=True)
+            # Jobs sharing a music bed decode it once; the others wait and reuse it
+            async with cache_lock(wav_path.with_suffix(".lock")):
+                if not wav_path.exists():
+                    tmp_path = wav_path.with_name(f"{key}.{uuid.uuid4().hex[:12]}.tmp.wav")
+                    await cls._decode(path, tmp_path)
+                    if _wav_data_chunk(tmp_path)[2] > cls.CHANNELS:
+                        await cls._decode(path, tmp_path, channels=cls.CHANNELS)
+                    tmp_path.replace(wav_path)
+
+        offset, size, channels = _wav_data_chunk(wav_path)
+        frames = size // (4 * channels)
+        if frames == 0:
+            return np.zeros((0, channels), dtype=np.float32)
+        return np.memmap(wav_path, dtype="<f4", mode="r", offset=offset, shape=(frames, channels))
+
+    @classmethod
+    async def _decode(cls, path: Path, output: Path, channels: Optional[int] = None):
+        cmd = ["ffmpeg", "-v", "error", "-i", str(path), "-vn", "-ar", str(cls.SAMPLE_RATE)]
+        if channels:
+            cmd.extend(["-ac", str(channels)])
+        cmd.extend(["-c:a", "pcm_f32le", "-fflags", "+bitexact", "-map_metadata", "-1", "-y", str(output)])
+        try:
+            async with managed_process(*cmd, stderr=asyncio.subprocess.PIPE) as process:
+                _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            output.unlink(missing_ok=True)
+            raise
+        if process.returncode != 0:
+            output.unlink(missing_ok=True)
+            raise AudioProcessingError(f"Could not decode {path}: {stderr.decode().strip()}")
+
+    @classmethod
+    async def mix_pcm(cls, audio_configs: list, output_duration: Optional[float], cache_dir: Optional[Path] = None):
+        """
+        Mix decoded sources into one (samples, CHANNELS) float32 buffer.
+
+        Gains are applied as given (no renormalization by input count) and the
+        sum is hard-clipped to [-1, 1]. Tracks with `duck` are attenuated to
+        that gain wherever the other tracks are audible. Without an
+        `output_duration` the mix lasts until the last source ends.
+        """
+        rate = cls.SAMPLE_RATE
+        ordered = [c for c in audio_configs if c.get("duck") is None] + \
+            [c for c in audio_configs if c.get("duck") is not None]
+        # (config, pcm, first source sample, end source sample, first output sample)
+        sources = []
+        for config in ordered:
+            try:
+                pcm = await cls.decode_pcm(config["src"], cache_dir)
+            except AudioProcessingError as e:
+                logger.warning(f"Skipping audio during mixing: {e}")
+                continue
+            begin = int(round((config.get("audioBegin") or 0.0) * rate))
+            end = len(pcm)
+            if config.get("audioEnd") is not None:
+                end = min(end, int(round(config["audioEnd"] * rate)))
+            sources.append((config, pcm, begin, end, int(round((config.get("videoBegin") or 0.0) * rate))))
+        if not sources:
+            raise AudioProcessingError("None of the audio sources could be read")
+        # The summing itself is CPU-bound NumPy work
+        return await asyncio.to_thread(cls._mix, sources, output_duration)
+
+    @classmethod
+    def _mix(cls, sources: list, output_duration: Optional[float]):
+        import numpy as np
+
+        rate = cls.SAMPLE_RATE
+        if output_duration is None:
+            total = max(start + max(end - begin, 0) for _, _, begin, end, start in sources)
+        else:
+            total = int(round(output_duration * rate))
+        mix = np.zeros((total, cls.CHANNELS), dtype=np.float32)
+        ducked = [config for config, *_ in sources if config.get("duck") is not None]
+        beds = np.zeros_like(mix) if ducked else None
+
+        for config, pcm, begin, end, start in sources:
+            count = min(end - begin, total - start)
+            if count <= 0:
+                continue
+            volume = config.get("volume")
+            target = beds if config.get("duck") is not None else mix
+            target[start:start + count] += pcm[begin:begin + count] * np.float32(1.0 if volume is None else volume)
+
+        if ducked:
+            # Every ducked track shares the deepest requested duck gain
+            gain = _duck_gain(mix.mean(axis=1), min(c["duck"] for c in ducked), rate)
+            mix += beds * gain[:, None]
+        return np.clip(mix, -1.0, 1.0, out=mix)
+
+    @classmethod
     async def mix_audios(
+        cls,
         audio_configs: list,
-        output_duration: float,
-        output_path: Optional[str] = None
+        output_duration: Optional[float],
+        output_path: Optional[str] = None,
+        cache_dir: Optional[Path] = None
     ) -> str:
         """
-        Mix multiple audio files into a single track with offsets and volumes using FFmpeg.
+        Mix multiple audio files into a single track with offsets and volumes.
+        
+        Sources are decoded to cached PCM and mixed in-process with NumPy; the
+        result is written once (WAV directly, other formats with one FFmpeg
+        encode).
         
         Args:
             audio_configs: List of dicts with keys:
                           - src: path to audio file
-                          - volume: volume multiplier (0.0 to 1.0)
+                          - volume: gain multiplier (default 1.0)
                           - videoBegin: start time in video (seconds)
+                          - audioBegin / audioEnd: optional trim of the source (seconds)
+                          - duck: optional gain (e.g. 0.3) for this track while the
+                            other tracks are audible
             output_duration: Total duration of the resulting mixed track
+                             (None: until the last source ends)
             output_path: Optional output path
+            cache_dir: Where decoded PCM is kept (default [audio] pcm_cache_dir;
+                       pass a job's work dir for one-off sources such as speech)
             
         Returns:
             Path to the mixed audio file
@@ -197,68 +336,87 @@ class AudioProcessor:
         if output_path is None:
             artifacts_dir = ROOT_DIR / "tests" / "data" / "artifacts"
             artifacts_dir.mkdir(parents=True, exist_ok=True)
-            output_path = artifacts_dir / f"mixed-audio-{int(output_duration)}s.mp3"
+            output_path = artifacts_dir / f"mixed-audio-{int(output_duration or 0)}s.mp3"
         else:
             output_path = Path(output_path)
 
-        # Build FFmpeg command
-        inputs = []
-        filter_parts = []
-        
-        for i, config in enumerate(audio_configs):
-            src = config['src']
-            path = Path(src)
-            if not path.is_absolute():
-                path = ROOT_DIR / src
-            
-            if not path.exists():
-                logger.warning(f"Audio file not found during mixing: {src}")
-                continue
-                
-            inputs.extend(["-i", str(path)])
-            
-            # Apply volume and delay
-            # adelay expects milliseconds
-            delay_ms = int(config.get('videoBegin', 0) * 1000)
-            volume = config.get('volume', 1.0)
-            
-            # Note: adelay syntax for Stereo is delay|delay
-            filter_parts.append(f"[{i}:a]adelay={delay_ms}|{delay_ms},volume={volume}[a{i}]")
+        logger.info(f"Mixing {len(audio_configs)} audio tracks into {output_path}")
+        mix = await cls.mix_pcm(audio_configs, output_duration, cache_dir)
 
-        # Combine all tracks using amix
-        mix_inputs = "".join([f"[a{i}]" for i in range(len(filter_parts))])
-        amix_filter = f"{mix_inputs}amix=inputs={len(filter_parts)}:duration=first:dropout_transition=3[out]"
-        
-        full_filter = ";".join(filter_parts + [amix_filter])
+        if output_path.suffix.lower() == ".wav":
+            await asyncio.to_thread(_write_wav, output_path, mix, cls.SAMPLE_RATE)
+            return str(output_path)
 
         cmd = [
-            "ffmpeg",
-            *inputs,
-            "-filter_complex", full_filter,
-            "-map", "[out]",
-            "-t", str(output_duration),
-            "-y",
-            str(output_path)
+            "ffmpeg", "-v", "error",
+            "-f", "f32le", "-ar", str(cls.SAMPLE_RATE), "-ac", str(cls.CHANNELS), "-i", "pipe:0",
+            "-y", str(output_path)
         ]
+        async with managed_process(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        ) as process:
+            stdout, stderr = await process.communicate(input=mix.tobytes())
+        if process.returncode != 0:
+            error_msg = stderr.decode().strip()
+            logger.error(f"FFmpeg encode of mixed audio failed: {error_msg}")
+            raise AudioProcessingError(f"Audio mixing failed: {error_msg}")
+        return str(output_path)
 
-        logger.info(f"Mixing {len(audio_configs)} audio tracks into {output_path}")
-        
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                error_msg = stderr.decode().strip()
-                logger.error(f"FFmpeg mix failed: {error_msg}")
-                raise AudioProcessingError(f"Audio mixing failed: {error_msg}")
-            
-            return str(output_path)
-            
-        except Exception as e:
-            logger.error(f"Error mixing audios: {e}")
-            raise AudioProcessingError(f"Unexpected error during audio mixing: {e}")
+
+def _wav_data_chunk(path: Path):
+    """(offset, size, channels) of the sample data in a RIFF/WAVE file."""
+    channels = None
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise AudioProcessingError(f"Not a WAV file: {path}")
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise AudioProcessingError(f"No data chunk in {path}")
+            chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if chunk_id == b"data":
+                if channels is None:
+                    raise AudioProcessingError(f"No fmt chunk before data in {path}")
+                return f.tell(), size, channels
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                channels = struct.unpack("<H", fmt[2:4])[0]
+                f.seek(size & 1, 1)
+                continue
+            f.seek(size + (size & 1), 1)
+
+
+def _duck_gain(key, depth: float, rate: int, threshold_db: float = -40.0):
+    """
+    Per-sample gain that drops to `depth` while `key` is above the threshold.
+
+    Works on 10 ms RMS blocks: the duck is held 300 ms after the key goes
+    quiet and both edges are ramped over 100 ms to avoid pumping clicks.
+    """
+    import numpy as np
+
+    block = rate // 100
+    blocks = -(-len(key) // block)
+    padded = np.zeros(blocks * block, dtype=np.float32)
+    padded[:len(key)] = key
+    rms = np.sqrt(np.mean(padded.reshape(blocks, block) ** 2, axis=1))
+    active = rms > 10 ** (threshold_db / 20)
+    held = np.convolve(active.astype(np.float32), np.ones(31), mode="full")[:blocks] > 0
+    target = np.where(held, depth, 1.0)
+    ramp = 10
+    smooth = np.convolve(np.pad(target, (ramp - 1, 0), mode="edge"), np.ones(ramp) / ramp, mode="valid")
+    centers = (np.arange(blocks) + 0.5) * block
+    return np.interp(np.arange(len(key)), centers, smooth).astype(np.float32)
+
+
+def _write_wav(path: Path, mix, rate: int):
+    samples = (mix * 32767.0).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(samples.tobytes())
@@ -0,0 +1,100 @@
+"""
+Ken Burns: slow zoom on still images for the timeline compositor.
+
+ffmpeg's zoompan works on full-resolution frames and snaps the crop window
+to whole pixels, which is slow and visibly jittery for slow zooms. Instead
+each image is fitted to its box once with Pillow, oversampled by the zoom
+amount so the most zoomed-in frame still has a source pixel per output
+pixel, and cached. Per frame, the `perspective` filter samples the zoomed
+window at subpixel positions and a bilinear scale brings it to box size;
+nothing is decoded or refitted per frame.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from ..config_loader import ROOT_DIR, settings
+from .media_cache import content_digest
+
+PREPARE_VERSION = 1
+
+
+def zoom_amount() -> float:
+    """Extra scale reached at the end of a zoom (0.12 = 112%)."""
+    return settings.getfloat("video", "zoom_amount", fallback=0.12)
+
+
+def prepare_source(
+    path: str,
+    box: Tuple[int, int],
+    mode: Optional[str],
+    crop: Optional[Dict[str, int]] = None,
+    oversample: float = 1.0,
+    cache_dir: Optional[Path] = None
+) -> str:
+    """
+    Crop and fit `path` to `box` scaled by `oversample`, once per image and parameters.
+
+    Opaque results are stored as JPEG, others (or `contain` padding) as PNG.
+    """
+    if cache_dir is None:
+        cache_dir = Path(settings.get("video", "zoom_cache_dir", fallback="tmp/zoom_cache"))
+        if not cache_dir.is_absolute():
+            cache_dir = ROOT_DIR / cache_dir
+    size = (int(round(box[0] * oversample)), int(round(box[1] * oversample)))
+    key = hashlib.sha256(
+        f"{PREPARE_VERSION}:{content_digest(path)}:{size}:{mode}:{sorted((crop or {}).items())}".encode()
+    ).hexdigest()[:32]
+    for suffix in (".jpg", ".png"):
+        cached = Path(cache_dir) / key[:2] / f"{key}{suffix}"
+        if cached.exists():
+            return str(cached)
+
+    with Image.open(path) as image:
+        image.load()
+    if crop:
+        image = image.crop((crop["x"], crop["y"], crop["x"] + crop["width"], crop["y"] + crop["height"]))
+    opaque = "A" not in image.getbands() and "transparency" not in image.info and mode != "contain"
+    image = image.convert("RGB" if opaque else "RGBA")
+    if mode == "cover":
+        image = ImageOps.fit(image, size, Image.LANCZOS)
+    elif mode == "contain":
+        image = ImageOps.pad(image, size, Image.LANCZOS, color=(0, 0, 0, 0))
+    else:
+        image = image.resize(size, Image.LANCZOS)
+
+    output = Path(cache_dir) / key[:2] / f"{key}{'.jpg' if opaque else '.png'}"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    # Per call, not just per process: threads of one worker may prepare the same image at once
+    tmp_path = output.with_name(f"{key}.{os.getpid()}.{id(image)}.tmp{output.suffix}")
+    if opaque:
+        image.save(tmp_path, format="JPEG", quality=95)
+    else:
+        image.save(tmp_path, format="PNG")
+    tmp_path.replace(output)
+    return str(output)
+
+
+def zoom_filters(width: int, height: int, frames: int, amount: float, zoom_in: bool = True) -> List[str]:
+    """
+    Per-frame filters turning a looped oversampled still into a centred zoom at width x height.
+
+    The source is (1 + amount) times the box, so the window shrinks from the
+    whole source (z = 1) to 1/(1 + amount) of it: `in` counts looped frames.
+    """
+    steps = max(frames - 1, 1)
+    progress = f"in/{steps}" if zoom_in else f"(1-in/{steps})"
+    # Inset of the visible window on each side, as a fraction of the source size
+    inset = f"(1-1/(1+{amount:.4f}*{progress}))/2"
+    corners = {
+        "x0": f"W*{inset}", "y0": f"H*{inset}",
+        "x1": f"W-W*{inset}", "y1": f"H*{inset}",
+        "x2": f"W*{inset}", "y2": f"H-H*{inset}",
+        "x3": f"W-W*{inset}", "y3": f"H-H*{inset}",
+    }
+    perspective = "perspective=" + ":".join(f"{k}={v}" for k, v in corners.items()) + ":interpolation=linear:eval=frame"
+    return [perspective, f"scale={width}:{height}:flags=bilinear"]
@@ -0,0 +1,170 @@
+"""
+Media Cache: local copies and probe results for visual/audio sources.
+
+Remote `src` URLs are downloaded once into a content cache keyed by URL, so
+stock media shared by many projects is fetched a single time per host.
+Local paths are resolved against the project root.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import urlparse
+
+from ..config_loader import ROOT_DIR, settings
+from .process_group import managed_process
+
+logger = logging.getLogger(__name__)
+
+
+class MediaError(Exception):
+    """Raised when a media source cannot be fetched or probed."""
+    pass
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    width: int
+    height: int
+    duration: Optional[float]
+    has_audio: bool
+    fps: Optional[float] = None
+    codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+
+
+def _cache_dir() -> Path:
+    path = Path(settings.get("media", "cache_dir", fallback="tmp/media_cache"))
+    return path if path.is_absolute() else ROOT_DIR / path
+
+
+def is_remote(src: str) -> bool:
+    return urlparse(src).scheme in ("http", "https")
+
+
+def fetch_media(src: str) -> str:
+    """Local path for `src`, downloading remote URLs into the cache on first use."""
+    if not is_remote(src):
+        path = Path(src)
+        if not path.is_absolute():
+            path = ROOT_DIR / src
+        if not path.exists():
+            raise MediaError(f"Media file not found: {src}")
+        return str(path)
+
+    suffix = Path(urlparse(src).path).suffix[:8]
+    key = hashlib.sha256(src.encode()).hexdigest()[:32]
+    path = _cache_dir() / key[:2] / f"{key}{suffix}"
+    if path.exists():
+        return str(path)
+
+    import requests
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per download: threads of one process may fetch the same URL at once
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".part", delete=False) as f:
+        tmp_path = Path(f.name)
+    timeout = settings.getfloat("media", "download_timeout", fallback=60.0)
+    logger.info(f"Downloading {src}")
+    try:
+        with requests.get(src, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        tmp_path.replace(path)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        raise MediaError(f"Could not download {src}: {e}") from e
+    return str(path)
+
+
+@asynccontextmanager
+async def cache_lock(path: Path) -> AsyncIterator[None]:
+    """
+    Hold an exclusive flock on `path` (created if needed) for the block.
+
+    Serializes producers of one cache entry across processes and within
+    one, since every holder opens the file anew. Waiting is polled, so it
+    never blocks the event loop and stays cancellable.
+    """
+    with open(path, "w") as lock_file:
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(0.1)
+        yield
+
+
+@lru_cache(maxsize=1024)
+def _digest(path: str, size: int, mtime: float) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def content_digest(path: str) -> str:
+    """SHA-256 of a file's bytes, computed once per file version."""
+    stat = os.stat(path)
+    return _digest(path, stat.st_size, stat.st_mtime)
+
+
+async def run_probe(*args: str) -> str:
+    """stdout of `ffprobe -v error <args>`; the probe is killed if the caller is cancelled."""
+    async with managed_process(
+        "ffprobe", "-v", "error", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    ) as process:
+        stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise MediaError(f"ffprobe failed for {args[-1]}: {stderr.decode(errors='replace').strip()}")
+    return stdout.decode()
+
+
+# (path, mtime) -> MediaInfo, least recently used first
+_probes: "OrderedDict[Tuple[str, float], MediaInfo]" = OrderedDict()
+_PROBE_CACHE_SIZE = 1024
+
+
+async def _probe(path: str) -> MediaInfo:
+    data = json.loads(await run_probe("-show_streams", "-show_format", "-of", "json", path))
+    video = next((s for s in data.get("streams", []) if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise MediaError(f"No video stream in {path}")
+    duration = data.get("format", {}).get("duration") or video.get("duration")
+    num, _, den = video.get("avg_frame_rate", "0/0").partition("/")
+    return MediaInfo(
+        width=int(video["width"]),
+        height=int(video["height"]),
+        duration=float(duration) if duration else None,
+        has_audio=any(s.get("codec_type") == "audio" for s in data.get("streams", [])),
+        fps=float(num) / float(den) if den and float(den) else None,
+        codec=video.get("codec_name"),
+        pix_fmt=video.get("pix_fmt")
+    )
+
+
+async def probe_media(path: str) -> MediaInfo:
+    """Dimensions, duration and audio presence of a local media file (cached per file version)."""
+    key = (path, os.path.getmtime(path))
+    if key in _probes:
+        _probes.move_to_end(key)
+        return _probes[key]
+    info = _probes[key] = await _probe(path)
+    if len(_probes) > _PROBE_CACHE_SIZE:
+        _probes.popitem(last=False)
+    return info
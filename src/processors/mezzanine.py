@@ -0,0 +1,208 @@
+"""
+Mezzanine Cache: VIDEO and GIF sources normalized once for compositing.
+
+A clip is cut to the part a visual plays, cropped, scaled to its box,
+retimed for `speed` and converted to the project frame rate and pixel
+format, so final renders only decode frames they actually show. Results
+are content-addressed: the key is a digest of the source bytes plus the
+normalization parameters, so a stock clip used by many jobs (from any URL
+or path) is transcoded exactly once; a per-key file lock stops concurrent
+workers from doing the same work twice.
+
+Cuts that need no conversion are stream-copied from the keyframe at or
+before the requested start; the remaining distance is returned as the
+clip's `offset` for the consumer to seek past.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config_loader import ROOT_DIR, settings
+from .media_cache import MediaError, cache_lock, content_digest, probe_media, run_probe
+from .process_group import managed_process
+
+logger = logging.getLogger(__name__)
+
+MEZZANINE_VERSION = 1
+# Codecs the compositor decodes cheaply enough to take stream copies as-is
+COPYABLE_CODECS = {"h264", "hevc", "vp9", "av1"}
+
+
+@dataclass(frozen=True)
+class Clip:
+    path: str
+    offset: float       # seconds to skip at the start (non-zero for keyframe-aligned copies)
+    width: int
+    height: int
+    has_audio: bool
+    copied: bool = False
+
+
+async def keyframe_before(path: str, t: float) -> Optional[float]:
+    """Timestamp of the last video keyframe at or before `t` (None if none is found)."""
+    if t <= 0:
+        return 0.0
+    output = await run_probe(
+        "-select_streams", "v:0", "-read_intervals", f"{max(t - 30, 0):.3f}%{t + 0.5:.3f}",
+        "-show_entries", "packet=pts_time,flags", "-of", "json", path
+    )
+    keyframes = [
+        float(p["pts_time"]) for p in json.loads(output).get("packets", [])
+        if "K" in p.get("flags", "") and p.get("pts_time") not in (None, "N/A") and float(p["pts_time"]) <= t
+    ]
+    return max(keyframes) if keyframes else None
+
+
+def _atempo(speed: float) -> List[str]:
+    """atempo accepts 0.5-2.0 per instance; chain instances for larger changes."""
+    filters = []
+    while speed > 2.0:
+        filters.append("atempo=2.0")
+        speed /= 2.0
+    while speed < 0.5:
+        filters.append("atempo=0.5")
+        speed /= 0.5
+    filters.append(f"atempo={speed:.6f}")
+    return filters
+
+
+def _num(value: float) -> str:
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+class MezzanineCache:
+    """Normalizes VIDEO/GIF sources into `cache_dir` at the project frame rate."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, fps: Optional[int] = None):
+        if cache_dir is None:
+            cache_dir = Path(settings.get("media", "mezzanine_dir", fallback="tmp/mezzanine"))
+            if not cache_dir.is_absolute():
+                cache_dir = ROOT_DIR / cache_dir
+        self.cache_dir = Path(cache_dir)
+        self.fps = fps or settings.getint("video", "fps", fallback=30)
+        self.crf = settings.getint("media", "mezzanine_crf", fallback=18)
+
+    async def normalize(
+        self,
+        path: str,
+        kind: str,
+        begin: float,
+        length: float,
+        speed: float = 1.0,
+        crop: Optional[Dict[str, int]] = None,
+        scale: Optional[List[str]] = None,
+    ) -> Clip:
+        """
+        Clip `length` output seconds of `path` starting at source time `begin`.
+
+        Args:
+            kind: "VIDEO" (H.264 + AAC) or "GIF" (looped, alpha-preserving QuickTime RLE)
+            speed: playback rate; the source span read is length * speed
+            crop: {"x", "y", "width", "height"} in source pixels, applied before scaling
+            scale: ffmpeg filters sizing the (cropped) frame to the visual's box
+        """
+        info = await probe_media(path)
+        scale = scale or []
+        copy = (
+            kind == "VIDEO" and speed == 1.0 and not crop and not scale
+            and info.codec in COPYABLE_CODECS and info.pix_fmt == "yuv420p"
+            and info.fps is not None and abs(info.fps - self.fps) < 0.01
+        )
+        keyframe = await keyframe_before(path, begin) if copy else None
+        copy = copy and keyframe is not None
+
+        params = json.dumps([
+            MEZZANINE_VERSION, kind, _num(begin), _num(length), _num(speed), crop, scale, self.fps, self.crf, copy
+        ])
+        digest = await asyncio.to_thread(content_digest, path)
+        key = hashlib.sha256(f"{digest}:{params}".encode()).hexdigest()[:32]
+        suffix = ".mkv" if copy else (".mov" if kind == "GIF" else ".mp4")
+        output = self.cache_dir / key[:2] / f"{key}{suffix}"
+        offset = begin - keyframe if copy else 0.0
+
+        if not output.exists():
+            output.parent.mkdir(parents=True, exist_ok=True)
+            async with cache_lock(output.with_suffix(".lock")):
+                # Another worker may have produced it while we waited
+                if not output.exists():
+                    tmp_path = output.with_name(f"{key}.{uuid.uuid4().hex[:12]}.tmp{suffix}")
+                    if copy:
+                        cmd = self._copy_command(path, keyframe, offset + length, tmp_path)
+                    else:
+                        cmd = self._transcode_command(path, kind, info, begin, length, speed, crop, scale, tmp_path)
+                    logger.info(f"Normalizing {kind} {path} ({'copy' if copy else 'transcode'}) -> {output.name}")
+                    try:
+                        async with managed_process(*cmd, stderr=asyncio.subprocess.PIPE) as process:
+                            _, stderr = await process.communicate()
+                    except asyncio.CancelledError:
+                        tmp_path.unlink(missing_ok=True)
+                        raise
+                    if process.returncode != 0:
+                        tmp_path.unlink(missing_ok=True)
+                        raise MediaError(f"Could not normalize {path}: {stderr.decode(errors='replace').strip()[-500:]}")
+                    tmp_path.replace(output)
+
+        clip_info = await probe_media(str(output))
+        return Clip(
+            path=str(output), offset=offset, width=clip_info.width, height=clip_info.height,
+            has_audio=clip_info.has_audio, copied=copy
+        )
+
+    @staticmethod
+    def _copy_command(path: str, keyframe: float, length: float, output: Path) -> List[str]:
+        return [
+            "ffmpeg", "-y", "-v", "error", "-ss", _num(keyframe), "-i", path, "-t", _num(length),
+            "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", "-avoid_negative_ts", "make_zero", str(output)
+        ]
+
+    def _transcode_command(
+        self,
+        path: str,
+        kind: str,
+        info,
+        begin: float,
+        length: float,
+        speed: float,
+        crop: Optional[Dict[str, int]],
+        scale: List[str],
+        output: Path
+    ) -> List[str]:
+        cmd = ["ffmpeg", "-y", "-v", "error"]
+        if kind == "GIF":
+            cmd.extend(["-ignore_loop", "0"])
+        elif begin:
+            cmd.extend(["-ss", _num(begin)])
+        cmd.extend(["-t", _num(length * speed), "-i", path])
+
+        filters = []
+        if crop:
+            filters.append(f"crop={crop['width']}:{crop['height']}:{crop['x']}:{crop['y']}")
+        filters.extend(scale)
+        if speed != 1.0:
+            filters.append(f"setpts=PTS/{speed:.6f}")
+        filters.append(f"fps={self.fps}")
+        if kind == "VIDEO":
+            # 4:2:0 needs even dimensions; consumers crop the extra row/column back off
+            filters.append("pad=ceil(iw/2)*2:ceil(ih/2)*2")
+        cmd.extend(["-vf", ",".join(filters), "-map", "0:v:0"])
+
+        if kind == "GIF":
+            cmd.extend(["-c:v", "qtrle", "-pix_fmt", "argb", "-an"])
+        else:
+            cmd.extend([
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", str(self.crf), "-pix_fmt", "yuv420p",
+                # Short GOPs keep seeks into the clip cheap
+                "-g", str(self.fps)
+            ])
+            if info.has_audio:
+                cmd.extend(["-map", "0:a:0", "-c:a", "aac", "-b:a", "192k"])
+                if speed != 1.0:
+                    cmd.extend(["-af", ",".join(_atempo(speed))])
+        cmd.extend(["-t", _num(length), str(output)])
+        return cmd
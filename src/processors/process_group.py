@@ -0,0 +1,44 @@
+"""
+Subprocesses that are stopped together with everything they started.
+
+Each child runs in its own session, i.e. its own process group. When the task
+awaiting it is cancelled (a job cancellation or stage timeout), the whole
+group is killed: ffmpeg and its helpers, or node and its headless browser.
+Nothing keeps running once the job is gone.
+"""
+
+import asyncio
+import os
+import signal
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+async def spawn(*cmd: str, **kwargs) -> asyncio.subprocess.Process:
+    """asyncio.create_subprocess_exec in a new process group."""
+    return await asyncio.create_subprocess_exec(*cmd, start_new_session=True, **kwargs)
+
+
+def kill_group(process: asyncio.subprocess.Process):
+    """SIGKILL `process` and every process in its group."""
+    if process.returncode is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+@asynccontextmanager
+async def managed_process(*cmd: str, **kwargs) -> AsyncIterator[asyncio.subprocess.Process]:
+    """
+    Spawn `cmd` in its own process group and kill that group if the block is
+    left before the process exited (cancellation or any error).
+    """
+    process = await spawn(*cmd, **kwargs)
+    try:
+        yield process
+    finally:
+        if process.returncode is None:
+            kill_group(process)
+            await process.wait()
@@ -0,0 +1,67 @@
+"""
+Output renditions: extra copies of a video at other sizes, made in the same
+ffmpeg run as the main output.
+
+The frame is decoded and filtered (compositing, subtitle burn-in) once, then
+`split` feeds one scaler and encoder per rendition. Only the encodes are
+repeated, instead of the whole render per size.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from .process_group import managed_process
+
+
+class RenditionError(Exception):
+    """Raised when renditions cannot be produced."""
+    pass
+
+
+def rendition_path(output_path: str, name: str) -> str:
+    """video_<job>.mp4 -> video_<job>_<name>.mp4"""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_{name}{path.suffix}"))
+
+
+def split_outputs(
+    label: str,
+    renditions: Sequence,
+    frame: Tuple[int, int],
+    output_path: str,
+    main: bool = True
+) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Filtergraph chains fanning the video pad [label] out to the main output and every rendition.
+
+    Returns:
+        (chains, outputs): chains to append to the -filter_complex graph, and
+        (pad label, file path) per output, main output (if `main`) first.
+    """
+    if not renditions:
+        return [], [(label, output_path)] if main else []
+    pads = [f"{label.replace(':', '')}_{i}" for i in range(len(renditions) + int(main))]
+    chains = [f"[{label}]split={len(pads)}" + "".join(f"[{pad}]" for pad in pads)]
+    outputs = [(pads[0], output_path)] if main else []
+    for pad, rendition in zip(pads[int(main):], renditions):
+        width, height = rendition.size(*frame)
+        chains.append(f"[{pad}]scale={width}:{height}:flags=bicubic,setsar=1[{pad}s]")
+        outputs.append((f"{pad}s", rendition_path(output_path, rendition.name)))
+    return chains, outputs
+
+
+async def transcode_renditions(source: str, renditions: Sequence, frame: Tuple[int, int]) -> Dict[str, str]:
+    """
+    Make every rendition of an already encoded video in one decode pass
+    (for renderers that can't add outputs themselves, i.e. zvid).
+    """
+    chains, outputs = split_outputs("0:v", renditions, frame, source, main=False)
+    cmd = ["ffmpeg", "-y", "-v", "error", "-i", source, "-filter_complex", ";".join(chains)]
+    for pad, path in outputs:
+        cmd.extend(["-map", f"[{pad}]", "-map", "0:a?", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "copy", path])
+    async with managed_process(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE) as process:
+        _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RenditionError(f"FFmpeg failed: {stderr.decode(errors='replace').strip()}")
+    return {rendition.name: path for rendition, (_, path) in zip(renditions, outputs)}
@@ -0,0 +1,156 @@
+"""
+Scratch space for per-job work dirs.
+
+Intermediates go to a RAM-backed root (tmpfs; /dev/shm by default) while it
+has room: speech, processed images, sync maps, subtitles and the encode in
+progress. They then never compete with output writes on slow disks. A work dir
+is only placed in RAM if the RAM root's usage plus a per-job reservation fits
+its budget and the filesystem's free space; usage is measured from the work
+dirs themselves, so it covers every worker sharing the root. Otherwise, or
+when no tmpfs is available, it spills to a disk root. Work dirs kept after
+a job finishes (for retimes) are moved to the disk root by retain(), so RAM
+only holds the intermediates of jobs in flight.
+
+Only finished outputs leave scratch: publish() moves them into the output
+directory atomically, so a file there is always complete.
+"""
+
+import errno
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from ..config_loader import ROOT_DIR, settings
+
+logger = logging.getLogger(__name__)
+
+# Present in a work dir while its job is running; only those get the reservation
+LIVE_MARKER = ".live"
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass  # removed while walking
+    return total
+
+
+class ScratchSpace:
+    """Allocates job work dirs in RAM when the budget allows, else on disk."""
+
+    def __init__(
+        self,
+        ram_root: Optional[Path] = None,
+        disk_root: Optional[Path] = None,
+        max_bytes: Optional[int] = None,
+        job_reserve: Optional[int] = None
+    ):
+        if ram_root is None:
+            ram_root = settings.get("scratch", "ram_root", fallback="/dev/shm/json2video")
+        if disk_root is None:
+            disk_root = Path(settings.get("scratch", "disk_root", fallback="tmp/work"))
+            if not disk_root.is_absolute():
+                disk_root = ROOT_DIR / disk_root
+        # An empty ram_root turns RAM scratch off
+        self.ram_root = Path(ram_root) if ram_root else None
+        self.disk_root = Path(disk_root)
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            settings.getint("scratch", "max_mb", fallback=1024) * 2 ** 20
+        # Expected peak size of one job's intermediates; reserved up front
+        self.job_reserve = job_reserve if job_reserve is not None else \
+            settings.getint("scratch", "job_reserve_mb", fallback=256) * 2 ** 20
+
+    def _ram_available(self) -> bool:
+        if self.ram_root is None:
+            return False
+        try:
+            self.ram_root.mkdir(parents=True, exist_ok=True)
+            stat = os.statvfs(self.ram_root)
+        except OSError:
+            return False
+        if stat.f_bavail * stat.f_frsize < self.job_reserve:
+            return False
+        return self.ram_usage() + self.job_reserve <= self.max_bytes
+
+    def ram_usage(self) -> int:
+        """
+        Bytes accounted to the RAM root: each work dir counts its size, and a
+        running job's at least the reservation, since it will still grow.
+        """
+        if self.ram_root is None or not self.ram_root.exists():
+            return 0
+        total = 0
+        for entry in self.ram_root.iterdir():
+            if entry.is_dir():
+                size = _dir_size(entry)
+                total += max(size, self.job_reserve) if (entry / LIVE_MARKER).exists() else size
+        return total
+
+    def allocate(self, name: str) -> Path:
+        """Create and return a fresh work dir `name`."""
+        if self._ram_available():
+            root = self.ram_root
+        else:
+            if self.ram_root is not None:
+                logger.info(f"RAM scratch {self.ram_root} is full or unavailable; spilling {name} to disk")
+            root = self.disk_root
+        work_dir = root / name
+        work_dir.mkdir(parents=True, exist_ok=False)
+        (work_dir / LIVE_MARKER).touch()
+        return work_dir
+
+    def retain(self, work_dir: Path) -> Path:
+        """
+        Keep a finished job's work dir: it leaves RAM for the disk root and no
+        longer holds a reservation. Returns where it now lives.
+        """
+        work_dir = Path(work_dir)
+        (work_dir / LIVE_MARKER).unlink(missing_ok=True)
+        if self.ram_root is None or work_dir.parent != self.ram_root:
+            return work_dir
+        destination = self.disk_root / work_dir.name
+        if destination.exists():
+            logger.warning(f"Cannot move {work_dir} to disk: {destination} already exists")
+            return work_dir
+        try:
+            self.disk_root.mkdir(parents=True, exist_ok=True)
+            shutil.copytree(work_dir, destination)
+        except OSError as e:
+            # Still usable where it is; it merely keeps its RAM until retention removes it
+            logger.warning(f"Could not move {work_dir} to {self.disk_root}: {e}")
+            shutil.rmtree(destination, ignore_errors=True)
+            return work_dir
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return destination
+
+
+def publish(path: str, output_dir: Path) -> str:
+    """
+    Move a finished file into `output_dir` atomically; returns its new path.
+
+    Across filesystems (tmpfs -> disk) the file is copied to a temporary name
+    next to its destination first, so the final rename is still atomic.
+    """
+    source = Path(path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    destination = output_dir / source.name
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        tmp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, destination)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        source.unlink()
+    return str(destination)
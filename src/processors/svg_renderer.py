@@ -0,0 +1,223 @@
+"""
+SVG Renderer: rasterizes SVG visuals once and reuses the result.
+
+Templates repeat the same markup (backgrounds, logos, lower thirds) on
+every render, so PNGs are cached on disk by a hash of the markup and the
+target size. Solid-color SVGs (a single full-canvas rect) are detected and
+never rasterized by an SVG engine: ffmpeg pipelines can use
+`color_source()` instead of an image input, and the PNG fallback is a flat
+Pillow fill.
+
+Rasterization uses cairosvg when installed, else the `rsvg-convert` CLI
+(librsvg); [svg] backend picks one explicitly.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from ..config_loader import ROOT_DIR, settings
+from .process_group import managed_process
+from .text_renderer import TextRenderError, parse_color, parse_length
+
+logger = logging.getLogger(__name__)
+
+# Elements that never paint anything
+NON_DRAWING = {"title", "desc", "metadata"}
+# Attributes that make a rect more than a flat fill
+COMPLEX_ATTRIBUTES = {"transform", "filter", "mask", "clip-path", "style", "rx", "ry"}
+
+RENDER_VERSION = 1
+
+
+class SvgRenderError(Exception):
+    """Raised when SVG markup cannot be rasterized."""
+    pass
+
+
+@dataclass
+class RasterizedSvg:
+    path: str
+    width: int
+    height: int
+    # Set for solid-color SVGs: (r, g, b, a), usable as an ffmpeg color source
+    color: Optional[Tuple[int, int, int, int]] = None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse(markup: str) -> ET.Element:
+    try:
+        root = ET.fromstring(markup)
+    except ET.ParseError as e:
+        raise SvgRenderError(f"Invalid SVG markup: {e}") from e
+    if _local(root.tag) != "svg":
+        raise SvgRenderError("Markup is not an <svg> document")
+    return root
+
+
+def intrinsic_size(markup: str) -> Optional[Tuple[int, int]]:
+    """Size from the width/height attributes, else the viewBox; None if neither is usable."""
+    root = _parse(markup)
+    width, height = parse_length(root.get("width")), parse_length(root.get("height"))
+    if width and height and "%" not in root.get("width", "") + root.get("height", ""):
+        return int(round(width)), int(round(height))
+    view_box = (root.get("viewBox") or "").replace(",", " ").split()
+    if len(view_box) == 4:
+        return int(round(float(view_box[2]))), int(round(float(view_box[3])))
+    return None
+
+
+def _covers_canvas(rect: ET.Element, root: ET.Element) -> bool:
+    view_box = (root.get("viewBox") or "").replace(",", " ").split()
+    canvas = {
+        "width": [root.get("width"), view_box[2] if len(view_box) == 4 else None],
+        "height": [root.get("height"), view_box[3] if len(view_box) == 4 else None],
+    }
+    if len(view_box) == 4 and (float(view_box[0]) or float(view_box[1])):
+        return False
+    if (parse_length(rect.get("x", "0")) or 0) != 0 or (parse_length(rect.get("y", "0")) or 0) != 0:
+        return False
+    for axis in ("width", "height"):
+        value = rect.get(axis, "")
+        if value.strip() == "100%":
+            continue
+        size = parse_length(value)
+        if size is None or all(parse_length(c) != size for c in canvas[axis] if c):
+            return False
+    return True
+
+
+@lru_cache(maxsize=1024)
+def detect_solid_color(markup: str) -> Optional[Tuple[int, int, int, int]]:
+    """RGBA of an SVG that is a single flat full-canvas rect, else None."""
+    try:
+        root = _parse(markup)
+    except SvgRenderError:
+        return None
+    if COMPLEX_ATTRIBUTES & set(root.attrib):
+        return None
+    drawing = [child for child in root if _local(child.tag) not in NON_DRAWING]
+    if len(drawing) != 1 or _local(drawing[0].tag) != "rect" or len(drawing[0]):
+        return None
+    rect = drawing[0]
+    if COMPLEX_ATTRIBUTES & set(rect.attrib) or rect.get("stroke", "none") != "none":
+        return None
+    if not _covers_canvas(rect, root):
+        return None
+    fill = rect.get("fill", "black")
+    if fill.startswith("url("):
+        return None
+    try:
+        color = parse_color(fill) or (0, 0, 0, 0)
+        opacity = 1.0
+        for element, attribute in ((root, "opacity"), (rect, "opacity"), (rect, "fill-opacity")):
+            opacity *= float(element.get(attribute, 1))
+    except (TextRenderError, ValueError):
+        return None
+    return color[:3] + (int(round(color[3] * opacity)),)
+
+
+def color_source(
+    color: Tuple[int, int, int, int],
+    width: int,
+    height: int,
+    duration: float,
+    fps: int = 30
+) -> str:
+    """ffmpeg lavfi source graph producing a flat frame of `color` (use with -f lavfi -i)."""
+    r, g, b, a = color
+    source = f"color=c=0x{r:02x}{g:02x}{b:02x}@{a / 255:.3f}:s={width}x{height}:r={fps}:d={duration}"
+    # color outputs opaque YUV unless asked for an alpha format
+    return source + ",format=rgba" if a < 255 else source
+
+
+def _backend() -> Optional[str]:
+    choice = settings.get("svg", "backend", fallback="auto")
+    if choice in ("auto", "cairosvg"):
+        try:
+            import cairosvg  # noqa: F401
+            return "cairosvg"
+        except ImportError:
+            if choice == "cairosvg":
+                raise SvgRenderError("[svg] backend = cairosvg but cairosvg is not installed")
+    if choice in ("auto", "rsvg-convert") and shutil.which("rsvg-convert"):
+        return "rsvg-convert"
+    if choice not in ("auto", "cairosvg", "rsvg-convert"):
+        raise SvgRenderError(f"Unknown SVG backend '{choice}' (expected auto, cairosvg or rsvg-convert)")
+    return None
+
+
+def rasterizer_available() -> bool:
+    """True if arbitrary SVG markup can be rasterized here (solid colors always can)."""
+    return _backend() is not None
+
+
+class SvgRenderer:
+    """Rasterizes SVG markup to PNG, cached in `cache_dir`."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        if cache_dir is None:
+            cache_dir = Path(settings.get("svg", "cache_dir", fallback="tmp/svg_cache"))
+            if not cache_dir.is_absolute():
+                cache_dir = ROOT_DIR / cache_dir
+        self.cache_dir = Path(cache_dir)
+
+    def can_render(self, markup: str) -> bool:
+        return detect_solid_color(markup) is not None or rasterizer_available()
+
+    async def render(self, markup: str, width: int, height: int) -> RasterizedSvg:
+        """Rasterize `markup` to a width x height PNG (reused if already cached)."""
+        color = detect_solid_color(markup)
+        key = hashlib.sha256(f"{RENDER_VERSION}:{width}x{height}:{markup}".encode()).hexdigest()[:32]
+        path = self.cache_dir / key[:2] / f"{key}.png"
+        if path.exists():
+            return RasterizedSvg(str(path), width, height, color)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{id(path)}.tmp.png")
+        try:
+            if color is not None:
+                await asyncio.to_thread(Image.new("RGBA", (width, height), color).save, tmp_path, format="PNG")
+            else:
+                await self._rasterize(markup, width, height, tmp_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        tmp_path.replace(path)
+        return RasterizedSvg(str(path), width, height, color)
+
+    @staticmethod
+    async def _rasterize(markup: str, width: int, height: int, output: Path):
+        backend = _backend()
+        if backend == "cairosvg":
+            import cairosvg
+            try:
+                await asyncio.to_thread(
+                    cairosvg.svg2png, bytestring=markup.encode(), write_to=str(output),
+                    output_width=width, output_height=height
+                )
+            except Exception as e:
+                raise SvgRenderError(f"cairosvg failed: {e}") from e
+        elif backend == "rsvg-convert":
+            async with managed_process(
+                "rsvg-convert", "-w", str(width), "-h", str(height), "-f", "png", "-o", str(output),
+                stdin=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            ) as process:
+                _, stderr = await process.communicate(markup.encode())
+            if process.returncode != 0:
+                raise SvgRenderError(f"rsvg-convert failed: {stderr.decode().strip()}")
+        else:
+            raise SvgRenderError("No SVG rasterizer available; install cairosvg or librsvg (rsvg-convert)")
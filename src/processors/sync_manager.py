@@ -121,13 +121,32 @@ class SyncManager:
         logger.info(f"Sync map generated at {inputs_txt_path}")
         return str(inputs_txt_path)
 
+    @staticmethod
+    def segment_boundaries(inputs_txt: str) -> List[float]:
+        """
+        Start times of the second and later images in an inputs.txt.
+
+        They are summed from the rounded durations that were written, i.e.
+        exactly where the concat demuxer changes image.
+        """
+        boundaries = []
+        elapsed = 0.0
+        with open(inputs_txt) as f:
+            for line in f:
+                if line.startswith("duration "):
+                    elapsed += float(line.split()[1])
+                    boundaries.append(round(elapsed, 3))
+        # The last image's duration runs to the end of the video, not to another image
+        return boundaries[:-1]
+
     def generate_subtitles(
         self,
         alignment_data: Dict[str, Any],
-        output_dir: str = "/tmp"
+        output_dir: str = "/tmp",
+        words_per_line: int = 4
     ) -> str:
         """
-        Generates subs.ass file with karaoke timing.
+        Generates subs.ass file with karaoke timing, `words_per_line` words per caption.
         """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
@@ -157,7 +176,7 @@ class SyncManager:
         start_times = alignment_data.get('start_times', [])
         end_times = alignment_data.get('end_times', [])
         
-        WORDS_PER_LINE = 4
+        WORDS_PER_LINE = max(int(words_per_line), 1)
         
         # Iterate in chunks
         for i in range(0, len(words), WORDS_PER_LINE):
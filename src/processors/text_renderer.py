@@ -0,0 +1,330 @@
+"""
+Text Renderer: rasterizes TEXT visuals to transparent PNG overlays with Pillow.
+
+Covers the common text styles (fontSize, fontFamily, fontWeight, color,
+backgroundColor, textAlign, letterSpacing, a single textShadow, plus box
+styling: width, height, padding, lineHeight, borderRadius, solid border)
+without a headless browser. Visuals using anything else (HTML, box shadows,
+gradients, ...) are left to the browser path.
+
+Two caches keep repeated titles free:
+- font objects per (file, size), since loading a TTF is the slowest step;
+- rendered PNGs on disk keyed by a hash of text + style + box size, shared
+  by every process on the host.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont
+
+from ..config_loader import ROOT_DIR, settings
+from ..schemas import TextStyle, Visual
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_STYLES = {
+    "fontSize", "fontFamily", "fontWeight", "color", "backgroundColor", "textAlign",
+    "width", "height", "padding", "lineHeight", "borderRadius", "border",
+    "letterSpacing", "textShadow",
+}
+
+WEIGHT_NAMES = {
+    100: ["thin", "hairline"],
+    200: ["extralight", "ultralight"],
+    300: ["light"],
+    400: ["regular", "", "book", "normal"],
+    500: ["medium"],
+    600: ["semibold", "demibold"],
+    700: ["bold"],
+    800: ["extrabold", "ultrabold", "heavy"],
+    900: ["black"],
+}
+_WEIGHT_BY_NAME = {name: weight for weight, names in WEIGHT_NAMES.items() for name in names}
+
+# Bump when layout changes so stale cached PNGs are not reused
+RENDER_VERSION = 1
+
+
+class TextRenderError(Exception):
+    """Raised when a TEXT visual cannot be rasterized."""
+    pass
+
+
+@dataclass
+class RenderedText:
+    path: str
+    width: int
+    height: int
+
+
+def parse_length(value, reference: float = 0.0) -> Optional[float]:
+    """CSS length in px ('72px', '12pt', '50%', 72); None if not understood."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.fullmatch(r"\s*(-?[\d.]+)\s*(px|pt|%)?\s*", str(value))
+    if not match:
+        return None
+    number, unit = float(match.group(1)), match.group(2)
+    if unit == "pt":
+        return number * 4 / 3
+    if unit == "%":
+        return number * reference / 100
+    return number
+
+
+def parse_color(value: Optional[str]) -> Optional[Tuple[int, int, int, int]]:
+    """CSS color to RGBA; accepts rgba() with a 0-1 alpha like browsers do."""
+    if not value or value == "transparent":
+        return None
+    match = re.fullmatch(r"\s*rgba\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*\)\s*", value)
+    if match:
+        r, g, b, a = (float(x) for x in match.groups())
+        return int(r), int(g), int(b), int(round(a * 255 if a <= 1 else a))
+    try:
+        return ImageColor.getcolor(value, "RGBA")
+    except ValueError as e:
+        raise TextRenderError(f"Unsupported color '{value}'") from e
+
+
+def _parse_weight(value) -> int:
+    if value is None:
+        return 400
+    if str(value).isdigit():
+        return int(value)
+    return _WEIGHT_BY_NAME.get(str(value).lower().replace("-", ""), 400)
+
+
+def _parse_padding(value) -> Tuple[float, float, float, float]:
+    """CSS padding shorthand -> (top, right, bottom, left)."""
+    if value is None:
+        return 0.0, 0.0, 0.0, 0.0
+    parts = [parse_length(p) or 0.0 for p in str(value).split()] if isinstance(value, str) else [float(value)]
+    if len(parts) == 1:
+        parts *= 4
+    elif len(parts) == 2:
+        parts = [parts[0], parts[1], parts[0], parts[1]]
+    elif len(parts) == 3:
+        parts = [parts[0], parts[1], parts[2], parts[1]]
+    return tuple(parts[:4])
+
+
+def _parse_border(value) -> Optional[Tuple[float, Tuple[int, int, int, int]]]:
+    """'1px solid <color>' -> (width, rgba); None for other border styles."""
+    match = re.fullmatch(r"\s*([\d.]+)px\s+solid\s+(.+?)\s*", str(value))
+    if not match:
+        return None
+    try:
+        return float(match.group(1)), parse_color(match.group(2))
+    except TextRenderError:
+        return None
+
+
+def _parse_text_shadow(value) -> Optional[Tuple[float, float, float, Tuple[int, int, int, int]]]:
+    """Single 'x y [blur] <color>' shadow -> (x, y, blur, rgba); None for anything else."""
+    match = re.fullmatch(
+        r"\s*(-?[\d.]+)(?:px)?\s+(-?[\d.]+)(?:px)?(?:\s+([\d.]+)(?:px)?)?\s+(.+?)\s*", str(value)
+    )
+    if not match:
+        return None
+    try:
+        color = parse_color(match.group(4))
+    except TextRenderError:
+        return None  # also rejects comma-separated lists of shadows
+    return float(match.group(1)), float(match.group(2)), float(match.group(3) or 0), color
+
+
+def _font_dirs() -> List[Path]:
+    configured = settings.get("text", "font_dirs", fallback="")
+    dirs = [Path(d) for d in configured.split(",") if d.strip()]
+    return dirs + [ROOT_DIR / "fonts", Path.home() / ".fonts", Path("/usr/share/fonts"), Path("/Library/Fonts")]
+
+
+@lru_cache(maxsize=1)
+def _font_index() -> Dict[str, Dict[int, str]]:
+    """Installed font files by normalized family name and weight, e.g. {'inter': {800: '.../Inter-ExtraBold.ttf'}}."""
+    index: Dict[str, Dict[int, str]] = {}
+    for font_dir in _font_dirs():
+        if not font_dir.is_dir():
+            continue
+        for path in sorted(font_dir.rglob("*")):
+            if path.suffix.lower() not in (".ttf", ".otf"):
+                continue
+            if "italic" in path.stem.lower() or "oblique" in path.stem.lower():
+                continue
+            family, _, style = path.stem.partition("-")
+            weight = _WEIGHT_BY_NAME.get(style.lower())
+            if weight is None:
+                continue
+            index.setdefault(family.lower().replace(" ", ""), {}).setdefault(weight, str(path))
+    return index
+
+
+@lru_cache(maxsize=256)
+def resolve_font(family: str, weight: int) -> Optional[str]:
+    """Path of the closest installed weight of `family`, falling back to [text] default_font."""
+    candidates = _font_index().get(family.lower().replace(" ", ""))
+    if not candidates:
+        fallback = settings.get("text", "default_font", fallback="DejaVuSans")
+        if family.lower().replace(" ", "") == fallback.lower():
+            return None
+        logger.debug(f"Font '{family}' not installed, using {fallback}")
+        return resolve_font(fallback, weight)
+    return candidates[min(candidates, key=lambda w: (abs(w - weight), -w))]
+
+
+@lru_cache(maxsize=128)
+def load_font(path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
+    if path is None:
+        return ImageFont.load_default(size)
+    return ImageFont.truetype(path, size)
+
+
+class TextRenderer:
+    """Rasterizes TEXT visuals; results are cached in `cache_dir`."""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        if cache_dir is None:
+            cache_dir = Path(settings.get("text", "cache_dir", fallback="tmp/text_cache"))
+            if not cache_dir.is_absolute():
+                cache_dir = ROOT_DIR / cache_dir
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def can_render(visual: Visual) -> bool:
+        if visual.type != "TEXT" or not visual.text or visual.html:
+            return False
+        style = visual.style.model_dump(exclude_none=True) if visual.style else {}
+        if not set(style) <= SUPPORTED_STYLES:
+            return False
+        if "border" in style and style["border"] != "none" and _parse_border(style["border"]) is None:
+            return False
+        return style.get("textShadow", "none") == "none" or _parse_text_shadow(style["textShadow"]) is not None
+
+    def render(self, visual: Visual, frame_size: Tuple[int, int]) -> RenderedText:
+        """Render `visual.text` to a transparent PNG sized to its text box."""
+        if not self.can_render(visual):
+            raise TextRenderError("Visual uses features the Pillow text renderer does not support")
+        style = (visual.style or TextStyle()).model_dump(exclude_none=True)
+        key_source = json.dumps(
+            [RENDER_VERSION, visual.text, style, visual.width, visual.height, list(frame_size)], sort_keys=True
+        )
+        key = hashlib.sha256(key_source.encode()).hexdigest()[:32]
+        path = self.cache_dir / key[:2] / f"{key}.png"
+        if path.exists():
+            with Image.open(path) as cached:
+                return RenderedText(str(path), cached.width, cached.height)
+
+        image = self._draw(visual.text, style, visual.width, visual.height, frame_size)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent renders of the same title never read a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{id(image)}.tmp")
+        image.save(tmp_path, format="PNG")
+        tmp_path.replace(path)
+        return RenderedText(str(path), image.width, image.height)
+
+    def _draw(
+        self,
+        text: str,
+        style: dict,
+        box_width: Optional[float],
+        box_height: Optional[float],
+        frame_size: Tuple[int, int]
+    ) -> Image.Image:
+        frame_w, frame_h = frame_size
+        font_size = max(int(round(parse_length(style.get("fontSize", "72px")) or 72)), 1)
+        font = load_font(resolve_font(style.get("fontFamily", "Roboto"), _parse_weight(style.get("fontWeight"))), font_size)
+        color = parse_color(style.get("color", "#ffffff")) or (0, 0, 0, 0)
+        background = parse_color(style.get("backgroundColor"))
+        border = _parse_border(style["border"]) if style.get("border", "none") != "none" else None
+        shadow = _parse_text_shadow(style["textShadow"]) if style.get("textShadow", "none") != "none" else None
+        align = style.get("textAlign", "center")
+        spacing = parse_length(style.get("letterSpacing")) or 0.0
+        top, right, bottom, left = _parse_padding(style.get("padding"))
+        line_height = self._line_height(style.get("lineHeight"), font_size)
+
+        width = parse_length(style.get("width"), frame_w) or box_width
+        height = parse_length(style.get("height"), frame_h) or box_height
+        max_text_width = (width or frame_w) - left - right
+
+        measure = lambda line: font.getlength(line) + spacing * len(line)
+        lines = self._wrap(text, measure, max_text_width)
+        line_widths = [measure(line) for line in lines]
+        text_height = line_height * len(lines)
+        width = int(round(width or (max(line_widths, default=0) + left + right)))
+        height = int(round(height or (text_height + top + bottom)))
+
+        image = Image.new("RGBA", (max(width, 1), max(height, 1)), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        radius = parse_length(style.get("borderRadius")) or 0
+        if background or border:
+            outline, outline_width = (border[1], max(int(round(border[0])), 1)) if border else (None, 0)
+            draw.rounded_rectangle((0, 0, width - 1, height - 1), radius=radius, fill=background,
+                                   outline=outline, width=outline_width)
+
+        # Lines are centred vertically in the content box, like a single-line CSS lineHeight box
+        text_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        text_draw = ImageDraw.Draw(text_layer)
+        inner_height = height - top - bottom
+        y = top + (inner_height - text_height) / 2
+        for line, line_width in zip(lines, line_widths):
+            if align in ("left", "start"):
+                x = left
+            elif align in ("right", "end"):
+                x = width - right - line_width
+            else:
+                x = left + (width - left - right - line_width) / 2
+            if spacing:
+                for char in line:
+                    text_draw.text((x, y + line_height / 2), char, font=font, fill=color, anchor="lm")
+                    x += font.getlength(char) + spacing
+            else:
+                text_draw.text((x, y + line_height / 2), line, font=font, fill=color, anchor="lm")
+            y += line_height
+
+        if shadow:
+            offset_x, offset_y, blur, shadow_color = shadow
+            # The glyph alpha, tinted and shifted, is the shadow; blur radius ~ CSS blur / 2
+            shadow_layer = Image.new("RGBA", image.size, shadow_color[:3] + (0,))
+            alpha = text_layer.getchannel("A").point(lambda a: a * shadow_color[3] // 255)
+            shadow_layer.putalpha(alpha)
+            shadow_layer = shadow_layer.transform(
+                image.size, Image.AFFINE, (1, 0, -offset_x, 0, 1, -offset_y)
+            )
+            if blur:
+                shadow_layer = shadow_layer.filter(ImageFilter.GaussianBlur(blur / 2))
+            image.alpha_composite(shadow_layer)
+        image.alpha_composite(text_layer)
+        return image
+
+    @staticmethod
+    def _line_height(value, font_size: int) -> float:
+        # Unitless CSS line-height multiplies the font size
+        if isinstance(value, (int, float)) or (isinstance(value, str) and re.fullmatch(r"\s*[\d.]+\s*", value)):
+            return float(value) * font_size
+        return parse_length(value, font_size) or font_size * 1.2
+
+    @staticmethod
+    def _wrap(text: str, measure, max_width: float) -> List[str]:
+        """Greedy word wrap honouring explicit newlines."""
+        lines = []
+        for paragraph in text.split("\n"):
+            current = ""
+            for word in paragraph.split(" "):
+                candidate = f"{current} {word}" if current else word
+                if current and measure(candidate) > max_width:
+                    lines.append(current)
+                    current = word
+                else:
+                    current = candidate
+            lines.append(current)
+        return lines
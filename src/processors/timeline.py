@@ -0,0 +1,557 @@
+"""
+Timeline Compositor: renders a project's layered visuals in one ffmpeg pass.
+
+Visuals are compiled into layers ordered by `track` (then list order) and
+composited over the background with an overlay chain. Every layer is shifted
+to its own [enterBegin, exitEnd] window with setpts and its overlay is only
+enabled inside that window; video inputs are cut to the window and stills
+are decoded once, so decoding and blending cost follows what is on screen
+rather than the total number of visuals. An interval index over the windows also drops
+layers that fully opaque, full-frame layers above them hide for their whole
+window.
+
+Plain TEXT and SVG visuals come from the Pillow text renderer and the SVG
+cache; solid-color SVGs become lavfi color sources. Projects using features
+the compositor does not implement (see `unsupported_reason`) are left to zvid.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from ..config_loader import settings
+from ..cost_model import resolve_resolution
+from ..schemas import VideoProject, Visual
+from .audio_processor import AudioProcessor
+from .ken_burns import prepare_source, zoom_amount, zoom_filters
+from .media_cache import fetch_media, probe_media
+from .mezzanine import MezzanineCache
+from .process_group import managed_process
+from .renditions import rendition_path, split_outputs
+from .svg_renderer import SvgRenderer, color_source, intrinsic_size
+from .text_renderer import TextRenderer, parse_color
+
+logger = logging.getLogger(__name__)
+
+# Fraction of the element (or free frame space) at each named anchor/position
+ANCHORS = {
+    "top-left": (0.0, 0.0), "top-center": (0.5, 0.0), "top-right": (1.0, 0.0),
+    "center-left": (0.0, 0.5), "center": (0.5, 0.5), "center-center": (0.5, 0.5), "center-right": (1.0, 0.5),
+    "bottom-left": (0.0, 1.0), "bottom-center": (0.5, 1.0), "bottom-right": (1.0, 1.0),
+}
+ANIMATIONS = {None, "fade"}
+
+
+class TimelineError(Exception):
+    """Raised when a project cannot be composited."""
+    pass
+
+
+class IntervalIndex:
+    """
+    Static index of half-open intervals [start, end) with payloads.
+
+    Items are sorted by start; an interval overlapping [a, b) must start in
+    [a - longest, b), which two bisections bound before the final filter.
+    """
+
+    def __init__(self, items: Iterable[Tuple[float, float, Any]]):
+        self._items = sorted((i for i in items if i[1] > i[0]), key=lambda i: i[0])
+        self._starts = [i[0] for i in self._items]
+        self._longest = max((e - s for s, e, _ in self._items), default=0.0)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def overlapping(self, start: float, end: float) -> List[Tuple[float, float, Any]]:
+        lo = bisect.bisect_left(self._starts, start - self._longest)
+        hi = bisect.bisect_left(self._starts, end)
+        return [item for item in self._items[lo:hi] if item[1] > start]
+
+    def active_at(self, t: float) -> List[Any]:
+        lo = bisect.bisect_left(self._starts, t - self._longest)
+        hi = bisect.bisect_right(self._starts, t)
+        return [payload for s, e, payload in self._items[lo:hi] if e > t]
+
+    def max_concurrency(self) -> int:
+        """Largest number of intervals active at the same instant."""
+        events = sorted([(s, 1) for s, _, _ in self._items] + [(e, -1) for _, e, _ in self._items])
+        active = peak = 0
+        for _, delta in events:
+            active += delta
+            peak = max(peak, active)
+        return peak
+
+
+@dataclass
+class Layer:
+    index: int                      # position in project.visuals
+    visual: Visual
+    start: float
+    end: float
+    input_args: List[str]
+    width: int
+    height: int
+    left: int
+    top: int
+    filters: List[str] = field(default_factory=list)
+    opaque: bool = False            # fully covers the frame with no transparency
+    solid: Tuple[float, float] = (0.0, 0.0)   # part of the window with no fades
+    audio_volume: float = 0.0
+    audio_source: Optional[str] = None   # normalized clip carrying this layer's sound
+    audio_offset: float = 0.0
+
+    @property
+    def z(self) -> Tuple[int, int]:
+        return (self.visual.track or 0, self.index)
+
+
+def visual_window(visual: Visual, duration: float) -> Tuple[float, float]:
+    start = visual.enterBegin or 0.0
+    if visual.exitEnd is not None:
+        end = visual.exitEnd
+    elif visual.duration:
+        end = start + visual.duration
+    else:
+        end = duration
+    return max(start, 0.0), min(end, duration)
+
+
+def _crop(params: Optional[dict]) -> Optional[Dict[str, int]]:
+    """cropParams as integer x/y/width/height, or None when absent."""
+    if not params:
+        return None
+    try:
+        crop = {key: int(round(float(params.get(key, 0)))) for key in ("x", "y", "width", "height")}
+    except (TypeError, ValueError) as e:
+        raise TimelineError(f"Invalid cropParams {params}: {e}") from e
+    if crop["width"] <= 0 or crop["height"] <= 0:
+        raise TimelineError(f"Invalid cropParams {params}: width and height must be positive")
+    return crop
+
+
+def _image_info(path: str) -> Tuple[Tuple[int, int], bool]:
+    """Size of an image file and whether it is fully opaque (no alpha band or transparency)."""
+    with Image.open(path) as image:
+        return image.size, "A" not in image.getbands() and "transparency" not in image.info
+
+
+def _hex(color: Tuple[int, int, int, int]) -> str:
+    r, g, b, a = color
+    return f"0x{r:02x}{g:02x}{b:02x}" + (f"@{a / 255:.3f}" if a < 255 else "")
+
+
+def _num(value: float) -> str:
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+class TimelineCompositor:
+    """Compiles a VideoProject into a single ffmpeg overlay graph and runs it."""
+
+    def __init__(
+        self,
+        fps: Optional[int] = None,
+        text_renderer: Optional[TextRenderer] = None,
+        svg_renderer: Optional[SvgRenderer] = None,
+        mezzanine: Optional[MezzanineCache] = None
+    ):
+        self.fps = fps or settings.getint("video", "fps", fallback=30)
+        self.text_renderer = text_renderer or TextRenderer()
+        self.svg_renderer = svg_renderer or SvgRenderer()
+        self.mezzanine = mezzanine or MezzanineCache(fps=self.fps)
+        self.stage_timings: Dict[str, float] = {}
+
+    @staticmethod
+    def unsupported_reason(project: VideoProject) -> Optional[str]:
+        """Why this project needs zvid, or None if the compositor can render it."""
+        if project.subtitle:
+            return "subtitles"
+        svg_renderer = SvgRenderer()
+        for visual in project.visuals:
+            if visual.enterAnimation not in ANIMATIONS or visual.exitAnimation not in ANIMATIONS:
+                return f"'{visual.enterAnimation or visual.exitAnimation}' animation"
+            for feature in ("transition", "chromaKey", "filter"):
+                if getattr(visual, feature):
+                    return feature
+            if visual.zoom and visual.type != "IMAGE":
+                return f"zoom on {visual.type}"
+            if visual.type in ("VIDEO", "GIF") and (visual.speed or 1.0) <= 0:
+                return "non-positive playback speed"
+            if visual.type == "TEXT" and not TextRenderer.can_render(visual):
+                return "HTML or unsupported text styles"
+            if visual.type == "SVG" and not (visual.svg and svg_renderer.can_render(visual.svg)):
+                return "SVG rasterization"
+            if visual.type in ("IMAGE", "VIDEO", "GIF") and not visual.src:
+                return f"{visual.type} without src"
+        return None
+
+    @contextmanager
+    def _stage(self, name: str, on_stage: Optional[Callable[[str], None]]):
+        if on_stage:
+            on_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = round(time.perf_counter() - start, 3)
+
+    async def render(
+        self,
+        project: VideoProject,
+        output_path: str,
+        on_stage: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[float], None]] = None
+    ) -> str:
+        """Render `project` to `output_path`; on_progress receives 0-1 while encoding."""
+        self.stage_timings = {}
+        with self._stage("images", on_stage):
+            layers = await self.compile(project)
+            audio_configs = await self.audio_configs(project, layers)
+        with self._stage("encode", on_stage):
+            # Audio is mixed in-process to PCM and encoded once, with the video
+            mix_path = None
+            if audio_configs:
+                mix_path = await AudioProcessor.mix_audios(
+                    audio_configs, project.duration, str(Path(output_path).with_suffix(".mix.wav"))
+                )
+            try:
+                cmd = self.build_command(project, layers, mix_path, output_path)
+                await self._run(cmd, project.duration, on_progress)
+            except asyncio.CancelledError:
+                for path in [output_path, *self.rendition_paths(project, output_path).values()]:
+                    Path(path).unlink(missing_ok=True)
+                raise
+            finally:
+                if mix_path:
+                    Path(mix_path).unlink(missing_ok=True)
+        return output_path
+
+    @staticmethod
+    def rendition_paths(project: VideoProject, output_path: str) -> Dict[str, str]:
+        """Where render() writes each of the project's renditions."""
+        return {r.name: rendition_path(output_path, r.name) for r in project.renditions}
+
+    @staticmethod
+    async def audio_configs(project: VideoProject, layers: List[Layer]) -> List[dict]:
+        """mix_audios configs for the project's audios and the sound of visible VIDEO layers."""
+        # One fetch per distinct source, however many tracks use it
+        sources = list(dict.fromkeys(a.src for a in project.audios))
+        paths = dict(zip(sources, await asyncio.gather(*(asyncio.to_thread(fetch_media, src) for src in sources))))
+        configs = [
+            {"src": paths[audio.src], "volume": audio.volume, "videoBegin": audio.videoBegin,
+             "audioBegin": audio.audioBegin, "audioEnd": audio.audioEnd, "duck": audio.duck}
+            for audio in project.audios
+        ]
+        for layer in layers:
+            if layer.audio_source and layer.audio_volume:
+                configs.append({
+                    "src": layer.audio_source, "volume": layer.audio_volume, "videoBegin": layer.start,
+                    "audioBegin": layer.audio_offset, "audioEnd": layer.audio_offset + layer.end - layer.start
+                })
+        return configs
+
+    async def compile(self, project: VideoProject) -> List[Layer]:
+        """Resolve, size and place every visible visual; returns layers bottom to top."""
+        frame = resolve_resolution(project)
+        windows = [visual_window(v, project.duration) for v in project.visuals]
+        media = {
+            i: v.src for i, v in enumerate(project.visuals)
+            if v.type in ("IMAGE", "VIDEO", "GIF") and windows[i][1] > windows[i][0]
+        }
+        # One fetch per distinct source, however many visuals use it
+        sources = list(dict.fromkeys(media.values()))
+        fetched = dict(zip(sources, await asyncio.gather(*(asyncio.to_thread(fetch_media, src) for src in sources))))
+        paths = {i: fetched[src] for i, src in media.items()}
+
+        layers = []
+        for i, visual in enumerate(project.visuals):
+            start, end = windows[i]
+            if end <= start:
+                continue
+            layers.append(await self._layer(i, visual, start, end, paths.get(i), frame))
+        layers.sort(key=lambda layer: layer.z)
+        return self._cull(layers)
+
+    async def _layer(
+        self,
+        index: int,
+        visual: Visual,
+        start: float,
+        end: float,
+        path: Optional[str],
+        frame: Tuple[int, int]
+    ) -> Layer:
+        # Stills enter the graph as a single frame: it is decoded, scaled and
+        # converted once and the overlay holds it (eof_action=repeat) for the
+        # window. Only fades need the frame repeated, and only then is it looped.
+        filters: List[str] = []
+        pad: List[str] = []
+        opaque_source = False
+        audio_volume = 0.0
+        audio_source, audio_offset = None, 0.0
+        moving = visual.type in ("VIDEO", "GIF")
+        zoom = visual.type == "IMAGE" and bool(visual.zoom)
+
+        if visual.type == "TEXT":
+            rendered = await asyncio.to_thread(self.text_renderer.render, visual, frame)
+            width, height = rendered.width, rendered.height
+            input_args = ["-i", rendered.path]
+        elif visual.type == "SVG":
+            if visual.width and visual.height:
+                width, height = int(visual.width), int(visual.height)
+            elif visual.resize:
+                width, height = frame
+            else:
+                width, height = intrinsic_size(visual.svg) or frame
+            rendered = await self.svg_renderer.render(visual.svg, width, height)
+            if rendered.color:
+                input_args = ["-f", "lavfi", "-i", color_source(rendered.color, width, height, 1, self.fps)]
+                filters.append("trim=end_frame=1")
+                opaque_source = rendered.color[3] == 255
+            else:
+                input_args = ["-i", rendered.path]
+        else:
+            crop = _crop(visual.cropParams)
+            if visual.type == "IMAGE":
+                source_size, opaque_source = await asyncio.to_thread(_image_info, path)
+                input_args = ["-i", path]
+                if crop:
+                    filters.append(f"crop={crop['width']}:{crop['height']}:{crop['x']}:{crop['y']}")
+            else:
+                info = await probe_media(path)
+                source_size = (info.width, info.height)
+            if crop:
+                source_size = (crop["width"], crop["height"])
+            width, height, scale, pad = self._fit(visual, source_size, frame)
+
+            if visual.type in ("VIDEO", "GIF"):
+                # Cut, crop, scale and retime once into the mezzanine cache;
+                # the final graph only places the normalized frames
+                speed = visual.speed or 1.0
+                seek = visual.videoBegin or 0.0
+                length = end - start
+                if visual.videoEnd is not None:
+                    length = min(length, (visual.videoEnd - seek) / speed)
+                clip = await self.mezzanine.normalize(
+                    path, visual.type, begin=seek if visual.type == "VIDEO" else 0.0,
+                    length=length, speed=speed, crop=crop, scale=scale
+                )
+                input_args = (["-ss", _num(clip.offset)] if clip.offset else []) + ["-i", clip.path]
+                if (clip.width, clip.height) != (width, height):
+                    filters.append(f"crop={width}:{height}:0:0")
+                opaque_source = visual.type == "VIDEO"
+                if clip.has_audio:
+                    audio_volume = visual.volume if visual.volume is not None else 1.0
+                    audio_source, audio_offset = clip.path, clip.offset
+            elif zoom:
+                # Cropped, fitted and oversampled once; only the zoom itself runs per frame
+                source = await asyncio.to_thread(
+                    prepare_source, path, (width, height), visual.resize or "stretch",
+                    crop=crop, oversample=1 + zoom_amount()
+                )
+                input_args = ["-i", source]
+                filters, pad = [], []
+                opaque_source = source.endswith(".jpg")
+            else:
+                filters.extend(scale)
+            opaque_source = opaque_source and not pad
+
+        left, top = self._place(visual, width, height, frame)
+        angle = (visual.angle or 0.0) % 360
+        opacity = visual.opacity if visual.opacity is not None else 1.0
+        fade_in = visual.enterAnimation == "fade" and visual.enterEnd is not None and visual.enterEnd > start
+        fade_out = visual.exitAnimation == "fade" and visual.exitBegin is not None and visual.exitBegin < end
+
+        # Alpha is only carried through when the source or an effect makes the layer transparent
+        if not opaque_source or angle or opacity < 1 or fade_in or fade_out:
+            filters.append("format=yuva420p")
+        elif not moving:
+            filters.append("format=yuv420p")
+        filters.extend(pad)
+        if visual.flipH:
+            filters.append("hflip")
+        if visual.flipV:
+            filters.append("vflip")
+        if opacity < 1:
+            filters.append(f"lut=a=val*{_num(opacity)}")
+        rotation = []
+        if angle:
+            radians = math.radians(angle)
+            rotated_w = int(math.ceil(abs(width * math.cos(radians)) + abs(height * math.sin(radians))))
+            rotated_h = int(math.ceil(abs(width * math.sin(radians)) + abs(height * math.cos(radians))))
+            rotation = [f"rotate={radians:.6f}:ow={rotated_w}:oh={rotated_h}:c=none"]
+        if not zoom:
+            filters.extend(rotation)
+
+        if moving:
+            filters.append(f"setpts=PTS-STARTPTS+{_num(start)}/TB")
+        elif fade_in or fade_out or zoom:
+            frames = max(int(math.ceil((end - start) * self.fps)), 1)
+            filters.append(f"loop=loop={frames - 1}:size=1")
+            filters.append(f"setpts=N/({self.fps}*TB)+{_num(start)}/TB")
+            if zoom:
+                # Alternate zooming in and out so consecutive slides don't all push the same way
+                filters.extend(zoom_filters(width, height, frames, zoom_amount(), zoom_in=index % 2 == 0))
+                filters.extend(rotation)
+        else:
+            filters.append(f"setpts={_num(start)}/TB")
+        if angle:
+            # CSS rotates around the element's centre
+            left += (width - rotated_w) / 2
+            top += (height - rotated_h) / 2
+            width, height = rotated_w, rotated_h
+
+        solid_start, solid_end = start, end
+        if fade_in:
+            filters.append(f"fade=t=in:st={_num(start)}:d={_num(visual.enterEnd - start)}:alpha=1")
+            solid_start = visual.enterEnd
+        if fade_out:
+            filters.append(f"fade=t=out:st={_num(visual.exitBegin)}:d={_num(end - visual.exitBegin)}:alpha=1")
+            solid_end = visual.exitBegin
+
+        left, top = int(round(left)), int(round(top))
+        opaque = (
+            opaque_source and not angle and opacity >= 1
+            and left <= 0 and top <= 0 and left + width >= frame[0] and top + height >= frame[1]
+        )
+        return Layer(
+            index=index, visual=visual, start=start, end=end, input_args=input_args,
+            width=width, height=height, left=left, top=top, filters=filters,
+            opaque=opaque, solid=(solid_start, solid_end), audio_volume=audio_volume,
+            audio_source=audio_source, audio_offset=audio_offset
+        )
+
+    @staticmethod
+    def _fit(
+        visual: Visual,
+        source: Tuple[int, int],
+        frame: Tuple[int, int]
+    ) -> Tuple[int, int, List[str], List[str]]:
+        """Box size plus scale and (transparent) pad filters, per width/height/resize."""
+        source_w, source_h = source
+        mode = visual.resize
+        if visual.width and visual.height:
+            width, height = visual.width, visual.height
+            mode = mode or "stretch"
+        elif visual.width:
+            width, height = visual.width, visual.width * source_h / source_w
+            mode = "stretch"
+        elif visual.height:
+            width, height = visual.height * source_w / source_h, visual.height
+            mode = "stretch"
+        elif mode:
+            width, height = frame
+        else:
+            return source_w, source_h, [], []
+
+        width, height = max(int(round(width)), 1), max(int(round(height)), 1)
+        if (width, height) == (source_w, source_h):
+            return width, height, [], []
+        if mode == "cover":
+            return width, height, [
+                f"scale={width}:{height}:force_original_aspect_ratio=increase", f"crop={width}:{height}"
+            ], []
+        if mode == "contain":
+            return width, height, [f"scale={width}:{height}:force_original_aspect_ratio=decrease"], [
+                f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2:color=black@0"
+            ]
+        return width, height, [f"scale={width}:{height}"], []
+
+    @staticmethod
+    def _place(visual: Visual, width: int, height: int, frame: Tuple[int, int]) -> Tuple[float, float]:
+        """Top-left corner: x/y pin the anchor point, else the position preset aligns the box in the frame."""
+        if visual.x is not None or visual.y is not None or visual.position == "custom":
+            # Without an explicit anchor, x/y address the element's top-left corner
+            anchor = visual.anchor if "anchor" in visual.model_fields_set else "top-left"
+            ax, ay = ANCHORS.get(anchor or "top-left", (0.0, 0.0))
+            return (visual.x or 0.0) - ax * width, (visual.y or 0.0) - ay * height
+        fx, fy = ANCHORS.get(visual.position or "center", (0.5, 0.5))
+        return fx * (frame[0] - width), fy * (frame[1] - height)
+
+    @staticmethod
+    def _cull(layers: List[Layer]) -> List[Layer]:
+        """Drop silent layers that opaque full-frame layers above them hide for their whole window."""
+        occluders = IntervalIndex(
+            (layer.solid[0], layer.solid[1], layer.z) for layer in layers if layer.opaque
+        )
+        if not len(occluders):
+            return layers
+        visible = []
+        for layer in layers:
+            covered_until = layer.start
+            if not layer.audio_volume:
+                for start, end, z in sorted(occluders.overlapping(layer.start, layer.end)):
+                    if z <= layer.z or start > covered_until:
+                        continue
+                    covered_until = max(covered_until, end)
+            if covered_until >= layer.end:
+                logger.debug(f"Skipping visual {layer.index}: hidden for its whole window")
+                continue
+            visible.append(layer)
+        return visible
+
+    def build_command(
+        self,
+        project: VideoProject,
+        layers: List[Layer],
+        audio_path: Optional[str],
+        output_path: str
+    ) -> List[str]:
+        frame_w, frame_h = resolve_resolution(project)
+        background = _hex(parse_color(project.backgroundColor or "#000000") or (0, 0, 0, 255))
+        cmd = [
+            "ffmpeg", "-y", "-v", "error", "-nostats", "-progress", "pipe:1",
+            "-f", "lavfi", "-i", f"color=c={background}:s={frame_w}x{frame_h}:r={self.fps}:d={_num(project.duration)}",
+        ]
+        graph = []
+        current = "0:v"
+        for n, layer in enumerate(layers, start=1):
+            cmd.extend(layer.input_args)
+            graph.append(f"[{n}:v]{','.join(layer.filters)}[l{n}]")
+            graph.append(
+                f"[{current}][l{n}]overlay=x={layer.left}:y={layer.top}:eof_action=repeat"
+                f":enable='between(t,{_num(layer.start)},{_num(layer.end)})'[v{n}]"
+            )
+            current = f"v{n}"
+        graph.append(f"[{current}]format=yuv420p[vout]")
+        # Renditions branch off the composited frame; only scaling and encoding repeat per size
+        chains, outputs = split_outputs("vout", project.renditions, (frame_w, frame_h), output_path)
+        graph.extend(chains)
+        if audio_path:
+            cmd.extend(["-i", audio_path])
+
+        cmd.extend(["-filter_complex", ";".join(graph)])
+        for pad, path in outputs:
+            cmd.extend(["-map", f"[{pad}]"])
+            if audio_path:
+                cmd.extend(["-map", f"{len(layers) + 1}:a", "-c:a", "aac", "-b:a", "192k"])
+            cmd.extend([
+                "-c:v", "libx264", "-pix_fmt", "yuv420p", "-r", str(self.fps),
+                "-t", _num(project.duration), path
+            ])
+        return cmd
+
+    async def _run(self, cmd: List[str], duration: float, on_progress: Optional[Callable[[float], None]]):
+        logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
+        async with managed_process(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE) as process:
+            stderr_task = asyncio.create_task(process.stderr.read())
+            async for line in process.stdout:
+                key, _, value = line.decode(errors="replace").strip().partition("=")
+                if not on_progress:
+                    continue
+                if key == "out_time_us" and value.isdigit() and duration:
+                    on_progress(min(int(value) / 1e6 / duration, 1.0))
+                elif key == "progress" and value == "end":
+                    on_progress(1.0)
+            stderr = await stderr_task
+            returncode = await process.wait()
+        if returncode != 0:
+            raise TimelineError(f"FFmpeg failed: {stderr.decode(errors='replace').strip()}")
@@ -0,0 +1,349 @@
+"""
+Text-to-speech backends used by VoiceGenerator.
+
+Backends return ElevenLabs-style character alignment
+(characters / character_start_times_seconds / character_end_times_seconds),
+which VoiceGenerator turns into word timings.
+
+- ElevenLabsBackend: the hosted ElevenLabs API (paid quota).
+- LocalTTSBackend: offline synthetic speech (tones or silence) with realistic
+  word timing and configurable latency, for load tests and air-gapped hosts.
+"""
+
+import asyncio
+import math
+import os
+import random
+import wave
+from abc import ABC, abstractmethod
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from ..config_loader import settings
+from .process_group import managed_process
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ID = "eleven_multilingual_v2"
+
+
+class VoiceGenerationError(Exception):
+    """Raised when voice generation fails."""
+    pass
+
+
+class TTSBackend(ABC):
+    """
+    Interface every TTS backend implements.
+    """
+
+    name = "base"
+
+    def __init__(self, voice_id: Optional[str] = None):
+        self.voice_id = voice_id or settings.get('elevenlabs', 'voice_id', fallback='Qggl4b0xRMiqOwhPtVWT')
+
+    @abstractmethod
+    async def synthesize(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        voice_settings: Optional[dict] = None
+    ) -> None:
+        """Write speech audio for text to output_path."""
+
+    @abstractmethod
+    async def synthesize_with_timestamps(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        voice_settings: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """Write speech audio to output_path and return character-level alignment."""
+
+    async def validate(self) -> bool:
+        """Check that the backend is usable (credentials, binaries...)."""
+        return True
+
+
+class ElevenLabsBackend(TTSBackend):
+    """
+    ElevenLabs API backend. The SDK is blocking, so calls run in a worker
+    thread to keep the event loop (and other jobs) responsive.
+    """
+
+    name = "elevenlabs"
+
+    def __init__(self, api_key: Optional[str] = None, voice_id: Optional[str] = None):
+        super().__init__(voice_id)
+        _load_env()
+        self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
+        if not self.api_key:
+            logger.warning("ELEVENLABS_API_KEY not found in environment variables")
+
+        self.model_id = settings.get('elevenlabs', 'model_id', fallback=DEFAULT_MODEL_ID)
+
+        # Initialize ElevenLabs client
+        if self.api_key:
+            from elevenlabs.client import ElevenLabs
+            # Bounds how long an abandoned request (cancelled job) keeps its thread busy
+            self.client = ElevenLabs(
+                api_key=self.api_key, timeout=settings.getfloat('elevenlabs', 'timeout', fallback=120.0)
+            )
+        else:
+            self.client = None
+
+    def _require_client(self):
+        if not self.api_key or not self.client:
+            raise VoiceGenerationError("ELEVENLABS_API_KEY environment variable not set")
+
+    async def synthesize(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        voice_settings: Optional[dict] = None
+    ) -> None:
+        self._require_client()
+
+        def _convert() -> bytes:
+            # The convert method returns a generator of audio chunks
+            audio_generator = self.client.text_to_speech.convert(
+                voice_id=voice_id or self.voice_id,
+                text=text,
+                model_id=self.model_id,
+                voice_settings=voice_settings
+            )
+            return b''.join(chunk for chunk in audio_generator if chunk)
+
+        audio_data = await asyncio.to_thread(_convert)
+        with open(output_path, 'wb') as f:
+            f.write(audio_data)
+        logger.info(f"Audio size: {len(audio_data) / 1024:.2f} KB")
+
+    async def synthesize_with_timestamps(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        voice_settings: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        self._require_client()
+        import base64
+
+        response = await asyncio.to_thread(
+            self.client.text_to_speech.convert_with_timestamps,
+            voice_id=voice_id or self.voice_id,
+            text=text,
+            model_id=self.model_id,
+            voice_settings=voice_settings
+        )
+
+        # Attribute is audio_base_64
+        with open(output_path, "wb") as f:
+            f.write(base64.b64decode(response.audio_base_64))
+
+        alignment_obj = response.alignment
+        return {
+            "characters": alignment_obj.characters,
+            "character_start_times_seconds": alignment_obj.character_start_times_seconds,
+            "character_end_times_seconds": alignment_obj.character_end_times_seconds
+        }
+
+    async def validate(self) -> bool:
+        if not self.api_key or not self.client:
+            logger.error("No API key to validate")
+            return False
+
+        try:
+            # Try to get voices to validate the API key
+            voices = await asyncio.to_thread(self.client.voices.get_all)
+            if voices:
+                logger.info("ElevenLabs API key validated successfully")
+                logger.info(f"Available voices: {len(voices.voices)}")
+                return True
+            logger.error("API key validation failed: No voices returned")
+            return False
+        except Exception as e:
+            logger.error(f"Error validating API key: {e}")
+            return False
+
+
+class LocalTTSBackend(TTSBackend):
+    """
+    Offline backend producing synthetic speech with plausible timing.
+
+    Word durations scale with word length around the configured speaking rate,
+    punctuation adds pauses, and a small jitter (seeded from the text, so
+    output is deterministic) avoids perfectly uniform timing. Each word is
+    rendered as a short tone (or silence) so the result can be mixed and
+    encoded like real narration.
+    """
+
+    name = "local"
+
+    SAMPLE_RATE = 22050
+    PAUSES = {",": 0.15, ";": 0.2, ":": 0.2, ".": 0.35, "!": 0.35, "?": 0.35}
+
+    def __init__(
+        self,
+        voice_id: Optional[str] = None,
+        words_per_minute: Optional[float] = None,
+        latency: Optional[float] = None,
+        latency_per_char: Optional[float] = None,
+        audio: Optional[str] = None
+    ):
+        super().__init__(voice_id)
+        self.words_per_minute = words_per_minute if words_per_minute is not None else \
+            settings.getfloat('tts', 'local_words_per_minute', fallback=160.0)
+        # Simulated request latency: latency + latency_per_char * len(text)
+        self.latency = latency if latency is not None else \
+            settings.getfloat('tts', 'local_latency', fallback=0.0)
+        self.latency_per_char = latency_per_char if latency_per_char is not None else \
+            settings.getfloat('tts', 'local_latency_per_char', fallback=0.0)
+        self.audio = audio or settings.get('tts', 'local_audio', fallback='tone')
+        if self.audio not in ("tone", "silence"):
+            raise VoiceGenerationError(f"Unknown local TTS audio mode: {self.audio}")
+
+    def build_alignment(self, text: str) -> Dict[str, Any]:
+        """Character-level alignment for text, in ElevenLabs format."""
+        rng = random.Random(text)
+        # Average English word is ~5 letters; spread the per-word budget over letters
+        seconds_per_word = 60.0 / self.words_per_minute
+        per_char = seconds_per_word / 5.0
+
+        characters, starts, ends = [], [], []
+        t = 0.0
+        pause = 0.0
+        for char in text:
+            if char.isspace():
+                # Punctuation pauses land in the gap, not inside the word
+                duration = 0.02 + pause
+                pause = 0.0
+            elif char in self.PAUSES:
+                duration = per_char * 0.5
+                pause = self.PAUSES[char]
+            else:
+                duration = per_char * rng.uniform(0.8, 1.2)
+            characters.append(char)
+            starts.append(round(t, 3))
+            t += duration
+            ends.append(round(t, 3))
+        return {
+            "characters": characters,
+            "character_start_times_seconds": starts,
+            "character_end_times_seconds": ends
+        }
+
+    def _render_pcm(self, alignment: Dict[str, Any], voice_id: str) -> bytes:
+        """16-bit mono PCM: a tone while letters are spoken, silence elsewhere."""
+        sr = self.SAMPLE_RATE
+        total = alignment["character_end_times_seconds"][-1] if alignment["characters"] else 0.0
+        samples = array('h', bytes(2 * (int(total * sr) + sr // 2)))  # + 0.5s tail
+        if self.audio == "silence":
+            return samples.tobytes()
+
+        # Voice id picks the pitch so different voices are distinguishable
+        base_freq = 110 + (sum(map(ord, voice_id)) % 120)
+        chars = alignment["characters"]
+        starts = alignment["character_start_times_seconds"]
+        ends = alignment["character_end_times_seconds"]
+        word_start = None
+        word_index = 0
+        for i, char in enumerate(chars + [" "]):
+            if char.isalnum():
+                if word_start is None:
+                    word_start = starts[i]
+                continue
+            if word_start is not None:
+                freq = base_freq * (1 + 0.08 * (word_index % 3))
+                period = max(2, round(sr / freq))
+                cycle = array('h', (int(6000 * math.sin(2 * math.pi * n / period)) for n in range(period)))
+                first, last = int(word_start * sr), int(ends[i - 1] * sr)
+                length = last - first
+                tone = cycle * (length // period + 1)
+                samples[first:last] = tone[:length]
+                word_start = None
+                word_index += 1
+        return samples.tobytes()
+
+    async def _write_audio(self, pcm: bytes, output_path: str):
+        path = Path(output_path)
+        if path.suffix.lower() == ".wav":
+            with wave.open(str(path), "wb") as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(self.SAMPLE_RATE)
+                wav.writeframes(pcm)
+            return
+
+        cmd = [
+            "ffmpeg",
+            "-f", "s16le", "-ar", str(self.SAMPLE_RATE), "-ac", "1",
+            "-i", "pipe:0",
+            "-y",
+            str(path)
+        ]
+        async with managed_process(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        ) as process:
+            _, stderr = await process.communicate(pcm)
+        if process.returncode != 0:
+            raise VoiceGenerationError(f"Local TTS encoding failed: {stderr.decode().strip()}")
+
+    async def synthesize_with_timestamps(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        voice_settings: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        delay = self.latency + self.latency_per_char * len(text)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        alignment = self.build_alignment(text)
+        pcm = self._render_pcm(alignment, voice_id or self.voice_id)
+        await self._write_audio(pcm, output_path)
+        return alignment
+
+    async def synthesize(
+        self,
+        text: str,
+        output_path: str,
+        voice_id: Optional[str] = None,
+        voice_settings: Optional[dict] = None
+    ) -> None:
+        await self.synthesize_with_timestamps(text, output_path, voice_id, voice_settings)
+
+
+BACKENDS = {
+    ElevenLabsBackend.name: ElevenLabsBackend,
+    LocalTTSBackend.name: LocalTTSBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def _load_env():
+    """Load .env once, the first time a backend is needed rather than at import."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def create_tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """
+    Build the configured backend. Priority: explicit name, TTS_BACKEND env var,
+    [tts] backend in config.ini, then ElevenLabs.
+    """
+    _load_env()
+    name = name or os.getenv('TTS_BACKEND') or settings.get('tts', 'backend', fallback=ElevenLabsBackend.name)
+    backend_cls = BACKENDS.get(name.lower())
+    if backend_cls is None:
+        raise VoiceGenerationError(f"Unknown TTS backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return backend_cls()
@@ -1,107 +1,329 @@
 import asyncio
+import json
 import logging
 import os
+import shutil
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Tuple
 
 from .voice_generator import VoiceGenerator
+from .audio_processor import AudioProcessor
 from .image_processor import ImageProcessor
 from .sync_manager import SyncManager
-from ..config_loader import ROOT_DIR
+from .process_group import managed_process
+from .renditions import rendition_path, split_outputs
+from .scratch import ScratchSpace, publish
+from ..config_loader import get_output_dir, settings
+from ..schemas import Rendition
 
 logger = logging.getLogger(__name__)
 
+# Written to each job's work dir once TTS and image processing are done, so
+# the job can be retimed later without paying for either again
+ARTIFACTS_FILE = "artifacts.json"
+
+
+def _relative(path: str, work_dir: Path) -> str:
+    """`path` relative to `work_dir` when it lies inside it (else unchanged)."""
+    try:
+        return str(Path(path).relative_to(work_dir))
+    except ValueError:
+        return str(path)
+
+
 class VideoEngine:
     """
     Orchestrates the creation of synchronized video from text and images.
     Replaces external video generation services with local FFmpeg pipeline.
     """
     
-    def __init__(self):
-        self.voice_generator = VoiceGenerator()
+    def __init__(
+        self,
+        voice_generator: Optional[VoiceGenerator] = None,
+        scratch: Optional[ScratchSpace] = None,
+        output_dir: Optional[Path] = None
+    ):
+        # voice_generator can be swapped for a stub (benchmarks, offline runs)
+        self.voice_generator = voice_generator or VoiceGenerator()
         self.image_processor = ImageProcessor()
         self.sync_manager = SyncManager()
-        
+        # Intermediates live in scratch (RAM when it fits); finished videos are published to output_dir
+        self.scratch = scratch or ScratchSpace()
+        self.output_dir = Path(output_dir) if output_dir else get_output_dir()
+        # Work dir of the last create_video call; keeps the artifacts retime() reuses
+        self.work_dir: Optional[Path] = None
+        # Wall-clock seconds per stage of the last create_video call (feeds the cost model)
+        self.stage_timings: Dict[str, float] = {}
+        # Rendition name -> path of the last create_video/retime call's extra outputs
+        self.rendition_paths: Dict[str, str] = {}
+        self.on_stage: Optional[Callable[[str], None]] = None
+
+    @contextmanager
+    def _stage(self, name: str):
+        if self.on_stage:
+            self.on_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = round(time.perf_counter() - start, 3)
+
     async def create_video(
         self,
         script_text: str,
         image_paths: List[str],
         output_filename: str = "final_video.mp4",
-        marker_words: Optional[List[str]] = None
+        marker_words: Optional[List[str]] = None,
+        on_stage: Optional[Callable[[str], None]] = None,
+        renditions: Optional[List[Any]] = None,
+        voices: Optional[List[Any]] = None
     ) -> str:
         """
         Full pipeline: Voice -> Images -> Sync -> FFmpeg Assembly.
         
         Args:
-            script_text: The text to be spoken.
+            script_text: The text to be spoken (in the default voice), unless
+                `voices` is given.
             image_paths: List of absolute paths to input images.
             output_filename: Name of the output video file.
             marker_words: Optional list of words to trigger image changes.
+            on_stage: Called with the stage name ("tts", "images", "sync",
+                "encode") as each stage starts.
+            renditions: Extra output sizes (schemas.Rendition), encoded in
+                the same pass; their paths end up in self.rendition_paths.
+            voices: Voice entries (schemas.Voice), each spoken with its own
+                voice and settings and placed at its videoBegin.
             
         Returns:
-            Path to the final MP4 video.
+            Path to the final MP4 video, in self.output_dir.
         """
         # Create a workspace directory for this job
         job_id = os.urandom(4).hex()
-        work_dir = ROOT_DIR / "tests" / "data" / "artifacts" / f"job_{job_id}"
-        work_dir.mkdir(parents=True, exist_ok=True)
+        work_dir = self.work_dir = self.scratch.allocate(f"job_{job_id}")
+        self.stage_timings = {}
+        self.on_stage = on_stage
         
         try:
             # 1. Voice & Timing Extraction
             logger.info("Step 1: Generating Voice & Timing...")
-            audio_path, alignment_data = await self.voice_generator.generate_with_timestamps(
-                text=script_text,
-                output_path=str(work_dir / "speech.mp3")
-            )
+            with self._stage("tts"):
+                voices = [voice for voice in voices or [] if voice.text.strip()]
+                if voices:
+                    audio_path, alignment_data = await self._synthesize_voices(voices, work_dir)
+                else:
+                    audio_path, alignment_data = await self.voice_generator.generate_with_timestamps(
+                        text=script_text,
+                        output_path=str(work_dir / "speech.mp3")
+                    )
             
             # 2. Asset Standardizing (Pillow)
             logger.info("Step 2: Processing Images...")
-            processed_images = self.image_processor.process_images(
-                image_paths=image_paths,
-                output_dir=str(work_dir)
+            with self._stage("images"):
+                processed_images = self.image_processor.process_images(
+                    image_paths=image_paths,
+                    output_dir=str(work_dir)
+                )
+            
+            with open(work_dir / ARTIFACTS_FILE, "w") as f:
+                json.dump({
+                    "audio": _relative(audio_path, work_dir), "alignment": alignment_data,
+                    "images": [_relative(path, work_dir) for path in processed_images],
+                    "renditions": [r.model_dump() for r in renditions or []]
+                }, f)
+
+            output_video_path = await self._sync_and_encode(
+                work_dir, audio_path, alignment_data, processed_images, output_filename, marker_words,
+                renditions=renditions
             )
+            logger.info(f"Video created successfully: {output_video_path}")
+            # Kept for retimes, but out of the RAM budget meant for running jobs
+            self.work_dir = self.scratch.retain(work_dir)
+            return str(output_video_path)
             
-            # 3. The "Sync Map" Generation
-            logger.info("Step 3: Generating Sync Maps...")
+        except asyncio.CancelledError:
+            # Job cancelled or timed out: nothing in the work dir will be used again
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        except Exception as e:
+            logger.error(f"VideoEngine pipeline failed: {e}")
+            # A failed job is never retimed either
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+    async def _synthesize_voices(self, voices: List[Any], work_dir: Path) -> Tuple[str, Dict[str, Any]]:
+        """
+        Synthesize every voice entry at once and lay them out on one timeline.
+
+        Each entry is spoken with its own voice_id and settings ([tts]
+        max_concurrency requests at a time), so a dialogue takes as long as
+        its longest line rather than the sum of all of them. The takes are
+        mixed at their videoBegin offsets and volumes into one speech track,
+        and their word timings are shifted by the same offsets and merged.
+
+        Returns:
+            (speech track path, merged word alignment)
+        """
+        slots = asyncio.Semaphore(max(settings.getint("tts", "max_concurrency", fallback=4), 1))
+
+        async def synthesize(index: int, voice: Any):
+            async with slots:
+                return await self.voice_generator.generate_with_timestamps(
+                    text=voice.text,
+                    output_path=str(work_dir / f"voice_{index}.mp3"),
+                    voice_id=voice.voice_id,
+                    voice_settings=voice.settings.model_dump() if voice.settings else None
+                )
+
+        tasks = [asyncio.ensure_future(synthesize(i, voice)) for i, voice in enumerate(voices)]
+        try:
+            takes = await asyncio.gather(*tasks)
+        except BaseException:
+            # One failed line fails the job; don't leave the other requests running
+            for task in tasks:
+                task.cancel()
+            raise
+
+        merged = sorted(
+            (start + (voice.videoBegin or 0.0), end + (voice.videoBegin or 0.0), word)
+            for voice, (_, alignment) in zip(voices, takes)
+            for word, start, end in zip(alignment["words"], alignment["start_times"], alignment["end_times"])
+        )
+        alignment_data = {
+            "words": [word for _, _, word in merged],
+            "start_times": [start for start, _, _ in merged],
+            "end_times": [end for _, end, _ in merged],
+        }
+
+        if len(voices) == 1 and not voices[0].videoBegin and voices[0].volume in (None, 1.0):
+            # A single take at 0 s and full volume is the speech track as is
+            return takes[0][0], alignment_data
+
+        pcm_dir = work_dir / "pcm"
+        try:
+            audio_path = await AudioProcessor.mix_audios(
+                [
+                    {"src": take, "videoBegin": voice.videoBegin, "volume": voice.volume}
+                    for voice, (take, _) in zip(voices, takes)
+                ],
+                None,
+                output_path=str(work_dir / "speech.mp3"),
+                cache_dir=pcm_dir
+            )
+        finally:
+            # Decoded takes are only needed for this mix
+            shutil.rmtree(pcm_dir, ignore_errors=True)
+        return audio_path, alignment_data
+
+    async def retime(
+        self,
+        work_dir: str,
+        output_filename: str,
+        marker_words: Optional[List[str]] = None,
+        words_per_line: Optional[int] = None,
+        on_stage: Optional[Callable[[str], None]] = None,
+        retime_id: Optional[str] = None
+    ) -> str:
+        """
+        Re-sync and re-encode a finished job from its stored speech and images.
+
+        Only the "sync" and "encode" stages run; TTS and image processing are
+        reused from the artifacts create_video left in `work_dir`, which is
+        only read: sync maps and the encode go to a scratch dir of the retime's
+        own (named after `retime_id`), so concurrent retimes of one job never
+        clash. The original job's renditions are encoded again.
+
+        Returns:
+            Path to the new MP4 video, in self.output_dir.
+        """
+        work_dir = Path(work_dir)
+        manifest_path = work_dir / ARTIFACTS_FILE
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No reusable artifacts in {work_dir}")
+        with open(manifest_path) as f:
+            artifacts = json.load(f)
+        # Paths are stored relative to the work dir, which moves out of RAM once the job is done
+        audio_path = str(work_dir / artifacts["audio"])
+        images = [str(work_dir / path) for path in artifacts["images"]]
+        missing = [p for p in [audio_path, *images] if not os.path.exists(p)]
+        if missing:
+            raise FileNotFoundError(f"Stored artifacts are missing: {', '.join(missing)}")
+
+        renditions = [Rendition.model_validate(r) for r in artifacts.get("renditions", [])]
+
+        self.stage_timings = {}
+        self.on_stage = on_stage
+        retime_dir = self.scratch.allocate(f"job_{retime_id or os.urandom(4).hex()}")
+        try:
+            output_video_path = await self._sync_and_encode(
+                retime_dir, audio_path, artifacts["alignment"], images,
+                output_filename, marker_words, words_per_line, renditions=renditions
+            )
+        finally:
+            # Everything worth keeping was published; the source work dir is left as it was
+            shutil.rmtree(retime_dir, ignore_errors=True)
+        logger.info(f"Video retimed successfully: {output_video_path}")
+        return str(output_video_path)
+
+    async def _sync_and_encode(
+        self,
+        work_dir: Path,
+        audio_path: str,
+        alignment_data: Dict[str, Any],
+        processed_images: List[str],
+        output_filename: str,
+        marker_words: Optional[List[str]] = None,
+        words_per_line: Optional[int] = None,
+        renditions: Optional[List[Any]] = None
+    ) -> Path:
+        # 3. The "Sync Map" Generation
+        logger.info("Step 3: Generating Sync Maps...")
+        with self._stage("sync"):
             inputs_txt_path = self.sync_manager.generate_sync_map(
                 processed_images=processed_images,
                 alignment_data=alignment_data,
                 marker_words=marker_words,
                 output_dir=str(work_dir)
             )
-            
+
             subs_ass_path = self.sync_manager.generate_subtitles(
                 alignment_data=alignment_data,
-                output_dir=str(work_dir)
+                output_dir=str(work_dir),
+                words_per_line=words_per_line or 4
             )
-            
-            # 4. The Final Assembly (FFmpeg)
-            logger.info("Step 4: Final Assembly with FFmpeg...")
-            output_video_path = work_dir / output_filename
-            
+
+        # 4. The Final Assembly (FFmpeg)
+        logger.info("Step 4: Final Assembly with FFmpeg...")
+        output_video_path = work_dir / output_filename
+
+        with self._stage("encode"):
             await self._run_ffmpeg_assembly(
                 inputs_txt=inputs_txt_path,
                 audio_path=audio_path,
                 subs_path=subs_ass_path,
-                output_path=str(output_video_path)
+                output_path=str(output_video_path),
+                renditions=renditions
             )
-            
-            logger.info(f"Video created successfully: {output_video_path}")
-            return str(output_video_path)
-            
-        except Exception as e:
-            logger.error(f"VideoEngine pipeline failed: {e}")
-            raise
+        # Only finished files leave the work dir, each with an atomic move
+        self.rendition_paths = {
+            r.name: publish(rendition_path(str(output_video_path), r.name), self.output_dir) for r in renditions or []
+        }
+        return Path(publish(str(output_video_path), self.output_dir))
 
     async def _run_ffmpeg_assembly(
         self,
         inputs_txt: str,
         audio_path: str,
         subs_path: str,
-        output_path: str
+        output_path: str,
+        renditions: Optional[List[Any]] = None
     ):
         """
         Executes the FFmpeg command to stitch everything together.
+
+        Each of `renditions` is written next to `output_path` from the same
+        decode/filter pass (see processors/renditions.py).
         """
         # FFmpeg command from user example:
         # ffmpeg -f concat -safe 0 -i inputs.txt \
@@ -116,6 +338,20 @@ class VideoEngine:
         # Let's check SyncManager. It writes whatever we pass in `processed_images`.
         # ImageProcessor returns absolute paths.
         
+        # Renditions share the decode, fps conversion and subtitle burn-in; only scale + encode repeat
+        chains, outputs = split_outputs("v", renditions or [], self.image_processor.output_size, output_path)
+
+        # Slideshows are still images between sync points: key frames exactly at
+        # each image change (clean cut points for stream copies), long GOPs and
+        # still-image tuning in between, no scene-cut detection second-guessing it
+        keyframes = ",".join(["0", *(f"{t:.3f}" for t in self.sync_manager.segment_boundaries(inputs_txt))])
+        encoder_args = [
+            "-tune", settings.get("video", "x264_tune", fallback="stillimage"),
+            "-g", str(int(30 * settings.getfloat("video", "gop_seconds", fallback=10.0))),
+            "-sc_threshold", "0",
+            "-force_key_frames", keyframes,
+        ]
+
         cmd = [
             "ffmpeg",
             "-f", "concat",
@@ -125,17 +361,23 @@ class VideoEngine:
             # CRITICAL FIX: Force frame rate conversion BEFORE subs.
             # Otherwise, concat demuxer passes a single long-duration frame, 
             # and the subtitle gets burnt into that one frame for the entire duration.
-            "-vf", f"fps=30,ass={subs_path}", 
-            "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",
-            # "-r", "30", # -r is output option, already covered by fps filter effectively, but consistent to keep or remove. 
-            # safe to keep for metadata
-            "-r", "30",
-            "-c:a", "copy",
-            "-shortest",
+            "-filter_complex", ";".join([f"[0:v]fps=30,ass={subs_path}[v]", *chains]),
             "-y", # overwrite
-            output_path
         ]
+        for pad, path in outputs:
+            cmd.extend([
+                "-map", f"[{pad}]",
+                "-map", "1:a",
+                "-c:v", "libx264",
+                *encoder_args,
+                "-pix_fmt", "yuv420p",
+                # "-r", "30", # -r is output option, already covered by fps filter effectively, but consistent to keep or remove. 
+                # safe to keep for metadata
+                "-r", "30",
+                "-c:a", "copy",
+                "-shortest",
+                path
+            ])
         
         # Save the command for debugging
         cmd_str = " ".join(cmd)
@@ -145,13 +387,12 @@ class VideoEngine:
             
         logger.info(f"Running FFmpeg: {cmd_str}")
         
-        process = await asyncio.create_subprocess_exec(
+        async with managed_process(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
+        ) as process:
+            stdout, stderr = await process.communicate()
         
         if process.returncode != 0:
             error_msg = stderr.decode().strip()
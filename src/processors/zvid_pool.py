@@ -0,0 +1,249 @@
+"""
+Pool of long-lived zvid renderer processes.
+
+Starting Node, importing zvid and launching its headless browser costs
+seconds per process, so instead of `node generate-video.js` per job the pool
+keeps `node zvid/render-worker.js` processes alive and sends them projects
+over a newline-delimited JSON-RPC channel on stdin/stdout. A worker is
+recycled after `max_jobs` renders or once its process tree (Node plus any
+browser it spawned) grows past `max_rss_mb`, which bounds leaks in
+long-running renderers.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config_loader import ROOT_DIR, settings
+from .process_group import kill_group, spawn
+
+logger = logging.getLogger(__name__)
+
+ZVID_DIR = ROOT_DIR / "zvid"
+
+
+class ZvidRenderError(Exception):
+    """Raised when a zvid render fails or its worker dies."""
+    pass
+
+
+def zvid_available() -> bool:
+    """True when the zvid Node package is installed (cd zvid && npm install)."""
+    return (ZVID_DIR / "node_modules" / "zvid").is_dir()
+
+
+def _tree_rss(pid: int) -> Optional[int]:
+    """Resident bytes of a process and all its descendants (Linux /proc), or None."""
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [pid]
+    try:
+        while pending:
+            current = pending.pop()
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+    except (OSError, ValueError):
+        return None if total == 0 else total
+    return total
+
+
+class ZvidWorker:
+    """One `node render-worker.js` process, rendering one project at a time."""
+
+    def __init__(self, node: str = "node", script: Path = ZVID_DIR / "render-worker.js"):
+        self.node = node
+        self.script = Path(script)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.jobs_done = 0
+        self.rss = 0
+        self._ids = itertools.count(1)
+        self._stderr_task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        # Own process group, so killing the worker also kills its headless browser
+        self.process = await spawn(
+            self.node, str(self.script),
+            cwd=str(self.script.parent),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=2 ** 20
+        )
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+        # The static zvid import happens before the worker answers
+        try:
+            await self.call("ping")
+        except BaseException:
+            # Cancelled or broken during startup: leave no node or browser behind
+            await self.kill()
+            raise
+        logger.info(f"Started zvid worker pid={self.process.pid}")
+
+    async def _drain_stderr(self):
+        # zvid logs to stderr; keep the pipe empty so the worker never blocks on it
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            logger.debug(f"zvid[{self.process.pid}]: {line.decode(errors='replace').rstrip()}")
+
+    async def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
+        if not self.alive:
+            raise ZvidRenderError("zvid worker is not running")
+        request_id = next(self._ids)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}}
+        self.process.stdin.write((json.dumps(request) + "\n").encode())
+        await self.process.stdin.drain()
+
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                raise ZvidRenderError(f"zvid worker exited (code {await self.process.wait()})")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning(f"Ignoring non-protocol output from zvid worker: {line[:200]!r}")
+                continue
+            if message.get("method") == "progress":
+                if on_progress and message["params"].get("id") == request_id:
+                    on_progress(message["params"]["progress"])
+                continue
+            if message.get("id") != request_id:
+                continue
+            if "error" in message:
+                raise ZvidRenderError(message["error"].get("message", "zvid render failed"))
+            result = message.get("result", {})
+            self.rss = _tree_rss(self.process.pid) or result.get("rss", 0)
+            return result
+
+    async def render(
+        self,
+        project: Dict[str, Any],
+        output_dir: str,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> str:
+        result = await self.call("render", {"project": project, "outputDir": output_dir}, on_progress)
+        self.jobs_done += 1
+        return result["output"]
+
+    async def close(self):
+        if not self.alive:
+            return
+        try:
+            self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout=5)
+        except (asyncio.TimeoutError, ConnectionError):
+            await self.kill()
+        if self._stderr_task:
+            self._stderr_task.cancel()
+
+    async def kill(self):
+        """Stop the worker and its browser at once, mid-render if need be."""
+        if self.alive:
+            kill_group(self.process)
+            await self.process.wait()
+        if self._stderr_task:
+            self._stderr_task.cancel()
+
+
+class ZvidPool:
+    """
+    Up to `size` warm zvid workers. Workers are started on first use, reused
+    across jobs, and replaced after `max_jobs` renders, a memory overrun or a
+    failure.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_jobs: int = 50,
+        max_rss_mb: float = 1500,
+        node: str = "node",
+        script: Path = ZVID_DIR / "render-worker.js"
+    ):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.node = node
+        self.script = script
+        self._idle: List[ZvidWorker] = []
+        self._slots = asyncio.Semaphore(size)
+
+    def _worn_out(self, worker: ZvidWorker) -> bool:
+        if self.max_jobs and worker.jobs_done >= self.max_jobs:
+            return True
+        return bool(self.max_rss_mb) and worker.rss > self.max_rss_mb * 1024 * 1024
+
+    async def render(
+        self,
+        project: Dict[str, Any],
+        output_dir: str,
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> str:
+        """Render a zvid project dict into output_dir; returns the MP4 path."""
+        async with self._slots:
+            worker = self._idle.pop() if self._idle else None
+            if worker is None or not worker.alive:
+                worker = ZvidWorker(self.node, self.script)
+                await worker.start()
+            try:
+                output = await worker.render(project, output_dir, on_progress)
+            except asyncio.CancelledError:
+                # Job cancelled or timed out: don't let the render run to completion
+                await worker.kill()
+                raise
+            except BaseException:
+                # A failed render may leave the browser in a bad state; never reuse the worker
+                await worker.close()
+                raise
+            if self._worn_out(worker):
+                logger.info(f"Recycling zvid worker pid={worker.process.pid} "
+                            f"after {worker.jobs_done} jobs ({worker.rss / 2 ** 20:.0f} MB)")
+                await worker.close()
+            else:
+                self._idle.append(worker)
+            return output
+
+    async def close(self):
+        workers, self._idle = self._idle, []
+        await asyncio.gather(*(worker.close() for worker in workers))
+
+
+_pool: Optional[ZvidPool] = None
+
+
+def get_zvid_pool() -> ZvidPool:
+    """Process-wide pool configured from the [zvid] section."""
+    global _pool
+    if _pool is None:
+        _pool = ZvidPool(
+            size=settings.getint("zvid", "pool_size", fallback=2),
+            max_jobs=settings.getint("zvid", "max_jobs_per_worker", fallback=50),
+            max_rss_mb=settings.getfloat("zvid", "max_worker_rss_mb", fallback=1500),
+            node=settings.get("zvid", "node", fallback="node")
+        )
+    return _pool
+
+
+async def close_zvid_pool():
+    """Stop the pool's workers, if a pool was ever started."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,217 @@
+"""
+Retention of finished outputs, work dirs and job records.
+
+Renders leave files behind (videos and renditions in output/, work dirs in
+scratch, generated audio in tests/data/artifacts), and every job keeps a
+record. RetentionManager.sweep(), run every [retention] interval seconds by
+the API, keeps all of that bounded:
+- outputs not downloaded for output_ttl_hours are deleted with their work dir;
+- while outputs exceed max_output_mb, the least recently downloaded go first;
+- work dirs and files no job refers to are removed once orphan_ttl_hours old;
+- records of finished jobs untouched for job_ttl_hours are deleted.
+Expired jobs keep their record (marked `expired_at`) until it is pruned.
+
+Outputs are written to hash-sharded directories (output/3f/a9/video_<job>.mp4),
+so no single directory collects every video ever rendered.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .config_loader import ROOT_DIR, get_output_dir, settings
+from .jobs import TERMINAL_STATUSES, JobManager
+from .schemas import JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Default location of generated audio (TTS, trims, mixes); also holds test fixtures
+# and input audio that projects refer to, e.g. default.mp3
+ARTIFACTS_DIR = ROOT_DIR / "tests" / "data" / "artifacts"
+# Names the pipeline gives what it writes there: job work dirs, TTS output
+# (voice-*), trims (trimmed-*) and mixes (mixed-audio-*)
+GENERATED_ARTIFACT = re.compile(r"job_.+|(voice|trimmed|mixed-audio)-.+\.mp3")
+
+
+def job_output_dir(job_id: str) -> Path:
+    """Shard directory of a job's outputs: output/<2 hex>/<2 hex>."""
+    digest = hashlib.sha1(job_id.encode()).hexdigest()
+    return get_output_dir() / digest[:2] / digest[2:4]
+
+
+def job_files(job: dict) -> List[str]:
+    """Output and rendition paths of a job."""
+    files = [job["output_file"]] if job.get("output_file") else []
+    return files + list((job.get("renditions") or {}).values())
+
+
+def last_used(job: dict) -> float:
+    """Last download of a job's video, or when it finished if never downloaded."""
+    return job.get("downloaded_at") or job["updated_at"]
+
+
+def _size(path: Path) -> int:
+    try:
+        if path.is_dir():
+            return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _remove(path: Path) -> int:
+    """Delete a file or directory tree; returns the bytes freed."""
+    size = _size(path)
+    try:
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+    except FileNotFoundError:
+        return 0
+    except OSError as e:
+        logger.warning(f"Could not remove {path}: {e}")
+        return 0
+    return size
+
+
+def _hours(key: str, fallback: float) -> float:
+    return settings.getfloat("retention", key, fallback=fallback) * 3600
+
+
+class RetentionManager:
+    """Applies the [retention] TTLs and size quota to one job store and its files."""
+
+    def __init__(
+        self,
+        jobs: JobManager,
+        output_dir: Optional[Path] = None,
+        orphan_roots: Optional[Iterable[Path]] = None,
+        output_ttl: Optional[float] = None,
+        max_output_bytes: Optional[int] = None,
+        orphan_ttl: Optional[float] = None,
+        job_ttl: Optional[float] = None
+    ):
+        self.jobs = jobs
+        self.output_dir = Path(output_dir) if output_dir else get_output_dir()
+        if orphan_roots is None:
+            from .processors.scratch import ScratchSpace
+            scratch = ScratchSpace()
+            orphan_roots = [root for root in (scratch.ram_root, scratch.disk_root, ARTIFACTS_DIR) if root]
+        self.orphan_roots = [Path(root) for root in orphan_roots]
+        # Seconds (bytes for the quota); 0 turns a rule off
+        self.output_ttl = output_ttl if output_ttl is not None else _hours("output_ttl_hours", 72)
+        self.max_output_bytes = max_output_bytes if max_output_bytes is not None else \
+            settings.getint("retention", "max_output_mb", fallback=0) * 2 ** 20
+        self.orphan_ttl = orphan_ttl if orphan_ttl is not None else _hours("orphan_ttl_hours", 24)
+        self.job_ttl = job_ttl if job_ttl is not None else _hours("job_ttl_hours", 168)
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Run every rule once.
+
+        Returns:
+            Counts of expired, evicted (quota), orphaned and pruned items, and
+            the bytes freed.
+        """
+        now = now if now is not None else time.time()
+        stats = {"expired": 0, "evicted": 0, "orphans": 0, "pruned": 0, "freed_bytes": 0}
+
+        jobs = self.jobs.list_jobs()
+        stale = [
+            job for job in jobs
+            if self.job_ttl and job["status"] in TERMINAL_STATUSES and now - job["updated_at"] > self.job_ttl
+        ]
+        stale_ids = {job["job_id"] for job in stale}
+        live = [job for job in jobs if job["job_id"] not in stale_ids]
+
+        # Work dirs can be shared (a retime reuses its source's); remove one only with its last holder
+        holders: Dict[str, set] = {}
+        for job in live:
+            if job.get("work_dir") and not job.get("expired_at"):
+                holders.setdefault(job["work_dir"], set()).add(job["job_id"])
+
+        for job in stale:
+            stats["freed_bytes"] += self._delete_files(job, holders)
+        self.jobs.delete_jobs(list(stale_ids))
+        stats["pruned"] = len(stale_ids)
+
+        held = [
+            job for job in live
+            if job["status"] == JobStatus.COMPLETED and not job.get("expired_at") and job_files(job)
+        ]
+        held.sort(key=last_used)
+        if self.output_ttl:
+            while held and now - last_used(held[0]) > self.output_ttl:
+                stats["freed_bytes"] += self._expire(held.pop(0), holders, now)
+                stats["expired"] += 1
+        if self.max_output_bytes:
+            sizes = [sum(_size(Path(path)) for path in job_files(job)) for job in held]
+            total = sum(sizes)
+            while held and total > self.max_output_bytes:
+                total -= sizes.pop(0)
+                stats["freed_bytes"] += self._expire(held.pop(0), holders, now)
+                stats["evicted"] += 1
+
+        referenced = {os.path.abspath(path) for job in held for path in job_files(job)}
+        referenced.update(os.path.abspath(work_dir) for work_dir in holders)
+        for path in self._orphan_candidates():
+            if os.path.abspath(path) in referenced:
+                continue
+            try:
+                age = now - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if self.orphan_ttl and age > self.orphan_ttl:
+                stats["freed_bytes"] += _remove(path)
+                stats["orphans"] += 1
+        self._remove_empty_shards(now)
+
+        if any(stats[key] for key in ("expired", "evicted", "orphans", "pruned")):
+            logger.info(f"Retention sweep: {stats}")
+        return stats
+
+    def _delete_files(self, job: dict, holders: Dict[str, set]) -> int:
+        freed = sum(_remove(Path(path)) for path in job_files(job))
+        work_dir = job.get("work_dir")
+        if work_dir:
+            sharing = holders.get(work_dir, set())
+            sharing.discard(job["job_id"])
+            if not sharing:
+                holders.pop(work_dir, None)
+                freed += _remove(Path(work_dir))
+        return freed
+
+    def _expire(self, job: dict, holders: Dict[str, set], now: float) -> int:
+        freed = self._delete_files(job, holders)
+        self.jobs.update_job(job["job_id"], expired_at=now)
+        return freed
+
+    def _orphan_candidates(self) -> Iterable[Path]:
+        for root in self.orphan_roots:
+            if not root.is_dir():
+                continue
+            for entry in root.iterdir():
+                # The artifacts dir also holds fixtures and input audio: only what the pipeline wrote goes
+                if root == ARTIFACTS_DIR and not GENERATED_ARTIFACT.fullmatch(entry.name):
+                    continue
+                yield entry
+        if self.output_dir.is_dir():
+            yield from (path for path in self.output_dir.rglob("*") if path.is_file())
+
+    def _remove_empty_shards(self, now: float):
+        if not self.output_dir.is_dir():
+            return
+        # Leaf shards first, so a shard emptied here frees its parent too. Recently
+        # touched ones stay: a render may be about to publish into them.
+        for path in list(self.output_dir.glob("*/*")) + list(self.output_dir.glob("*")):
+            try:
+                if path.is_dir() and now - path.stat().st_mtime > self.orphan_ttl:
+                    path.rmdir()
+            except OSError:
+                pass  # not empty, or already gone
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, HttpUrl
-from typing import List, Optional, Literal, Union
+import re
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+from typing import Dict, List, Optional, Literal, Tuple, Union
 from enum import Enum
 
 class JobStatus(str, Enum):
@@ -7,6 +8,8 @@ class JobStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
 
 class JobResponse(BaseModel):
     job_id: str
@@ -15,6 +18,25 @@ class JobResponse(BaseModel):
     error: Optional[str] = None
     progress: Optional[int] = 0
     output_file: Optional[str] = None
+    updated_at: Optional[float] = None # Change token for long-polling (?since=)
+    estimated_seconds: Optional[float] = None # Predicted render time, excluding queueing
+    renditions: Optional[Dict[str, str]] = None # Extra output files by rendition name (?rendition= on /download)
+    eta_seconds: Optional[float] = None # Predicted time until the job finishes
+    expired_at: Optional[float] = None # When retention deleted the output files (/download then answers 410)
+    priority: Optional[str] = None # Queue lane: interactive | standard | bulk
+    queue_position: Optional[int] = None # While queued (queue mode): 1 = next to start
+    queued_seconds: Optional[float] = None # While queued: time waited so far
+
+class BulkStatusRequest(BaseModel):
+    job_ids: List[str] = Field(..., max_length=1000)
+
+class BulkStatusResponse(BaseModel):
+    jobs: List[JobResponse]
+    missing: List[str] = []
+
+class RetimeRequest(BaseModel):
+    marker_words: Optional[List[str]] = None # Words whose start switches to the next image (default: even split)
+    words_per_line: Optional[int] = Field(None, ge=1, le=20) # Subtitle words per caption line (default 4)
 
 
 class TextStyle(BaseModel):
@@ -114,6 +136,7 @@ class Audio(BaseModel):
     audioBegin: Optional[float] = 0.0
     audioEnd: Optional[float] = None
     videoBegin: Optional[float] = 0.0 # Start time in the video
+    duck: Optional[float] = None # Gain for this track while other audio plays (e.g. 0.3 for a music bed)
 
 class VoiceSettings(BaseModel):
     stability: Optional[float] = 0.5
@@ -128,6 +151,37 @@ class Voice(BaseModel):
     volume: Optional[float] = 1.0
     settings: Optional[VoiceSettings] = None
 
+class Rendition(BaseModel):
+    name: str = Field(..., pattern=r"^[A-Za-z0-9_-]{1,32}$") # e.g. "720p"; used in file names and ?rendition=
+    width: Optional[int] = Field(None, gt=0, le=7680)
+    height: Optional[int] = Field(None, gt=0, le=7680)
+
+    @model_validator(mode="after")
+    def _sized(self):
+        # Without a width or height, the name must say the shorter side ("480p")
+        if not self.width and not self.height and not re.fullmatch(r"[1-9]\d*p", self.name):
+            raise ValueError("rendition needs a width, a height or a name like '720p'")
+        return self
+
+    def size(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        Even frame size of this rendition for a width x height main output.
+
+        A missing width or height follows the main aspect ratio. With neither,
+        a name like "720p" sets the shorter side: 1280x720 for a landscape
+        video, 720x1280 for a portrait one.
+        """
+        w, h = self.width, self.height
+        if not w and not h:
+            short = int(self.name[:-1])
+            if width >= height:
+                h = short
+            else:
+                w = short
+        w = w or h * width / height
+        h = h or w * height / width
+        return max(int(round(w / 2)) * 2, 2), max(int(round(h / 2)) * 2, 2)
+
 class VideoProject(BaseModel):
     name: str # e.g. "my-video"
     resolution: Optional[str] = "hd"
@@ -140,3 +194,11 @@ class VideoProject(BaseModel):
     voices: List[Voice] = []
     subtitle: Optional[Subtitle] = None
     outputFormat: Optional[str] = "mp4"
+    renditions: List[Rendition] = Field([], max_length=8) # Extra sizes encoded alongside the main output
+
+    @model_validator(mode="after")
+    def _unique_renditions(self):
+        names = [r.name for r in self.renditions]
+        if len(names) != len(set(names)):
+            raise ValueError("rendition names must be unique")
+        return self
@@ -1,45 +1,38 @@
 import subprocess
 import json
 import os
+import shutil
 import tempfile
 import asyncio
-import uuid
-from datetime import datetime
-from typing import Dict, Optional
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from .schemas import VideoProject, JobStatus
-from .config_loader import ROOT_DIR, get_output_dir
-from .processors.voice_generator import VoiceGenerator, VoiceGenerationError
-from .processors.audio_processor import AudioProcessor
+from .schemas import VideoProject, JobStatus, RetimeRequest
+from .config_loader import ROOT_DIR, settings
+from .jobs import JobManager, job_manager
+from .retention import job_output_dir
+from .processors.process_group import managed_process
 
 class VideoProcessingError(Exception):
     pass
 
-class JobManager:
-    def __init__(self):
-        self.jobs: Dict[str, dict] = {}
 
-    def create_job(self, project_name: str) -> str:
-        job_id = str(uuid.uuid4())
-        self.jobs[job_id] = {
-            "job_id": job_id,
-            "name": project_name,
-            "status": JobStatus.QUEUED,
-            "progress": 0,
-            "created_at": datetime.now(),
-            "output_file": None,
-            "error": None
-        }
-        return job_id
+class JobAborted(Exception):
+    """The job was cancelled or ran past a stage deadline; its status is already recorded."""
 
-    def update_job(self, job_id: str, **kwargs):
-        if job_id in self.jobs:
-            self.jobs[job_id].update(kwargs)
+    def __init__(self, status: JobStatus, message: str):
+        super().__init__(message)
+        self.status = status
 
-    def get_job(self, job_id: str) -> Optional[dict]:
-        return self.jobs.get(job_id)
 
-job_manager = JobManager()
+# How often a running job checks for DELETE /jobs/{id} and its stage deadline (seconds)
+CANCEL_POLL_INTERVAL = settings.getfloat("jobs", "cancel_poll_interval", fallback=1.0)
+
+
+def stage_timeout(stage: str) -> float:
+    """[timeouts] deadline for `stage` in seconds, else [timeouts] default; 0 means none."""
+    return settings.getfloat("timeouts", stage, fallback=settings.getfloat("timeouts", "default", fallback=0.0))
+
 
 async def trim_audio_to_duration(audio_src: str, duration: float, project_name: str) -> str:
     """
@@ -65,7 +58,7 @@ async def trim_audio_to_duration(audio_src: str, duration: float, project_name:
     # Generate filename based on project name, source filename, and duration
     safe_name = project_name.replace(" ", "-").replace("/", "-")
     source_name = audio_path.stem
-    trimmed_filename = f"{safe_name}-{source_name}-{int(duration)}s.mp3"
+    trimmed_filename = f"trimmed-{safe_name}-{source_name}-{int(duration)}s.mp3"
     trimmed_audio_path = artifacts_dir / trimmed_filename
     
     try:
@@ -81,13 +74,12 @@ async def trim_audio_to_duration(audio_src: str, duration: float, project_name:
         
         logger.info(f"Trimming audio {audio_src} to {duration} seconds -> {trimmed_audio_path}")
         
-        process = await asyncio.create_subprocess_exec(
+        async with managed_process(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
+        ) as process:
+            stdout, stderr = await process.communicate()
         
         if process.returncode != 0:
             error_msg = stderr.decode().strip()
@@ -106,64 +98,166 @@ async def trim_audio_to_duration(audio_src: str, duration: float, project_name:
             trimmed_audio_path.unlink()
         raise
 
-from .processors.video_engine import VideoEngine
+def extract_assets(project: VideoProject) -> Tuple[str, List[str]]:
+    """
+    Collect the narration script and local image paths VideoEngine works from.
+    
+    Returns:
+        Tuple of (full_script, image_paths). Images that cannot be found on
+        disk are skipped with a warning.
+    """
+    import logging
+    logger = logging.getLogger("src.main")
+    
+    # Read the validated model directly; dumping it to a dict first costs a
+    # full copy of projects with thousands of captions and visuals
+    full_script = " ".join(voice.text for voice in project.voices if voice.text)
+    
+    image_paths = []
+    for visual in project.visuals:
+        if not visual.src:
+            continue
+        # Resolve to absolute path
+        path_obj = Path(visual.src)
+        if not path_obj.is_absolute():
+            path_obj = ROOT_DIR / visual.src
+        
+        if path_obj.exists():
+            image_paths.append(str(path_obj))
+        else:
+            logger.warning(f"Image not found: {path_obj}")
+    
+    return full_script, image_paths
+
+async def prerender_visuals(project: VideoProject) -> List[dict]:
+    """
+    Project visuals with plain TEXT and SVG layers swapped for cached PNG
+    overlays, so zvid places an image instead of rasterizing them in its browser.
+    """
+    import logging
+    logger = logging.getLogger("src.main")
+    from .cost_model import resolve_resolution
+    from .processors.text_renderer import TextRenderer, TextRenderError
+    from .processors.svg_renderer import SvgRenderer, SvgRenderError, intrinsic_size
+
+    render_text = settings.get("text", "rasterizer", fallback="pillow") == "pillow"
+    text_renderer = TextRenderer()
+    svg_renderer = SvgRenderer()
+    frame_size = resolve_resolution(project)
+    visuals = []
+    for visual in project.visuals:
+        data = visual.model_dump(exclude_none=True)
+        try:
+            if render_text and text_renderer.can_render(visual):
+                rendered = text_renderer.render(visual, frame_size)
+            elif visual.type == "SVG" and visual.svg and svg_renderer.can_render(visual.svg):
+                if visual.width and visual.height:
+                    size = (int(visual.width), int(visual.height))
+                elif visual.resize:
+                    size = frame_size
+                else:
+                    size = intrinsic_size(visual.svg) or frame_size
+                rendered = await svg_renderer.render(visual.svg, *size)
+            else:
+                visuals.append(data)
+                continue
+        except (TextRenderError, SvgRenderError) as e:
+            # e.g. a color Pillow can't parse; zvid's browser still handles it
+            logger.debug(f"Leaving {visual.type} visual to zvid: {e}")
+            visuals.append(data)
+            continue
+        for key in ("text", "html", "style", "svg"):
+            data.pop(key, None)
+        data.update(type="IMAGE", src=rendered.path, width=rendered.width, height=rendered.height)
+        visuals.append(data)
+    return visuals
+
+async def render_with_zvid(project: VideoProject, job_id: str, output_dir: str) -> str:
+    """Render a project on a pooled zvid worker; zvid's 0-100 progress maps onto 10-95."""
+    from .processors.zvid_pool import get_zvid_pool
+
+    # zvid names the file after the project; use the job id so concurrent jobs never collide
+    zvid_project = {**project.model_dump(exclude_none=True), "name": f"video_{job_id}"}
+    zvid_project["visuals"] = await prerender_visuals(project)
+
+    def on_progress(percent: int):
+        job_manager.update_job(job_id, progress=10 + int(percent * 0.85))
+
+    return await get_zvid_pool().render(zvid_project, output_dir, on_progress)
 
-# ... (keep existing imports)
 
 async def generate_video(project: VideoProject, job_id: str) -> str:
+    """Render `project` as job `job_id`, stopping on cancellation or a stage deadline."""
+    return await _run_guarded(job_id, lambda on_stage: _generate_video(project, job_id, on_stage))
+
+
+async def _generate_video(project: VideoProject, job_id: str, on_stage) -> str:
 
     job_manager.update_job(job_id, status=JobStatus.PROCESSING, progress=10)
     
     # Define paths
-    output_dir = get_output_dir()
+    output_dir = job_output_dir(job_id)
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Project conversion to dict for easier access
-    project_dict = project.model_dump(exclude_none=True)
-    
     try:
-        # Collect assets for VideoEngine
-        script_parts = []
-        image_paths = []
-        
-        # 1. Extract Script from Voices
-        if "voices" in project_dict and project_dict["voices"]:
-            for voice in project_dict["voices"]:
-                if "text" in voice:
-                    script_parts.append(voice["text"])
-        
-        full_script = " ".join(script_parts)
-        
-        # 2. Extract Images from Visuals
-        if "visuals" in project_dict and project_dict["visuals"]:
-            for visual in project_dict["visuals"]:
-                if "src" in visual:
-                    src = visual["src"]
-                    # Resolve to absolute path
-                    path_obj = Path(src)
-                    if not path_obj.is_absolute():
-                         path_obj = ROOT_DIR / src
-                    
-                    if path_obj.exists():
-                        image_paths.append(str(path_obj))
-                    else:
-                         import logging
-                         logging.getLogger("src.main").warning(f"Image not found: {path_obj}")
-        
-        if not full_script and not image_paths:
-            # Fallback to legacy zvid or error?
-            # User wants to replace JSON2Video, so let's try VideoEngine even with empty script?
-            # VideoEngine needs script for voice.
-            # If no script, maybe we can't use VideoEngine for voice syncing.
-            # But the requirement is "add-ai-voice-generation".
-            pass
-
-        # 3. Use VideoEngine
         import logging
         logger = logging.getLogger("src.main")
+
+        # Projects without narration are plain zvid timelines (TEXT/SVG/media layers):
+        # composite them directly with ffmpeg when every feature they use is supported,
+        # else render them on the warm Node renderer pool when zvid is installed
+        if not project.voices:
+            from .processors.timeline import TimelineCompositor
+            from .processors.zvid_pool import zvid_available
+            reason = TimelineCompositor.unsupported_reason(project)
+            if settings.get("render", "compositor", fallback="timeline") != "timeline":
+                reason = "[render] compositor"
+            if reason is None:
+                from .processors.scratch import ScratchSpace, publish
+                logger.info(f"Rendering job {job_id} with the timeline compositor")
+                compositor = TimelineCompositor()
+                # Encode (and mix audio) in scratch; only the finished files move to the output dir
+                work_dir = ScratchSpace().allocate(f"job_{job_id}")
+                try:
+                    rendered = await compositor.render(
+                        project, str(work_dir / f"video_{job_id}.mp4"), on_stage=on_stage,
+                        on_progress=lambda p: job_manager.update_job(job_id, progress=10 + int(p * 85))
+                    )
+                    renditions = {
+                        name: publish(path, output_dir)
+                        for name, path in compositor.rendition_paths(project, rendered).items()
+                    }
+                    video_path = publish(rendered, output_dir)
+                finally:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                job_manager.update_job(
+                    job_id, status=JobStatus.COMPLETED, progress=100, output_file=video_path,
+                    timings=compositor.stage_timings, renditions=renditions or None
+                )
+                await asyncio.to_thread(_record_timings, project, compositor.stage_timings)
+                return video_path
+            if zvid_available():
+                logger.info(f"Rendering job {job_id} with the zvid renderer pool ({reason})")
+                video_path = await render_with_zvid(project, job_id, str(output_dir))
+                renditions = None
+                if project.renditions:
+                    # zvid writes a single file; derive the other sizes from it in one decode pass
+                    from .cost_model import resolve_resolution
+                    from .processors.renditions import transcode_renditions
+                    renditions = await transcode_renditions(video_path, project.renditions, resolve_resolution(project))
+                job_manager.update_job(
+                    job_id, status=JobStatus.COMPLETED, progress=100, output_file=video_path, renditions=renditions
+                )
+                return video_path
+
+        full_script, image_paths = extract_assets(project)
+
+        # 3. Use VideoEngine
         logger.info(f"Starting Python VideoEngine for job {job_id}")
         
-        engine = VideoEngine()
+        # Imported here so the API process only pays for Pillow/TTS SDKs when rendering
+        from .processors.video_engine import VideoEngine
+        engine = VideoEngine(output_dir=output_dir)
         
         # We need to handle the case where there is no script (maybe just images?)
         # VideoEngine.create_video currently REQUIRES script_text for voice generation.
@@ -175,20 +269,126 @@ async def generate_video(project: VideoProject, job_id: str) -> str:
         video_path = await engine.create_video(
             script_text=full_script if full_script else " ", # Avoid empty string error if any
             image_paths=image_paths,
-            output_filename=output_filename
+            output_filename=output_filename,
+            on_stage=on_stage,
+            renditions=project.renditions,
+            voices=project.voices
         )
         
-        job_manager.update_job(job_id, status=JobStatus.COMPLETED, progress=100, output_file=video_path)
+        job_manager.update_job(
+            job_id, status=JobStatus.COMPLETED, progress=100, output_file=video_path,
+            timings=engine.stage_timings, work_dir=str(engine.work_dir),
+            renditions=engine.rendition_paths or None
+        )
+        await asyncio.to_thread(_record_timings, project, engine.stage_timings)
         return video_path
 
     except Exception as e:
         job_manager.update_job(job_id, status=JobStatus.FAILED, error=str(e))
         raise
 
+
+async def retime_video(request: RetimeRequest, work_dir: str, job_id: str) -> str:
+    """
+    Re-sync a finished narrated job with new markers/subtitle options as job `job_id`.
+
+    Reuses the speech and processed images in `work_dir`; only the sync map,
+    subtitles and final assembly are redone.
+    """
+    return await _run_guarded(job_id, lambda on_stage: _retime_video(request, work_dir, job_id, on_stage))
+
+
+async def _retime_video(request: RetimeRequest, work_dir: str, job_id: str, on_stage) -> str:
+    job_manager.update_job(job_id, status=JobStatus.PROCESSING, progress=10)
+    try:
+        from .processors.video_engine import VideoEngine
+        engine = VideoEngine(output_dir=job_output_dir(job_id))
+        video_path = await engine.retime(
+            work_dir,
+            output_filename=f"video_{job_id}.mp4",
+            marker_words=request.marker_words,
+            words_per_line=request.words_per_line,
+            on_stage=on_stage,
+            retime_id=job_id
+        )
+        job_manager.update_job(
+            job_id, status=JobStatus.COMPLETED, progress=100, output_file=video_path,
+            renditions=engine.rendition_paths or None, timings=engine.stage_timings, work_dir=work_dir
+        )
+        return video_path
+    except Exception as e:
+        job_manager.update_job(job_id, status=JobStatus.FAILED, error=str(e))
+        raise
+
+
+async def _run_guarded(job_id: str, render: Callable[[Callable[[str], None]], Awaitable[str]]) -> str:
+    """
+    Run `render(on_stage)` for job `job_id` and cancel it if the client deletes
+    the job or the current stage outlives its [timeouts] deadline.
+
+    Cancellation reaches every await in the pipeline: subprocess groups are
+    killed, pending TTS requests are abandoned and renderers remove their
+    partial output. The job is then marked cancelled or timed out, and
+    JobAborted is raised so the caller can free the render slot.
+    """
+    if (job_manager.get_job(job_id) or {}).get("cancel_requested"):
+        job_manager.update_job(job_id, status=JobStatus.CANCELLED, error="Cancelled before rendering started")
+        raise JobAborted(JobStatus.CANCELLED, "Cancelled before rendering started")
+
+    reporter = _stage_reporter(job_id)
+    current = {"stage": "render", "started": time.monotonic()}
+
+    def on_stage(stage: str):
+        current.update(stage=stage, started=time.monotonic())
+        reporter(stage)
+
+    task = asyncio.ensure_future(render(on_stage))
+    aborted = None
+    try:
+        while aborted is None:
+            done, _ = await asyncio.wait({task}, timeout=CANCEL_POLL_INTERVAL)
+            if done:
+                break
+            limit = stage_timeout(current["stage"])
+            if (job_manager.get_job(job_id) or {}).get("cancel_requested"):
+                aborted = (JobStatus.CANCELLED, "Cancelled by client")
+            elif limit and time.monotonic() - current["started"] > limit:
+                aborted = (JobStatus.TIMED_OUT, f"Stage '{current['stage']}' exceeded its {limit:g}s timeout")
+            if aborted:
+                task.cancel()
+        return await task
+    except asyncio.CancelledError:
+        if aborted is None:
+            raise
+        job_manager.update_job(job_id, status=aborted[0], error=aborted[1])
+        raise JobAborted(*aborted)
     finally:
-        # Clean up the temp JSON file
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-        
-        # Note: Trimmed audio files are kept in artifacts directory for reuse
+        # The caller itself was cancelled (e.g. worker shutdown): take the render down too
+        if not task.done():
+            task.cancel()
 
+
+def _stage_reporter(job_id: str):
+    """on_stage callback: progress follows the submission-time estimate of each stage's share."""
+    estimate = (job_manager.get_job(job_id) or {}).get("estimate") or {}
+    total_estimate = sum(estimate.values()) or 1.0
+    completed_stages = []
+
+    def on_stage(stage: str):
+        done = sum(estimate.get(s, 0.0) for s in completed_stages)
+        completed_stages.append(stage)
+        job_manager.update_job(
+            job_id, stage=stage, stage_started_at=time.time(),
+            progress=10 + int(85 * done / total_estimate)
+        )
+    return on_stage
+
+
+def _record_timings(project: VideoProject, timings: Dict[str, float]):
+    """Teach the cost model from a finished render; never fails the job. Blocks on a file lock: run it in a thread."""
+    import logging
+    from .cost_model import cost_model, extract_features
+    try:
+        cost_model.record(extract_features(project), timings)
+    except Exception as e:
+        logging.getLogger("src.main").warning(f"Could not record render timings: {e}")
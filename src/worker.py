@@ -0,0 +1,178 @@
+"""
+Render worker: pulls jobs from the durable queue and renders them outside
+the API process.
+
+Run one or more per host, scaled independently of the API:
+    RENDER_MODE=queue JOB_STORE=sqlite python -m src.worker --concurrency 2
+
+Workers share job records with the API through the SQLite job store, so
+progress written here is visible to /status on any API process.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+from typing import Optional, Set
+
+from .config_loader import settings, get_log_dir
+from .job_queue import JobQueue, QueueItem, create_job_queue
+from .jobs import SQLiteJobStore, job_manager
+from .processors.zvid_pool import close_zvid_pool
+from .schemas import JobStatus, RetimeRequest, VideoProject
+
+logger = logging.getLogger("src.worker")
+
+
+class RenderWorker:
+    """
+    Runs up to `concurrency` renders at once. Each claimed job holds a lease
+    that a heartbeat task keeps extending until the render finishes.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 1,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 1.0
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.slots = asyncio.Semaphore(concurrency)
+        self.running: Set[asyncio.Task] = set()
+        self.stopping = asyncio.Event()
+
+    async def _heartbeat(self, item: QueueItem, render: asyncio.Task) -> bool:
+        """Extend the lease until cancelled; on losing it, stop `render` and return True."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            # Queue calls block on SQLite locks; keep them off the event loop
+            if not await asyncio.to_thread(self.queue.heartbeat, item.job_id, self.worker_id, self.lease_seconds):
+                # Another worker may already have reclaimed the job: rendering on would duplicate it
+                logger.warning(f"Lost lease on job {item.job_id}; stopping its render")
+                render.cancel()
+                return True
+
+    async def _run_payload(self, item: QueueItem):
+        from .video_processor import generate_video, retime_video
+
+        payload = json.loads(item.payload)
+        logger.info(f"Rendering job {item.job_id} (attempt {item.attempts})")
+        if "retime" in payload:
+            # Re-sync of a finished job (POST /jobs/{id}/retime)
+            await retime_video(RetimeRequest.model_validate(payload["retime"]), payload["work_dir"], item.job_id)
+        else:
+            await generate_video(VideoProject.model_validate(payload), item.job_id)
+
+    async def _render(self, item: QueueItem):
+        from .video_processor import JobAborted
+
+        render = asyncio.create_task(self._run_payload(item))
+        heartbeat = asyncio.create_task(self._heartbeat(item, render))
+        try:
+            await render
+            await asyncio.to_thread(self.queue.complete, item.job_id, self.worker_id)
+        except asyncio.CancelledError:
+            if not (heartbeat.done() and not heartbeat.cancelled() and heartbeat.result()):
+                raise
+            # The job belongs to whichever worker holds the lease now; leave its record and queue item alone
+            logger.info(f"Stopped job {item.job_id} after losing its lease")
+        except JobAborted as e:
+            # Cancelled or timed out; the job record is already updated and the slot frees up below
+            logger.info(f"Job {item.job_id} stopped: {e}")
+            if e.status == JobStatus.CANCELLED:
+                await asyncio.to_thread(self.queue.cancel, item.job_id)
+            else:
+                await asyncio.to_thread(self.queue.fail, item.job_id, self.worker_id, str(e))
+        except Exception as e:
+            # generate_video already marked the job failed; pipeline errors are not retried
+            logger.error(f"Job {item.job_id} failed: {e}")
+            await asyncio.to_thread(job_manager.update_job, item.job_id, status=JobStatus.FAILED, error=str(e))
+            await asyncio.to_thread(self.queue.fail, item.job_id, self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+            if not render.done():
+                render.cancel()
+            self.slots.release()
+
+    async def _reap_exhausted(self):
+        for job_id in await asyncio.to_thread(self.queue.expire_exhausted):
+            await asyncio.to_thread(job_manager.update_job, job_id, status=JobStatus.FAILED,
+                                    error="Render worker stopped responding too many times")
+
+    async def run(self):
+        logger.info(f"Worker {self.worker_id} started (concurrency={self.concurrency})")
+        while not self.stopping.is_set():
+            await self.slots.acquire()
+            if self.stopping.is_set():
+                self.slots.release()
+                break
+            await self._reap_exhausted()
+            item = await asyncio.to_thread(self.queue.claim, self.worker_id, self.lease_seconds)
+            if item is None:
+                self.slots.release()
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._render(item))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+        if self.running:
+            logger.info(f"Waiting for {len(self.running)} running job(s) to finish")
+            await asyncio.gather(*self.running, return_exceptions=True)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        self.stopping.set()
+
+
+async def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Render worker for the JSON to Video API.")
+    parser.add_argument("--concurrency", type=int,
+                        default=settings.getint("worker", "concurrency", fallback=1))
+    parser.add_argument("--lease-seconds", type=float,
+                        default=settings.getfloat("worker", "lease_seconds", fallback=60.0))
+    parser.add_argument("--poll-interval", type=float,
+                        default=settings.getfloat("worker", "poll_interval", fallback=1.0))
+    args = parser.parse_args(argv)
+
+    log_dir = get_log_dir()
+    log_dir.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(log_dir / "worker.log"),
+            logging.StreamHandler()
+        ]
+    )
+
+    if not isinstance(job_manager.store, SQLiteJobStore):
+        logger.warning("Job store is in-memory; the API will not see this worker's progress. "
+                       "Set [jobs] store = sqlite (or JOB_STORE=sqlite).")
+
+    worker = RenderWorker(
+        create_job_queue(),
+        concurrency=args.concurrency,
+        lease_seconds=args.lease_seconds,
+        poll_interval=args.poll_interval
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+    await close_zvid_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,17 +9,37 @@ if [ -d ".venv" ]; then
     source .venv/bin/activate
 fi
 
+# RENDER_WORKERS=N runs renders in N separate worker processes fed by the
+# durable queue; the API then only validates and enqueues.
+RENDER_WORKERS=${RENDER_WORKERS:-0}
+WORKER_PIDS=""
+if [ "$RENDER_WORKERS" -gt 0 ]; then
+    export RENDER_MODE=queue
+    export JOB_STORE=sqlite
+fi
+
+# Caddy serves /download bodies (X-Accel-Redirect) so API workers never stream video
+export DOWNLOAD_OFFLOAD=${DOWNLOAD_OFFLOAD:-accel}
+
 echo "Starting Uvicorn..."
 uvicorn src.main:app --port 8000 > logs/uvicorn.log 2>&1 &
 UVICORN_PID=$!
 echo "Uvicorn started with PID $UVICORN_PID"
 
+for i in $(seq 1 "$RENDER_WORKERS"); do
+    python -m src.worker > "logs/worker-$i.log" 2>&1 &
+    WORKER_PIDS="$WORKER_PIDS $!"
+done
+if [ -n "$WORKER_PIDS" ]; then
+    echo "Render workers started with PIDs$WORKER_PIDS"
+fi
+
 echo "Starting Caddy..."
 ./caddy start --config Caddyfile --adapter caddyfile > logs/caddy_start.log 2>&1
 echo "Caddy started"
 
 # Trap exit signals to kill background processes
-trap "kill $UVICORN_PID; ./caddy stop" EXIT
+trap "kill $UVICORN_PID $WORKER_PIDS; ./caddy stop" EXIT
 
 echo "Services are running. Press Ctrl+C to stop."
 sleep 2
@@ -3,6 +3,9 @@
 # Check Uvicorn
 UVICORN_PIDS=$(pgrep -f "uvicorn src.main:app" || true)
 
+# Check render workers
+WORKER_PIDS=$(pgrep -f "python -m src.worker" || true)
+
 # Check Caddy
 # When caddy starts in background, it usually appears as 'caddy run'
 CADDY_PIDS=$(pgrep -f "caddy.*Caddyfile" || true)
@@ -15,6 +18,12 @@ else
     echo "❌ Uvicorn is STOPPED"
 fi
 
+if [ -n "$WORKER_PIDS" ]; then
+    echo "✅ Render workers RUNNING (PIDs: $(echo $WORKER_PIDS))"
+else
+    echo "ℹ️  No render workers (renders run inside the API)"
+fi
+
 if [ -n "$CADDY_PIDS" ]; then
     echo "✅ Caddy is RUNNING (PIDs: $CADDY_PIDS)"
 else
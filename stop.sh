@@ -10,4 +10,7 @@ fi
 echo "Stopping Uvicorn..."
 pkill -f "uvicorn src.main:app" || true
 
+echo "Stopping render workers..."
+pkill -f "python -m src.worker" || true
+
 echo "All services stopped."
@@ -0,0 +1,391 @@
+"""
+Offline benchmark for the VideoEngine render pipeline.
+
+Runs every stage (voice, images, sync map, subtitles, ffmpeg assembly) and
+the full end-to-end pipeline against the bundled tests/data/*.json projects
+and a set of synthetic images, using a deterministic stub TTS so no
+ElevenLabs key or network access is needed.
+
+Usage (from the repository root):
+    python -m tests.perf.bench_pipeline
+    python -m tests.perf.bench_pipeline --save-baseline
+    python -m tests.perf.bench_pipeline --cases synthetic --repeat 3
+    python -m tests.perf.bench_pipeline --network   # also fetch remote images
+
+Exit code is 1 when any metric regresses past the baseline tolerance.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import resource
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from src.config_loader import ROOT_DIR
+from src.schemas import VideoProject
+from src.processors.video_engine import VideoEngine
+
+logger = logging.getLogger("bench")
+
+DATA_DIR = ROOT_DIR / "tests" / "data"
+BENCH_DIR = ROOT_DIR / "tmp" / "bench"
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+FPS = 30
+
+# Synthetic source images: label -> (width, height)
+SYNTHETIC_SIZES = {
+    "small": (640, 480),
+    "hd": (1920, 1080),
+    "portrait": (1080, 1920),
+    "large": (4032, 3024),
+}
+SYNTHETIC_IMAGE_COUNT = 4
+
+STUB_SCRIPT = (
+    "Welcome to the benchmark. We start with a few still images and a steady "
+    "narration so every run renders the same timeline. The sync manager cuts "
+    "to a new image as the words go by, and the subtitles follow along in "
+    "groups of four words until the very end of the script."
+)
+
+# Metrics compared against the baseline, higher is worse unless listed in LOWER_IS_WORSE
+COMPARED_METRICS = ("wall_s", "cpu_s", "peak_rss_mb", "encode_fps")
+LOWER_IS_WORSE = {"encode_fps"}
+
+
+class StubVoiceGenerator:
+    """
+    Deterministic stand-in for VoiceGenerator.
+
+    Every word lasts WORD_SECONDS followed by GAP_SECONDS of silence. The audio
+    is a silent MP3 of matching length, generated once per duration and then
+    copied, so the voice stage measures file I/O rather than ffmpeg.
+    """
+
+    WORD_SECONDS = 0.3
+    GAP_SECONDS = 0.05
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def alignment_for(self, text: str) -> Dict[str, Any]:
+        words = text.split()
+        starts, ends = [], []
+        t = 0.0
+        for _ in words:
+            starts.append(round(t, 3))
+            t += self.WORD_SECONDS
+            ends.append(round(t, 3))
+            t += self.GAP_SECONDS
+        return {"words": words, "start_times": starts, "end_times": ends}
+
+    async def _silence(self, duration: float) -> Path:
+        path = self.cache_dir / f"silence-{duration:.3f}s.mp3"
+        if path.exists():
+            return path
+        cmd = [
+            "ffmpeg", "-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono",
+            "-t", f"{duration:.3f}", "-c:a", "libmp3lame", "-b:a", "64k",
+            "-y", str(path)
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"Stub audio generation failed: {stderr.decode().strip()}")
+        return path
+
+    async def generate_with_timestamps(
+        self,
+        text: str,
+        output_path: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        alignment = self.alignment_for(text)
+        duration = (alignment["end_times"][-1] if alignment["end_times"] else 0.0) + 0.5
+        source = await self._silence(duration)
+        if output_path is None:
+            output_path = str(self.cache_dir / "speech.mp3")
+        shutil.copyfile(source, output_path)
+        return output_path, alignment
+
+
+class StageTimer:
+    """Records wall time, CPU time and RSS high-water mark around a stage."""
+
+    def __init__(self):
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _usage() -> Tuple[float, float, float]:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+        # ru_maxrss is in KB on Linux; it is a lifetime high-water mark, so
+        # the value is the peak seen up to the end of the stage.
+        peak_kb = max(own.ru_maxrss, children.ru_maxrss)
+        return time.perf_counter(), cpu, peak_kb / 1024
+
+    async def run(self, name: str, fn, *args, **kwargs):
+        wall0, cpu0, _ = self._usage()
+        result = fn(*args, **kwargs)
+        if asyncio.iscoroutine(result):
+            result = await result
+        wall1, cpu1, peak_mb = self._usage()
+        self.results[name] = {
+            "wall_s": round(wall1 - wall0, 4),
+            "cpu_s": round(cpu1 - cpu0, 4),
+            "peak_rss_mb": round(peak_mb, 1),
+        }
+        return result
+
+
+def make_synthetic_images(label: str, size: Tuple[int, int], out_dir: Path) -> List[str]:
+    """Create deterministic gradient images of the given size (cached on disk)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(SYNTHETIC_IMAGE_COUNT):
+        path = out_dir / f"{label}_{size[0]}x{size[1]}_{i}.png"
+        if not path.exists():
+            gradient = Image.linear_gradient("L").resize(size)
+            radial = Image.radial_gradient("L").resize(size)
+            bands = [gradient, radial, gradient.rotate(90 * (i + 1), expand=False)]
+            Image.merge("RGB", bands).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def _fetch_remote(url: str, cache_dir: Path) -> Optional[str]:
+    import requests
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    suffix = Path(url.split("?")[0]).suffix or ".img"
+    path = cache_dir / (hashlib.sha256(url.encode()).hexdigest()[:16] + suffix)
+    if not path.exists():
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            path.write_bytes(response.content)
+        except Exception as e:
+            logger.warning(f"Could not fetch {url}: {e}")
+            return None
+    return str(path)
+
+
+def project_case(json_path: Path, network: bool) -> Optional[Dict[str, Any]]:
+    """Turn a bundled project into a benchmark case, or None if it has no usable images."""
+    try:
+        project = VideoProject.model_validate(json.loads(json_path.read_text()))
+    except Exception:
+        return None
+
+    images = []
+    for visual in project.visuals:
+        if visual.type != "IMAGE" or not visual.src:
+            continue
+        if visual.src.startswith(("http://", "https://")):
+            if network:
+                fetched = _fetch_remote(visual.src, BENCH_DIR / "remote")
+                if fetched:
+                    images.append(fetched)
+            continue
+        path = Path(visual.src)
+        if not path.is_absolute():
+            path = ROOT_DIR / visual.src
+        if path.exists():
+            images.append(str(path))
+
+    if not images:
+        return None
+
+    # Narration: voices first, then on-screen text, so projects without voices still sync
+    parts = [voice.text for voice in project.voices]
+    if not parts:
+        parts = [v.text for v in project.visuals if v.text]
+    if project.subtitle:
+        parts.extend(c.text for c in project.subtitle.captions)
+    script = " ".join(parts) or STUB_SCRIPT
+    return {"name": f"project-{json_path.stem}", "images": images, "script": script}
+
+
+def collect_cases(selection: str, network: bool) -> List[Dict[str, Any]]:
+    cases = []
+    if selection in ("all", "synthetic"):
+        for label, size in SYNTHETIC_SIZES.items():
+            images = make_synthetic_images(label, size, BENCH_DIR / "synthetic")
+            cases.append({"name": f"synthetic-{label}", "images": images, "script": STUB_SCRIPT})
+    if selection in ("all", "projects"):
+        for json_path in sorted(DATA_DIR.glob("*.json")):
+            case = project_case(json_path, network)
+            if case:
+                cases.append(case)
+            else:
+                logger.info(f"Skipping {json_path.name}: no local images (use --network)")
+    return cases
+
+
+async def bench_case(case: Dict[str, Any], stub: StubVoiceGenerator) -> Dict[str, Dict[str, float]]:
+    """Run one case stage by stage, then end-to-end through VideoEngine.create_video."""
+    engine = VideoEngine(voice_generator=stub)
+    work_dir = BENCH_DIR / "runs" / case["name"]
+    if work_dir.exists():
+        shutil.rmtree(work_dir)
+    work_dir.mkdir(parents=True)
+
+    timer = StageTimer()
+    audio_path, alignment = await timer.run(
+        "voice", stub.generate_with_timestamps,
+        text=case["script"], output_path=str(work_dir / "speech.mp3")
+    )
+    processed = await timer.run(
+        "images", engine.image_processor.process_images,
+        image_paths=case["images"], output_dir=str(work_dir)
+    )
+    inputs_txt = await timer.run(
+        "sync_map", engine.sync_manager.generate_sync_map,
+        processed_images=processed, alignment_data=alignment, output_dir=str(work_dir)
+    )
+    subs = await timer.run(
+        "subtitles", engine.sync_manager.generate_subtitles,
+        alignment_data=alignment, output_dir=str(work_dir)
+    )
+    await timer.run(
+        "encode", engine._run_ffmpeg_assembly,
+        inputs_txt=inputs_txt, audio_path=audio_path, subs_path=subs,
+        output_path=str(work_dir / "stages.mp4")
+    )
+
+    e2e_dir = work_dir / "e2e"
+    e2e_dir.mkdir()
+    await timer.run(
+        "end_to_end", _run_end_to_end, engine, case, e2e_dir
+    )
+
+    # The video is as long as the narration (-shortest), so frames follow the alignment
+    frames = (alignment["end_times"][-1] + 0.5) * FPS if alignment["end_times"] else 0
+    for stage in ("encode", "end_to_end"):
+        wall = timer.results[stage]["wall_s"]
+        timer.results[stage]["encode_fps"] = round(frames / wall, 1) if wall > 0 else 0.0
+    return timer.results
+
+
+async def _run_end_to_end(engine: VideoEngine, case: Dict[str, Any], work_dir: Path) -> str:
+    output = await engine.create_video(
+        script_text=case["script"],
+        image_paths=case["images"],
+        output_filename="e2e.mp4"
+    )
+    # create_video picks its own job directory; keep it next to the stage run
+    shutil.move(str(Path(output).parent), str(work_dir / "job"))
+    return output
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float
+) -> List[str]:
+    """Return a human-readable line for every metric worse than baseline by more than tolerance."""
+    regressions = []
+    for case, stages in results.items():
+        for stage, metrics in stages.items():
+            base = baseline.get(case, {}).get(stage)
+            if not base:
+                continue
+            for metric in COMPARED_METRICS:
+                if metric not in metrics or not base.get(metric):
+                    continue
+                ratio = metrics[metric] / base[metric]
+                worse = ratio < 1 - tolerance if metric in LOWER_IS_WORSE else ratio > 1 + tolerance
+                if worse:
+                    regressions.append(
+                        f"{case}/{stage} {metric}: {metrics[metric]} vs baseline {base[metric]} "
+                        f"({(ratio - 1) * 100:+.0f}%)"
+                    )
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, Dict[str, float]]]):
+    header = f"{'case':<28}{'stage':<12}{'wall_s':>9}{'cpu_s':>9}{'rss_mb':>9}{'fps':>9}"
+    print(header)
+    print("-" * len(header))
+    for case, stages in results.items():
+        for stage, m in stages.items():
+            fps = m.get("encode_fps", "")
+            print(f"{case:<28}{stage:<12}{m['wall_s']:>9.3f}{m['cpu_s']:>9.3f}{m['peak_rss_mb']:>9.1f}{fps:>9}")
+
+
+def _merge_repeats(runs: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Keep the best (fastest) value of each metric across repeats to reduce noise."""
+    merged: Dict[str, Dict[str, float]] = {}
+    for run in runs:
+        for stage, metrics in run.items():
+            best = merged.setdefault(stage, dict(metrics))
+            for metric, value in metrics.items():
+                if metric in LOWER_IS_WORSE:
+                    best[metric] = max(best[metric], value)
+                else:
+                    best[metric] = min(best[metric], value)
+    return merged
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the VideoEngine pipeline offline.")
+    parser.add_argument("--cases", choices=["all", "synthetic", "projects"], default="all")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; best value is kept")
+    parser.add_argument("--network", action="store_true", help="Download remote images used by projects")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="Write the raw results as JSON")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg not found on PATH; the benchmark needs it for the encode stage.")
+        return 2
+
+    stub = StubVoiceGenerator(BENCH_DIR / "stub_tts")
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for case in collect_cases(args.cases, args.network):
+        runs = [await bench_case(case, stub) for _ in range(max(1, args.repeat))]
+        results[case["name"]] = _merge_repeats(runs)
+
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
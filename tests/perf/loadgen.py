@@ -0,0 +1,280 @@
+"""
+HTTP load generator for the JSON to Video API.
+
+Submits /generate requests with an open-loop Poisson arrival process, using a
+weighted mix of the bundled tests/data/*.json projects, and polls
+/status/{job_id} like a real client until each job finishes. Reports
+p50/p95/p99 latency per endpoint, end-to-end job latency, throughput and
+error rate, and can export everything as JSON for comparison across versions.
+
+Usage (from the repository root, server running):
+    python -m tests.perf.loadgen --rate 5 --duration 60
+    python -m tests.perf.loadgen --rate 20 --duration 30 --mix text=3,image=1 --output load.json
+    python -m tests.perf.loadgen --in-process --rate 2 --duration 10   # no server needed
+
+In-process mode runs background renders inside the /generate request, so its
+latencies are only useful as a smoke test; measure a real uvicorn process.
+
+For render-free API measurements, run the server with TTS_BACKEND=local.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from src.config_loader import ROOT_DIR
+
+DATA_DIR = ROOT_DIR / "tests" / "data"
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty sample."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+        "max_ms": _ms(max(values) if values else None),
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def load_projects(mix: Optional[str]) -> List[Tuple[str, Dict[str, Any], float]]:
+    """
+    Return (name, payload, weight) for the requested mix.
+
+    mix is "name=weight,name=weight" using tests/data file stems; without it
+    every bundled project that looks like a VideoProject gets weight 1.
+    """
+    available = {}
+    for path in sorted(DATA_DIR.glob("*.json")):
+        payload = json.loads(path.read_text())
+        if isinstance(payload, dict) and "name" in payload and "duration" in payload:
+            available[path.stem] = payload
+
+    if not mix:
+        return [(name, payload, 1.0) for name, payload in available.items()]
+
+    selected = []
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in available:
+            raise SystemExit(f"Unknown project '{name}'. Available: {', '.join(available)}")
+        selected.append((name, available[name], float(weight or 1)))
+    return selected
+
+
+class LoadStats:
+    """Collects per-endpoint latencies, errors and job outcomes."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.status_codes: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.job_latencies: List[float] = []
+        self.job_outcomes: Dict[str, int] = defaultdict(int)
+        self.by_project: Dict[str, List[float]] = defaultdict(list)
+
+    def record(self, endpoint: str, elapsed: float, status_code: Optional[int]):
+        self.requests[endpoint] += 1
+        self.latencies[endpoint].append(elapsed)
+        if status_code is None:
+            self.errors[endpoint] += 1
+            return
+        self.status_codes[endpoint][status_code] += 1
+        if status_code >= 400:
+            self.errors[endpoint] += 1
+
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.stats = LoadStats()
+        self.projects = load_projects(args.mix)
+        self.rng = random.Random(args.seed)
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - start, None)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - start, response.status_code)
+        return response
+
+    async def run_job(self, name: str, payload: Dict[str, Any]):
+        submitted = time.perf_counter()
+        response = await self._request("POST /generate", "POST", "/generate", json=payload)
+        if response is None or response.status_code >= 400:
+            self.stats.job_outcomes["rejected"] += 1
+            return
+        job_id = response.json()["job_id"]
+
+        deadline = submitted + self.args.job_timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(self.args.poll_interval)
+            response = await self._request("GET /status", "GET", f"/status/{job_id}")
+            if response is None or response.status_code >= 400:
+                continue
+            status = response.json().get("status")
+            if status in TERMINAL_STATUSES:
+                elapsed = time.perf_counter() - submitted
+                self.stats.job_outcomes[status] += 1
+                if status == "completed":
+                    self.stats.job_latencies.append(elapsed)
+                    self.stats.by_project[name].append(elapsed)
+                    if self.args.download:
+                        await self._request("GET /download", "GET", f"/download/{job_id}")
+                return
+        self.stats.job_outcomes["timed_out"] += 1
+
+    async def run(self) -> Dict[str, Any]:
+        names = [p[0] for p in self.projects]
+        payloads = {p[0]: p[1] for p in self.projects}
+        weights = [p[2] for p in self.projects]
+
+        tasks = []
+        start = time.perf_counter()
+        end = start + self.args.duration
+        submitted = 0
+        while time.perf_counter() < end and (not self.args.jobs or submitted < self.args.jobs):
+            name = self.rng.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(self.run_job(name, payloads[name])))
+            submitted += 1
+            # Open-loop Poisson arrivals: submissions don't wait for responses
+            await asyncio.sleep(self.rng.expovariate(self.args.rate))
+        submit_window = time.perf_counter() - start
+
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        return self.report(submitted, submit_window, elapsed)
+
+    def report(self, submitted: int, submit_window: float, elapsed: float) -> Dict[str, Any]:
+        s = self.stats
+        total_requests = sum(s.requests.values())
+        total_errors = sum(s.errors.values())
+        return {
+            "meta": {
+                "target": self.args.url if not self.args.in_process else "in-process",
+                "version": _git_revision(),
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+                "config": {
+                    "rate": self.args.rate,
+                    "duration": self.args.duration,
+                    "poll_interval": self.args.poll_interval,
+                    "mix": {name: weight for name, _, weight in self.projects},
+                    "seed": self.args.seed,
+                },
+            },
+            "jobs": {
+                "submitted": submitted,
+                "offered_rate": round(submitted / submit_window, 3) if submit_window else None,
+                "outcomes": dict(s.job_outcomes),
+                "throughput_per_s": round(s.job_outcomes.get("completed", 0) / elapsed, 3),
+                "end_to_end": summarize(s.job_latencies),
+                "end_to_end_by_project": {k: summarize(v) for k, v in s.by_project.items()},
+            },
+            "endpoints": {
+                endpoint: {
+                    **summarize(s.latencies[endpoint]),
+                    "errors": s.errors[endpoint],
+                    "error_rate": round(s.errors[endpoint] / s.requests[endpoint], 4),
+                    "status_codes": dict(s.status_codes[endpoint]),
+                }
+                for endpoint in s.requests
+            },
+            "requests": {
+                "total": total_requests,
+                "per_s": round(total_requests / elapsed, 2) if elapsed else None,
+                "error_rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            },
+            "elapsed_s": round(elapsed, 2),
+        }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any]):
+    jobs = report["jobs"]
+    print(f"Jobs submitted: {jobs['submitted']} (offered {jobs['offered_rate']}/s), outcomes: {jobs['outcomes']}")
+    print(f"Throughput: {jobs['throughput_per_s']} jobs/s, requests: {report['requests']['per_s']}/s, "
+          f"error rate: {report['requests']['error_rate']:.2%}")
+    e2e = jobs["end_to_end"]
+    print(f"End-to-end job latency: p50={e2e['p50_ms']}ms p95={e2e['p95_ms']}ms p99={e2e['p99_ms']}ms")
+    print(f"\n{'endpoint':<16}{'count':>8}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}{'errors':>8}")
+    for endpoint, m in report["endpoints"].items():
+        print(f"{endpoint:<16}{m['count']:>8}{m['p50_ms']!s:>10}{m['p95_ms']!s:>10}{m['p99_ms']!s:>10}{m['errors']:>8}")
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the JSON to Video API.")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--in-process", action="store_true", help="Drive src.main:app in-process via ASGI")
+    parser.add_argument("--rate", type=float, default=1.0, help="Job submissions per second (Poisson)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Submission window in seconds")
+    parser.add_argument("--jobs", type=int, default=0, help="Stop after this many submissions (0 = no limit)")
+    parser.add_argument("--mix", help="Weighted project mix, e.g. text=3,image=1 (tests/data stems)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between status polls")
+    parser.add_argument("--job-timeout", type=float, default=600.0, help="Give up polling a job after this")
+    parser.add_argument("--download", action="store_true", help="Download each completed video")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    timeout = httpx.Timeout(60.0)
+    if args.in_process:
+        from src.main import app
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadgen",
+                                   timeout=timeout)
+    else:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+
+    async with client:
+        report = await LoadGenerator(client, args).run()
+
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nReport written to {args.output}")
+    return 0 if report["requests"]["error_rate"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
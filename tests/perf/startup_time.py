@@ -0,0 +1,75 @@
+"""
+Cold-start measurement for the API process.
+
+Spawns fresh interpreters that import src.main (what every new uvicorn worker
+does) and reports the median/max wall time. Fails when the median exceeds
+--max-ms, so it can gate regressions in CI.
+
+Usage (from the repository root):
+    python -m tests.perf.startup_time
+    python -m tests.perf.startup_time --runs 20 --max-ms 800
+    python -m tests.perf.startup_time --importtime   # show the slowest imports
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from src.config_loader import ROOT_DIR
+
+
+def measure(runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import src.main"], cwd=ROOT_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def slowest_imports(limit: int = 15) -> List[str]:
+    """Top cumulative entries from python -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return [f"{us / 1000:8.1f} ms  {name}" for us, name in rows[:limit]]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure API cold-start import time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=1500.0, help="Fail if the median exceeds this")
+    parser.add_argument("--importtime", action="store_true", help="List the slowest imports")
+    args = parser.parse_args(argv)
+
+    # Warm the filesystem cache and .pyc files so runs are comparable
+    measure(1)
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+    print(f"import src.main: median {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms "
+          f"over {args.runs} runs")
+
+    if args.importtime:
+        print("\nSlowest imports (cumulative):")
+        for row in slowest_imports():
+            print(f"  {row}")
+
+    if median > args.max_ms:
+        print(f"Startup regression: median {median:.0f} ms > {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
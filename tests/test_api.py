@@ -13,6 +13,16 @@ def test_generate_video_validation_error():
     # Missing required fields
     response = client.post("/generate", json={})
     assert response.status_code == 422
+    assert {tuple(e["loc"]) for e in response.json()["detail"]} == {("body", "name"), ("body", "duration")}
+    assert client.post("/generate", content=b"{not json", headers={"content-type": "application/json"}).status_code == 422
+
+def test_generate_rejects_oversize_body(monkeypatch):
+    from src import main
+    monkeypatch.setattr(main, "MAX_BODY_BYTES", 100)
+    response = client.post("/generate", json={"name": "big", "duration": 5, "visuals": [{"type": "TEXT", "text": "x" * 200}]})
+    assert response.status_code == 413
+    schema = client.get("/openapi.json").json()
+    assert "VideoProject" in schema["components"]["schemas"] and "Visual" in schema["components"]["schemas"]
 
 @patch("src.main.generate_video")
 def test_generate_video_success(mock_generate):
@@ -51,3 +61,16 @@ def test_generate_video_success(mock_generate):
     import os
     if os.path.exists("dummy_video.mp4"):
         os.remove("dummy_video.mp4")
+
+@patch("src.main.generate_video")
+def test_backlog_is_kept_as_a_running_total(mock_generate, monkeypatch):
+    from src import main
+    scans = []
+    monkeypatch.setattr(main, "scan_backlog", lambda: scans.append(1) or 0.0)
+    monkeypatch.setattr(main, "backlog", main.Backlog(refresh=3600))
+    payload = {"name": "short", "duration": 5}
+    first = client.post("/generate", json=payload).json()
+    second = client.post("/generate", json=payload).json()
+    # One scan; the second submission's ETA already includes the first
+    assert len(scans) == 1
+    assert second["eta_seconds"] == round(first["estimated_seconds"] / main.RENDER_SLOTS + second["estimated_seconds"], 1)
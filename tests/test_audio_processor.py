@@ -0,0 +1,60 @@
+import asyncio
+import wave
+
+import numpy as np
+
+from src.processors.audio_processor import AudioProcessor
+
+RATE = AudioProcessor.SAMPLE_RATE
+
+
+def write_tone(path, seconds, amplitude):
+    samples = (np.full(int(seconds * RATE), amplitude) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(samples.tobytes())
+    return str(path)
+
+
+def level(mix, t):
+    return round(float(mix[int(t * RATE), 0]), 2)
+
+
+def test_mix_applies_offsets_gains_and_trims_without_renormalizing(tmp_path):
+    voice = write_tone(tmp_path / "voice.wav", 1, 0.25)
+    music = write_tone(tmp_path / "music.wav", 10, 0.5)
+
+    mix = asyncio.run(AudioProcessor.mix_pcm([
+        {"src": voice, "videoBegin": 1},
+        {"src": music, "volume": 0.5, "audioBegin": 8, "audioEnd": 10, "videoBegin": 0.5},
+    ], 4, cache_dir=tmp_path / "pcm"))
+    assert mix.shape == (4 * RATE, 2)
+    # amix would have halved both inputs; here gains are exactly what was asked for
+    assert [level(mix, t) for t in (0.2, 0.7, 1.5, 2.7, 3.5)] == [0.0, 0.25, 0.5, 0.0, 0.0]
+
+    out = asyncio.run(AudioProcessor.mix_audios([{"src": voice}], 2, str(tmp_path / "out.wav"), cache_dir=tmp_path / "pcm"))
+    with wave.open(out) as f:
+        assert (f.getnchannels(), f.getframerate(), f.getnframes()) == (2, RATE, 2 * RATE)
+
+
+def test_ducked_bed_drops_while_narration_plays(tmp_path):
+    voice = write_tone(tmp_path / "voice.wav", 1, 0.5)
+    music = write_tone(tmp_path / "music.wav", 5, 0.4)
+
+    mix = asyncio.run(AudioProcessor.mix_pcm([{"src": music, "duck": 0.25}, {"src": voice, "videoBegin": 2}], 5, cache_dir=tmp_path / "pcm"))
+    assert level(mix, 1.0) == 0.4
+    assert level(mix, 2.5) == 0.6    # 0.5 narration + 0.4 * 0.25
+    assert level(mix, 4.5) == 0.4    # recovered after hold and release
+
+
+def test_concurrent_decodes_of_one_source_share_the_cached_pcm(tmp_path):
+    music = write_tone(tmp_path / "music.wav", 2, 0.5)
+
+    async def decode_twice():
+        return await asyncio.gather(*(AudioProcessor.decode_pcm(music, tmp_path / "pcm") for _ in range(2)))
+
+    first, second = asyncio.run(decode_twice())
+    assert first.shape == second.shape == (2 * RATE, 1)
+    assert sorted(p.suffix for p in (tmp_path / "pcm").rglob("*") if p.is_file()) == [".lock", ".wav"]
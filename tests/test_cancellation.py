@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import video_processor
+from src.jobs import job_manager
+from src.main import app
+from src.processors.process_group import managed_process
+from src.schemas import JobStatus
+from src.video_processor import JobAborted, _run_guarded
+
+
+def running(pid):
+    # Orphans killed with the group may linger as zombies until init reaps them
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_delete_cancels_running_job_and_kills_its_subprocesses(monkeypatch):
+    monkeypatch.setattr(video_processor, "CANCEL_POLL_INTERVAL", 0.05)
+    job_id = job_manager.create_job("slow")
+    pids = []
+
+    async def render(on_stage):
+        on_stage("encode")
+        # A shell that starts a child: both must die with the job
+        async with managed_process("sh", "-c", "sleep 30 & echo $!; wait", stdout=asyncio.subprocess.PIPE) as process:
+            pids.extend([process.pid, int(await process.stdout.readline())])
+            await process.wait()
+        return "never.mp4"
+
+    async def run():
+        rendering = asyncio.create_task(_run_guarded(job_id, render))
+        while len(pids) < 2:
+            await asyncio.sleep(0.01)
+        assert TestClient(app).delete(f"/jobs/{job_id}").status_code == 202
+        with pytest.raises(JobAborted):
+            await rendering
+
+    asyncio.run(run())
+    assert job_manager.get_job(job_id)["status"] == JobStatus.CANCELLED
+    assert not any(running(pid) for pid in pids)
+    assert TestClient(app).delete(f"/jobs/{job_id}").status_code == 409
+
+
+def test_stage_past_its_deadline_times_out(monkeypatch):
+    monkeypatch.setattr(video_processor, "CANCEL_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(video_processor, "stage_timeout", lambda stage: 0.1 if stage == "tts" else 0)
+    job_id = job_manager.create_job("stuck")
+
+    async def render(on_stage):
+        on_stage("tts")
+        await asyncio.sleep(30)
+
+    with pytest.raises(JobAborted) as aborted:
+        asyncio.run(_run_guarded(job_id, render))
+    assert aborted.value.status == JobStatus.TIMED_OUT
+    job = job_manager.get_job(job_id)
+    assert job["status"] == JobStatus.TIMED_OUT and "'tts'" in job["error"]
+
+
+def test_queued_job_is_cancelled_before_it_starts():
+    job_id = job_manager.create_job("queued")
+    response = TestClient(app).delete(f"/jobs/{job_id}")
+    assert response.status_code == 202 and response.json()["status"] == "cancelled"
+    with pytest.raises(JobAborted):
+        asyncio.run(_run_guarded(job_id, lambda on_stage: asyncio.sleep(0)))
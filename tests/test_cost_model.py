@@ -0,0 +1,48 @@
+import time
+
+from src.cost_model import CostModel, PRIORS, eta_seconds, extract_features
+from src.job_queue import JobQueue
+from src.schemas import JobStatus, VideoProject
+
+
+def test_model_learns_from_recorded_timings(tmp_path):
+    project = VideoProject(name="t", duration=10, voices=[{"text": "hello " * 200}])
+    features = extract_features(project)
+    model = CostModel(tmp_path / "model.json", regularization=1.0)
+    prior = model.estimate(features)
+    # Another process's instance: loaded once, then only rechecked every refresh_interval
+    reader = CostModel(tmp_path / "model.json", regularization=1.0, refresh_interval=3600)
+    assert reader.estimate(features) == prior
+    assert prior["tts"] == round(PRIORS["tts"][0] + PRIORS["tts"][1] * features["script_kchars"], 3)
+
+    for _ in range(50):
+        model.record(features, {"tts": 20.0, "encode": 3.0})
+
+    # A second instance (another process) picks up the shared file
+    learned = CostModel(tmp_path / "model.json", regularization=1.0).estimate(features)
+    assert abs(learned["tts"] - 20.0) < 1.0
+    assert abs(learned["encode"] - 3.0) < 1.0
+    assert learned["images"] == prior["images"]
+    assert reader.estimate(features) == prior
+    reader.refresh_interval = 0
+    assert reader.estimate(features) == learned
+
+
+def test_eta_counts_down_through_stages():
+    now = time.time()
+    job = {"status": JobStatus.QUEUED, "estimate": {"tts": 4, "images": 1, "sync": 0, "encode": 5}, "eta_at": now + 30}
+    assert eta_seconds(job, now) == 30
+
+    job.update(status=JobStatus.PROCESSING, stage="images", stage_started_at=now - 0.5)
+    assert eta_seconds(job, now) == 5.5
+    job.update(status=JobStatus.COMPLETED)
+    assert eta_seconds(job, now) == 0
+    assert eta_seconds({"status": JobStatus.QUEUED}) is None
+
+
+def test_sjf_queue_prefers_short_jobs(tmp_path):
+    queue = JobQueue(tmp_path / "queue.db", policy="sjf", aging=0.0)
+    queue.enqueue("long", "{}", cost=120)
+    queue.enqueue("short", "{}", cost=5)
+    assert queue.claim("w1", 30).job_id == "short"
+    assert queue.claim("w1", 30).job_id == "long"
@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from src import main
+from src.config_loader import ROOT_DIR
+from src.jobs import job_manager
+from src.schemas import JobStatus
+
+
+def test_accel_download_leaves_the_body_to_the_proxy(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "DOWNLOAD_OFFLOAD", "accel")
+    output_dir = ROOT_DIR / "output"
+    output_dir.mkdir(exist_ok=True)
+    video = output_dir / "video_download_test.mp4"
+    video.write_bytes(b"video bytes")
+    outside = tmp_path / "elsewhere.mp4"
+    outside.write_bytes(b"other bytes")
+    try:
+        job_id = job_manager.create_job("clip")
+        job_manager.update_job(job_id, status=JobStatus.COMPLETED, output_file=str(video),
+                               renditions={"small": str(outside)})
+        client = TestClient(main.app)
+
+        response = client.get(f"/download/{job_id}")
+        assert response.status_code == 200 and response.content == b""
+        assert response.headers["x-accel-redirect"] == "/output/video_download_test.mp4"
+        assert response.headers["content-disposition"] == 'attachment; filename="clip.mp4"'
+
+        # Files outside the proxy's root are still served, by the API itself
+        response = client.get(f"/download/{job_id}?rendition=small")
+        assert response.content == b"other bytes" and "x-accel-redirect" not in response.headers
+    finally:
+        video.unlink()
@@ -0,0 +1,141 @@
+import asyncio
+import time
+
+from src.job_queue import JobQueue
+from src.jobs import JobManager, InMemoryJobStore
+from src.schemas import JobStatus, VideoProject
+from src import worker as worker_module
+
+
+def test_claim_heartbeat_and_complete(tmp_path):
+    queue = JobQueue(tmp_path / "queue.db")
+    queue.enqueue("a", "{}")
+    queue.enqueue("b", "{}")
+
+    first = queue.claim("w1", lease_seconds=30)
+    second = queue.claim("w2", lease_seconds=30)
+    assert (first.job_id, second.job_id) == ("a", "b")
+    assert queue.claim("w3", lease_seconds=30) is None
+
+    assert queue.heartbeat("a", "w1", 30)
+    assert not queue.heartbeat("a", "w2", 30)
+    queue.complete("a", "w1")
+    assert queue.stats() == {"done": 1, "leased": 1}
+
+
+def test_expired_lease_is_reclaimed_until_attempts_run_out(tmp_path):
+    queue = JobQueue(tmp_path / "queue.db", max_attempts=2)
+    queue.enqueue("a", "{}")
+
+    assert queue.claim("crashed", lease_seconds=0.01).attempts == 1
+    time.sleep(0.02)
+    item = queue.claim("w2", lease_seconds=0.01)
+    assert (item.job_id, item.attempts) == ("a", 2)
+    time.sleep(0.02)
+    assert queue.claim("w3", lease_seconds=30) is None
+    assert queue.expire_exhausted() == ["a"]
+
+
+def test_worker_renders_queued_jobs(tmp_path, monkeypatch):
+    manager = JobManager(store=InMemoryJobStore())
+    monkeypatch.setattr(worker_module, "job_manager", manager)
+    rendered = []
+
+    async def fake_generate_video(project, job_id):
+        rendered.append(project.name)
+        manager.update_job(job_id, status=JobStatus.COMPLETED, progress=100)
+
+    monkeypatch.setattr("src.video_processor.generate_video", fake_generate_video)
+
+    queue = JobQueue(tmp_path / "queue.db")
+    job_ids = []
+    for name in ("one", "two", "three"):
+        job_id = manager.create_job(name)
+        queue.enqueue(job_id, VideoProject(name=name, duration=1).model_dump_json())
+        job_ids.append(job_id)
+
+    async def run():
+        worker = worker_module.RenderWorker(queue, concurrency=2, poll_interval=0.01)
+        task = asyncio.create_task(worker.run())
+        while queue.stats().get("done", 0) < 3:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await task
+
+    asyncio.run(run())
+    assert sorted(rendered) == ["one", "three", "two"]
+    assert all(manager.get_job(j)["status"] == JobStatus.COMPLETED for j in job_ids)
+
+
+def test_worker_stops_render_when_lease_is_lost(tmp_path, monkeypatch):
+    manager = JobManager(store=InMemoryJobStore())
+    monkeypatch.setattr(worker_module, "job_manager", manager)
+    stopped = asyncio.Event()
+
+    async def slow_generate_video(project, job_id):
+        try:
+            await asyncio.sleep(30)
+        finally:
+            stopped.set()
+
+    monkeypatch.setattr("src.video_processor.generate_video", slow_generate_video)
+
+    queue = JobQueue(tmp_path / "queue.db")
+    job_id = manager.create_job("slow")
+    queue.enqueue(job_id, VideoProject(name="slow", duration=1).model_dump_json())
+    # Another worker reclaims the job: the heartbeat can no longer extend the lease
+    monkeypatch.setattr(queue, "heartbeat", lambda *args: False)
+
+    async def run():
+        worker = worker_module.RenderWorker(queue, lease_seconds=0.03, poll_interval=0.01)
+        task = asyncio.create_task(worker.run())
+        await asyncio.wait_for(stopped.wait(), timeout=5)
+        worker.stop()
+        await task
+
+    asyncio.run(run())
+    assert "done" not in queue.stats()
+    assert manager.get_job(job_id)["status"] == JobStatus.QUEUED
+
+
+def test_fair_share_lanes_and_starvation_guard(tmp_path):
+    queue = JobQueue(tmp_path / "queue.db", max_wait=60, weights={"big": 2.0})
+    for i in range(4):
+        queue.enqueue(f"batch{i}", "{}", cost=10, client="big", priority="bulk")
+    for i in range(4):
+        queue.enqueue(f"std{i}", "{}", cost=10, client="big")
+    queue.enqueue("small", "{}", cost=12, client="small")
+    queue.enqueue("draft", "{}", cost=12, client="small", priority="interactive")
+
+    # The draft skips the standard lane. Then "big" (weight 2) gets three 10 s renders
+    # in before small's 12 s of usage is matched; bulk waits for the standard lane to drain.
+    expected = ["draft", "std0", "std1", "std2", "small", "std3", "batch0", "batch1", "batch2", "batch3"]
+    positions = queue.positions(expected)
+    assert sorted(positions, key=positions.get) == expected
+    assert [queue.claim("w", 30).job_id for _ in range(5)] == expected[:5]
+
+    # A bulk job waiting past max_wait jumps every lane
+    queue._conn().execute("UPDATE queue SET enqueued_at = enqueued_at - 120 WHERE job_id = 'batch3'")
+    assert queue.positions(["batch3"]) == {"batch3": 1}
+    assert queue.claim("w", 30).job_id == "batch3"
+
+
+def test_status_reports_queue_position(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src import main
+
+    queue = JobQueue(tmp_path / "queue.db")
+    monkeypatch.setattr(main, "get_render_mode", lambda: "queue")
+    monkeypatch.setattr(main, "get_job_queue", lambda: queue)
+    client = TestClient(main.app)
+    project = {"name": "clip", "duration": 1}
+
+    batch = [client.post("/generate?priority=bulk", json=project, headers={"X-Client-Id": "batch"}).json()["job_id"]
+             for _ in range(3)]
+    draft = client.post("/generate?priority=interactive", json=project, headers={"X-Client-Id": "editor"}).json()["job_id"]
+    assert client.post("/generate?priority=urgent", json=project).status_code == 422
+
+    status = client.get(f"/status/{draft}").json()
+    assert status["queue_position"] == 1 and status["priority"] == "interactive" and status["queued_seconds"] >= 0
+    bulk = client.post("/status", json={"job_ids": batch}).json()["jobs"]
+    assert [job["queue_position"] for job in bulk] == [2, 3, 4]
@@ -0,0 +1,38 @@
+import pytest
+
+from src.jobs import InMemoryJobStore, JobManager, SQLiteJobStore
+from src.schemas import JobStatus
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def manager(request, tmp_path):
+    if request.param == "memory":
+        return JobManager(store=InMemoryJobStore())
+    return JobManager(store=SQLiteJobStore(tmp_path / "jobs.db"))
+
+
+def test_job_lifecycle(manager):
+    job_id = manager.create_job("demo")
+    job = manager.get_job(job_id)
+    assert job["status"] == JobStatus.QUEUED
+    assert job["progress"] == 0
+
+    manager.update_job(job_id, status=JobStatus.PROCESSING, progress=10, stage="voice")
+    manager.update_job(job_id, status=JobStatus.COMPLETED, progress=100, output_file="/tmp/out.mp4")
+
+    job = manager.get_job(job_id)
+    assert job["status"] == JobStatus.COMPLETED
+    assert job["output_file"] == "/tmp/out.mp4"
+    assert job["stage"] == "voice"
+    assert [j["job_id"] for j in manager.list_jobs(status=JobStatus.COMPLETED)] == [job_id]
+    assert manager.get_job("missing") is None
+
+
+def test_sqlite_store_is_shared_between_managers(tmp_path):
+    # Two managers on one file stand in for two uvicorn worker processes
+    api = JobManager(store=SQLiteJobStore(tmp_path / "jobs.db"))
+    other_worker = JobManager(store=SQLiteJobStore(tmp_path / "jobs.db"))
+
+    job_id = api.create_job("shared")
+    other_worker.update_job(job_id, progress=55)
+    assert api.get_job(job_id)["progress"] == 55
@@ -0,0 +1,35 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.processors import media_cache
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "8")
+        self.end_headers()
+        for chunk in (b"musi", b"cbed"):
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            time.sleep(0.1)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_concurrent_fetches_of_one_url_both_succeed(tmp_path, monkeypatch):
+    monkeypatch.setattr(media_cache, "_cache_dir", lambda: tmp_path)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/bed.mp3"
+    try:
+        with ThreadPoolExecutor(2) as pool:
+            paths = list(pool.map(media_cache.fetch_media, [url, url]))
+    finally:
+        server.shutdown()
+
+    assert paths[0] == paths[1] and open(paths[0], "rb").read() == b"musicbed"
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [paths[0].rsplit("/", 1)[1]]
@@ -0,0 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from src.processors import mezzanine
+from src.processors.media_cache import MediaInfo
+from src.processors.mezzanine import MezzanineCache, _atempo
+
+
+def fake_ffmpeg(monkeypatch, info):
+    commands = []
+
+    @asynccontextmanager
+    async def run(*cmd, **kwargs):
+        commands.append(list(cmd))
+        open(cmd[-1], "wb").close()
+
+        async def communicate():
+            return b"", b""
+        yield SimpleNamespace(returncode=0, communicate=communicate)
+
+    async def probe(path):
+        return info
+
+    async def keyframe(path, t):
+        return 2.0
+
+    monkeypatch.setattr(mezzanine, "managed_process", run)
+    monkeypatch.setattr(mezzanine, "probe_media", probe)
+    monkeypatch.setattr(mezzanine, "keyframe_before", keyframe)
+    return commands
+
+
+def test_same_content_is_transcoded_once(tmp_path, monkeypatch):
+    commands = fake_ffmpeg(monkeypatch, MediaInfo(1920, 1080, 10.0, True, 25.0, "h264", "yuv420p"))
+    first, second = tmp_path / "a.mp4", tmp_path / "b.mp4"
+    first.write_bytes(b"same clip")
+    second.write_bytes(b"same clip")
+    cache = MezzanineCache(cache_dir=tmp_path / "cache", fps=30)
+
+    clip = asyncio.run(cache.normalize(str(first), "VIDEO", begin=3, length=2, speed=2, scale=["scale=640:360"]))
+    assert asyncio.run(cache.normalize(str(second), "VIDEO", begin=3, length=2, speed=2, scale=["scale=640:360"])) == clip
+    assert len(commands) == 1
+    cmd = commands[0]
+    assert cmd[cmd.index("-ss") + 1] == "3" and cmd[cmd.index("-t") + 1] == "4"
+    assert "setpts=PTS/2.000000,fps=30" in cmd[cmd.index("-vf") + 1]
+    assert "atempo=2.000000" in cmd and not clip.copied
+
+
+def test_matching_clips_are_stream_copied_from_keyframe(tmp_path, monkeypatch):
+    commands = fake_ffmpeg(monkeypatch, MediaInfo(1280, 720, 10.0, False, 30.0, "h264", "yuv420p"))
+    source = tmp_path / "clip.mp4"
+    source.write_bytes(b"clip")
+
+    clip = asyncio.run(MezzanineCache(cache_dir=tmp_path, fps=30).normalize(str(source), "VIDEO", begin=2.5, length=3))
+    assert clip.copied and clip.offset == 0.5 and clip.path.endswith(".mkv")
+    assert commands[0][commands[0].index("-c") + 1] == "copy"
+    assert _atempo(4.0) == ["atempo=2.0", "atempo=2.000000"]
@@ -0,0 +1,68 @@
+import os
+
+from src.jobs import InMemoryJobStore, JobManager
+from src import retention as retention_module
+from src.retention import RetentionManager, job_output_dir
+from src.schemas import JobStatus
+
+HOUR = 3600
+
+
+def finished_job(jobs, tmp_path, name, size, updated_at, **fields):
+    video = tmp_path / "output" / f"{name}.mp4"
+    video.parent.mkdir(exist_ok=True)
+    video.write_bytes(b"x" * size)
+    job_id = jobs.create_job(name)
+    jobs.update_job(job_id, status=JobStatus.COMPLETED, output_file=str(video), **fields)
+    jobs.store.jobs[job_id]["updated_at"] = updated_at
+    return job_id, video
+
+
+def test_sweep_applies_ttls_quota_and_orphan_rules(tmp_path):
+    jobs = JobManager(store=InMemoryJobStore())
+    now = 1_000_000.0
+    work_dir = tmp_path / "scratch" / "job_old"
+    work_dir.mkdir(parents=True)
+    old, old_video = finished_job(jobs, tmp_path, "old", 10, now - 10 * HOUR, work_dir=str(work_dir))
+    # Finished long ago but downloaded recently: kept over the newer, never downloaded job
+    busy, busy_video = finished_job(jobs, tmp_path, "busy", 60, now - 5 * HOUR, downloaded_at=now - 60)
+    idle, idle_video = finished_job(jobs, tmp_path, "idle", 60, now - 2 * HOUR)
+    ancient, _ = finished_job(jobs, tmp_path, "ancient", 10, now - 100 * HOUR)
+    orphan = tmp_path / "scratch" / "job_crashed"
+    orphan.mkdir()
+    os.utime(orphan, (now - 2 * HOUR, now - 2 * HOUR))
+
+    retention = RetentionManager(
+        jobs, output_dir=tmp_path / "output", orphan_roots=[tmp_path / "scratch"],
+        output_ttl=8 * HOUR, max_output_bytes=100, orphan_ttl=HOUR, job_ttl=48 * HOUR
+    )
+    stats = retention.sweep(now=now)
+
+    assert (stats["expired"], stats["evicted"], stats["orphans"], stats["pruned"]) == (1, 1, 1, 1)
+    assert jobs.get_job(ancient) is None
+    assert jobs.get_job(old)["expired_at"] == now and not old_video.exists() and not work_dir.exists()
+    assert jobs.get_job(idle)["expired_at"] == now and not idle_video.exists()
+    assert busy_video.exists() and not jobs.get_job(busy).get("expired_at")
+    assert not orphan.exists()
+
+
+def test_outputs_are_sharded_by_job_id():
+    shard = job_output_dir("0f8fad5b-d9cb-469f-a165-70867728950e")
+    assert len(shard.parent.name) == len(shard.name) == 2
+    assert shard == job_output_dir("0f8fad5b-d9cb-469f-a165-70867728950e") != job_output_dir("other")
+
+
+def test_only_generated_audio_is_swept_from_the_artifacts_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention_module, "ARTIFACTS_DIR", tmp_path)
+    now = 1_000_000.0
+    for name in ("default.mp3", "voice-ts-0a1b2c.mp3", "trimmed-demo-default-30s.mp3", "3.png"):
+        (tmp_path / name).write_bytes(b"x")
+        os.utime(tmp_path / name, (now - 48 * HOUR, now - 48 * HOUR))
+
+    retention = RetentionManager(
+        JobManager(store=InMemoryJobStore()), output_dir=tmp_path / "output", orphan_roots=[tmp_path], orphan_ttl=HOUR
+    )
+    assert retention.sweep(now=now)["orphans"] == 2
+    # Input audio a project refers to stays, however old
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["3.png", "default.mp3"]
+
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import subprocess
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from src.jobs import job_manager
+from src.main import app
+from src.processors.scratch import ScratchSpace
+from src.processors.video_engine import ARTIFACTS_FILE, VideoEngine
+from src.schemas import JobStatus
+
+
+class NoVoice:
+    voice_id = None
+
+
+def stored_job(tmp_path):
+    speech = tmp_path / "speech.mp3"
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=d=2", "-y", str(speech)], check=True
+    )
+    images = []
+    for i, color in enumerate(("red", "blue")):
+        images.append(str(tmp_path / f"proc_{i}.jpg"))
+        Image.new("RGB", (108, 192), color).save(images[-1])
+    alignment = {
+        "words": ["one", "two", "three", "four"],
+        "start_times": [0.0, 0.5, 1.0, 1.5],
+        "end_times": [0.4, 0.9, 1.4, 1.9],
+    }
+    with open(tmp_path / ARTIFACTS_FILE, "w") as f:
+        json.dump({"audio": str(speech), "alignment": alignment, "images": images, "renditions": [{"name": "96p"}]}, f)
+    return str(tmp_path)
+
+
+def test_retime_reuses_stored_artifacts(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    work_dir = stored_job(source)
+    before = sorted(p.name for p in source.iterdir())
+    scratch = ScratchSpace(ram_root="", disk_root=tmp_path / "scratch")
+    engine = VideoEngine(voice_generator=NoVoice(), scratch=scratch, output_dir=tmp_path / "output")
+    stages = []
+    video = asyncio.run(engine.retime(
+        work_dir, "video_retimed.mp4", marker_words=["three"], words_per_line=1,
+        on_stage=stages.append, retime_id="r1"
+    ))
+
+    assert stages == ["sync", "encode"] and set(engine.stage_timings) == {"sync", "encode"}
+    assert video == str(tmp_path / "output" / "video_retimed.mp4")
+    assert engine.rendition_paths == {"96p": str(tmp_path / "output" / "video_retimed_96p.mp4")}
+    # The source job's dir is only read; the retime's own scratch dir is gone
+    assert sorted(p.name for p in source.iterdir()) == before
+    assert not any((tmp_path / "scratch").iterdir())
+
+    # Key frames sit exactly on the image change and nowhere else
+    info = subprocess.run(
+        ["ffmpeg", "-i", video, "-vf", "showinfo", "-f", "null", "-"], capture_output=True, text=True
+    ).stderr
+    keyframes = [line.split("pts_time:")[1].split()[0] for line in info.splitlines() if "iskey:1" in line]
+    assert keyframes == ["0", "1"]
+
+
+@patch("src.main.retime_video")
+def test_retime_endpoint_queues_a_new_job(mock_retime, tmp_path):
+    client = TestClient(app)
+    job_id = job_manager.create_job("narrated")
+    assert client.post(f"/jobs/{job_id}/retime", json={}).status_code == 400
+
+    job_manager.update_job(job_id, status=JobStatus.COMPLETED, timings={"tts": 5.0, "sync": 0.1, "encode": 2.0})
+    assert client.post(f"/jobs/{job_id}/retime", json={}).status_code == 409
+
+    work_dir = stored_job(tmp_path)
+    job_manager.update_job(job_id, work_dir=work_dir)
+    response = client.post(f"/jobs/{job_id}/retime", json={"marker_words": ["three"], "words_per_line": 2})
+    assert response.status_code == 202
+    body = response.json()
+    assert body["job_id"] != job_id and body["estimated_seconds"] == 2.1
+    request, called_dir, retime_id = mock_retime.call_args.args
+    assert (request.marker_words, request.words_per_line, called_dir, retime_id) == (["three"], 2, work_dir, body["job_id"])
+    assert job_manager.get_job(retime_id)["retimed_from"] == job_id
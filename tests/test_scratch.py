@@ -0,0 +1,36 @@
+import os
+
+from src.processors.scratch import ScratchSpace, publish
+
+
+def test_work_dirs_spill_to_disk_once_ram_budget_is_used(tmp_path):
+    scratch = ScratchSpace(ram_root=tmp_path / "ram", disk_root=tmp_path / "disk", max_bytes=1000, job_reserve=400)
+    first = scratch.allocate("job_a")
+    assert scratch.allocate("job_b").parent == first.parent == tmp_path / "ram"
+    # Two fresh jobs already hold 800 bytes of reservations
+    assert scratch.allocate("job_c").parent == tmp_path / "disk"
+    (first / "speech.mp3").write_bytes(b"x" * 500)
+    assert scratch.ram_usage() == 900
+    assert ScratchSpace(ram_root="", disk_root=tmp_path / "disk").allocate("job_d").parent == tmp_path / "disk"
+
+
+def test_finished_work_dirs_leave_ram_and_their_reservation(tmp_path):
+    scratch = ScratchSpace(ram_root=tmp_path / "ram", disk_root=tmp_path / "disk", max_bytes=1000, job_reserve=400)
+    work_dir = scratch.allocate("job_a")
+    (work_dir / "speech.mp3").write_bytes(b"x" * 100)
+    assert scratch.ram_usage() == 400
+
+    kept = scratch.retain(work_dir)
+    assert kept == tmp_path / "disk" / "job_a" and (kept / "speech.mp3").read_bytes() == b"x" * 100
+    assert not work_dir.exists() and scratch.ram_usage() == 0
+
+
+def test_publish_moves_across_filesystems(tmp_path):
+    shm = "/dev/shm" if os.access("/dev/shm", os.W_OK) else str(tmp_path)
+    source = os.path.join(shm, f"publish-test-{os.getpid()}.mp4")
+    with open(source, "wb") as f:
+        f.write(b"video")
+    published = publish(source, tmp_path / "output")
+    assert published == str(tmp_path / "output" / os.path.basename(source))
+    assert open(published, "rb").read() == b"video" and not os.path.exists(source)
+    assert os.listdir(tmp_path / "output") == [os.path.basename(source)]
@@ -0,0 +1,33 @@
+import json
+import subprocess
+import sys
+
+from src.config_loader import ROOT_DIR
+
+# Modules that must not load until a render actually runs
+HEAVY_MODULES = ["elevenlabs", "PIL", "dotenv", "src.video_processor", "src.processors.video_engine"]
+
+
+def test_importing_api_skips_render_dependencies():
+    code = (
+        "import json, sys, src.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_help_page_is_cached_with_etag():
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    client = TestClient(app)
+    first = client.get("/help")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/help").content == first.content
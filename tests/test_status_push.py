@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import httpx
+
+from src.main import app
+from src.jobs import job_manager
+from src.schemas import JobStatus
+
+
+def test_bulk_status_reports_missing_jobs():
+    from fastapi.testclient import TestClient
+
+    job_id = job_manager.create_job("bulk")
+    response = TestClient(app).post("/status", json={"job_ids": [job_id, "nope"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [j["job_id"] for j in body["jobs"]] == [job_id]
+    assert body["missing"] == ["nope"]
+
+
+async def _advance(job_id):
+    await asyncio.sleep(0.05)
+    job_manager.update_job(job_id, status=JobStatus.PROCESSING, progress=40)
+    await asyncio.sleep(0.05)
+    job_manager.update_job(job_id, status=JobStatus.COMPLETED, progress=100)
+
+
+def test_long_poll_returns_on_update():
+    async def run():
+        job_id = job_manager.create_job("long-poll")
+        since = job_manager.get_job(job_id)["updated_at"]
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            updater = asyncio.create_task(_advance(job_id))
+            response = await client.get(f"/status/{job_id}", params={"wait": 5, "since": since})
+            await updater
+        return response.json()
+
+    body = asyncio.run(run())
+    assert body["status"] == "processing"
+    assert body["progress"] == 40
+
+
+def test_events_stream_until_completion():
+    async def run():
+        job_id = job_manager.create_job("sse")
+        events = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            updater = asyncio.create_task(_advance(job_id))
+            async with client.stream("GET", f"/events/{job_id}") as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        events.append(json.loads(line[6:])["status"])
+            await updater
+        return events
+
+    assert asyncio.run(run()) == ["queued", "processing", "completed"]
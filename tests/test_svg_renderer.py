@@ -0,0 +1,28 @@
+import asyncio
+
+from PIL import Image
+
+from src.processors.svg_renderer import SvgRenderer, color_source, detect_solid_color
+
+RED_BACKGROUND = '<svg width="1280" height="720" xmlns="http://www.w3.org/2000/svg"><rect width="100%" height="100%" fill="#ff0000"/></svg>'
+
+
+def test_detects_solid_color_svgs():
+    assert detect_solid_color(RED_BACKGROUND) == (255, 0, 0, 255)
+    assert detect_solid_color('<svg width="200" height="200"><rect width="200" height="200" fill="yellow" opacity="0.5"/></svg>') == (255, 255, 0, 128)
+    # Partial coverage, gradients and extra shapes need a real rasterizer
+    assert detect_solid_color('<svg width="200" height="200"><rect width="100" height="200" fill="red"/></svg>') is None
+    assert detect_solid_color('<svg viewBox="0 0 10 10"><rect width="10" height="10" fill="url(#g)"/></svg>') is None
+    assert detect_solid_color('<svg width="10" height="10"><rect width="100%" height="100%"/><circle r="2"/></svg>') is None
+
+
+def test_solid_color_renders_without_svg_engine_and_is_cached(tmp_path, monkeypatch):
+    renderer = SvgRenderer(cache_dir=tmp_path)
+    monkeypatch.setattr(SvgRenderer, "_rasterize", staticmethod(lambda *args: 1 / 0))
+
+    first = asyncio.run(renderer.render(RED_BACKGROUND, 64, 36))
+    assert first.color == (255, 0, 0, 255)
+    with Image.open(first.path) as image:
+        assert image.size == (64, 36) and image.getpixel((10, 10)) == (255, 0, 0, 255)
+    assert asyncio.run(renderer.render(RED_BACKGROUND, 64, 36)) == first
+    assert color_source(first.color, 1280, 720, 4) == "color=c=0xff0000@1.000:s=1280x720:r=30:d=4"
@@ -0,0 +1,33 @@
+from PIL import Image
+
+from src.processors.text_renderer import TextRenderer
+from src.schemas import Visual
+
+
+def test_renders_transparent_overlay_and_reuses_cache(tmp_path, monkeypatch):
+    renderer = TextRenderer(cache_dir=tmp_path)
+    visual = Visual(type="TEXT", text="Hello World", style={
+        "fontSize": "40px", "color": "#ff0000", "width": "300px", "height": "80px",
+        "backgroundColor": "rgba(0,0,255,0.5)", "borderRadius": "10px"
+    })
+
+    rendered = renderer.render(visual, (1280, 720))
+    assert (rendered.width, rendered.height) == (300, 80)
+    with Image.open(rendered.path) as image:
+        assert image.mode == "RGBA"
+        assert image.getpixel((0, 0))[3] == 0  # rounded corner stays transparent
+        assert image.getpixel((150, 5)) == (0, 0, 255, 128)
+        assert image.getchannel("R").getextrema()[1] > 200  # red glyphs
+
+    def no_redraw(*args):
+        raise AssertionError("cached text was drawn again")
+    monkeypatch.setattr(renderer, "_draw", no_redraw)
+    assert renderer.render(visual, (1280, 720)) == rendered
+
+
+def test_unsupported_styles_are_left_to_the_browser():
+    assert TextRenderer.can_render(Visual(type="TEXT", text="hi", style={"fontSize": 30}))
+    assert TextRenderer.can_render(Visual(type="TEXT", text="hi", style={"border": "1px solid rgba(0,0,0,0.2)"}))
+    assert not TextRenderer.can_render(Visual(type="TEXT", text="hi", style={"border": "2px dashed red"}))
+    assert not TextRenderer.can_render(Visual(type="TEXT", text="hi", style={"boxShadow": "0 1px red"}))
+    assert not TextRenderer.can_render(Visual(type="TEXT", html="<b>hi</b>"))
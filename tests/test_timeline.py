@@ -0,0 +1,118 @@
+import asyncio
+import subprocess
+
+from PIL import Image
+
+from src.processors.svg_renderer import SvgRenderer
+from src.processors.text_renderer import TextRenderer
+from src.processors.timeline import IntervalIndex, TimelineCompositor
+from src.schemas import VideoProject
+
+RED = '<svg width="64" height="36"><rect width="100%" height="100%" fill="#ff0000"/></svg>'
+BLUE = '<svg width="64" height="36"><rect width="100%" height="100%" fill="#0000ff"/></svg>'
+
+
+def compositor(tmp_path):
+    return TimelineCompositor(
+        fps=10, text_renderer=TextRenderer(cache_dir=tmp_path / "text"),
+        svg_renderer=SvgRenderer(cache_dir=tmp_path / "svg")
+    )
+
+
+def test_interval_index_queries():
+    index = IntervalIndex([(0, 10, "a"), (2, 3, "b"), (5, 6, "c"), (9, 9, "empty")])
+    assert sorted(p for _, _, p in index.overlapping(2.5, 5.5)) == ["a", "b", "c"]
+    assert index.overlapping(3, 5) == [(0, 10, "a")]
+    assert sorted(index.active_at(5)) == ["a", "c"]
+    assert index.active_at(6) == ["a"]
+    assert index.max_concurrency() == 2
+
+
+def test_hidden_layers_are_culled_and_windows_gate_overlays(tmp_path):
+    image = tmp_path / "logo.png"
+    Image.new("RGBA", (20, 10), (0, 255, 0, 128)).save(image)
+    project = VideoProject(name="t", width=64, height=36, duration=4, visuals=[
+        {"type": "IMAGE", "src": str(image), "x": 5, "y": 6, "enterBegin": 1, "exitEnd": 2},
+        {"type": "SVG", "svg": RED, "track": 1, "enterBegin": 0, "exitEnd": 3},
+        {"type": "IMAGE", "src": str(image), "track": 2, "width": 40, "height": 20, "enterBegin": 2.5},
+    ])
+    layers = asyncio.run(compositor(tmp_path).compile(project))
+
+    # The first image sits under the opaque full-frame red background for its whole window
+    assert [layer.index for layer in layers] == [1, 2]
+    assert layers[0].opaque and not layers[1].opaque
+    assert (layers[1].left, layers[1].top, layers[1].width, layers[1].height) == (12, 8, 40, 20)
+
+    cmd = compositor(tmp_path).build_command(project, layers, None, "out.mp4")
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "enable='between(t,0,3)'" in graph and "enable='between(t,2.5,4)'" in graph
+    assert "scale=40:20" in graph and "[aout]" not in graph
+
+
+def test_renders_fades_between_solid_layers(tmp_path):
+    project = VideoProject(name="t", width=64, height=36, duration=2, visuals=[
+        {"type": "SVG", "svg": RED, "exitEnd": 1},
+        {"type": "SVG", "svg": BLUE, "enterBegin": 1, "enterEnd": 2, "enterAnimation": "fade"},
+    ])
+    output = tmp_path / "out.mp4"
+    progress = []
+    renderer = compositor(tmp_path)
+    asyncio.run(renderer.render(project, str(output), on_progress=progress.append))
+    assert set(renderer.stage_timings) == {"images", "encode"}
+
+    def pixel(t):
+        raw = subprocess.run(
+            ["ffmpeg", "-v", "error", "-ss", str(t), "-i", str(output), "-frames:v", "1",
+             "-vf", "scale=1:1", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+            capture_output=True, check=True
+        ).stdout
+        return tuple(raw)
+
+    red, midway, blue = pixel(0.5), pixel(1.5), pixel(1.9)
+    assert red[0] > 200 and red[2] < 30
+    assert 60 < midway[2] < 200 and midway[0] < 30
+    assert blue[2] > 200
+    assert progress and progress[-1] == 1.0
+
+
+def test_zoomed_stills_are_prepared_once_and_animated_per_frame(tmp_path, monkeypatch):
+    prepared = []
+
+    def prepare_source(path, box, mode, crop, oversample):
+        prepared.append((box, mode, oversample))
+        return str(tmp_path / "prepared.jpg")
+    monkeypatch.setattr("src.processors.timeline.prepare_source", prepare_source)
+    image = tmp_path / "photo.jpg"
+    Image.new("RGB", (80, 60), (10, 20, 30)).save(image)
+    project = VideoProject(name="t", width=64, height=36, duration=2, visuals=[
+        {"type": "IMAGE", "src": str(image), "resize": "cover", "zoom": True},
+    ])
+    [layer] = asyncio.run(compositor(tmp_path).compile(project))
+
+    assert prepared == [((64, 36), "cover", 1.12)]
+    assert layer.input_args == ["-i", str(tmp_path / "prepared.jpg")]
+    assert layer.filters[:2] == ["format=yuv420p", "loop=loop=19:size=1"]
+    assert layer.filters[3].startswith("perspective=") and "eval=frame" in layer.filters[3]
+    assert layer.filters[4] == "scale=64:36:flags=bilinear" and layer.opaque
+
+
+def test_renditions_share_one_composite_pass(tmp_path):
+    project = VideoProject(name="t", width=64, height=36, duration=1, renditions=[
+        {"name": "18p"}, {"name": "tall", "height": 24},
+    ], visuals=[{"type": "SVG", "svg": RED}])
+    assert [r.size(36, 64) for r in project.renditions] == [(18, 32), (14, 24)]
+    output = tmp_path / "out.mp4"
+    renderer = compositor(tmp_path)
+
+    layers = asyncio.run(renderer.compile(project))
+    cmd = renderer.build_command(project, layers, None, str(output))
+    assert cmd.count("-filter_complex") == 1 and "split=3" in cmd[cmd.index("-filter_complex") + 1]
+
+    asyncio.run(renderer.render(project, str(output)))
+    paths = renderer.rendition_paths(project, str(output))
+    for name, size in (("18p", (32, 18)), ("tall", (42, 24))):
+        frame = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", paths[name], "-frames:v", "1", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"],
+            capture_output=True, check=True
+        ).stdout
+        assert len(frame) == size[0] * size[1] * 3 and frame[0] > 200
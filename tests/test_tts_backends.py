@@ -0,0 +1,61 @@
+import asyncio
+import time
+import wave
+
+from src.processors.tts_backends import LocalTTSBackend
+from src.processors.voice_generator import VoiceGenerator
+
+TEXT = "Hello there, this is a test. Short words and punctuation!"
+
+
+def test_local_alignment_is_deterministic_and_monotonic():
+    backend = LocalTTSBackend(latency=0)
+    first = backend.build_alignment(TEXT)
+    assert first == backend.build_alignment(TEXT)
+    assert first["characters"] == list(TEXT)
+    starts = first["character_start_times_seconds"]
+    ends = first["character_end_times_seconds"]
+    assert all(s < e for s, e in zip(starts, ends))
+    assert all(a <= b for a, b in zip(starts, starts[1:]))
+
+
+def test_local_backend_word_timestamps(tmp_path):
+    generator = VoiceGenerator(backend=LocalTTSBackend(latency=0))
+    audio_path, words = asyncio.run(
+        generator.generate_with_timestamps(TEXT, output_path=str(tmp_path / "speech.wav"))
+    )
+
+    assert words["words"] == TEXT.split()
+    # Sentence-ending punctuation leaves a longer gap before the next word
+    gaps = [s - e for s, e in zip(words["start_times"][1:], words["end_times"])]
+    assert gaps[words["words"].index("test.")] > gaps[0]
+
+    with wave.open(audio_path) as wav:
+        duration = wav.getnframes() / wav.getframerate()
+    assert duration >= words["end_times"][-1]
+
+
+def test_voices_are_synthesized_concurrently_and_placed_on_the_timeline(tmp_path):
+    from src.processors.audio_processor import AudioProcessor
+    from src.processors.video_engine import VideoEngine
+    from src.schemas import Voice
+
+    backend = LocalTTSBackend(latency=0.4)
+    engine = VideoEngine(voice_generator=VoiceGenerator(backend=backend))
+    voices = [
+        Voice(text="First line here.", voice_id="alice"),
+        Voice(text="Second line.", voice_id="bob", videoBegin=3.0, volume=0.5),
+    ]
+
+    began = time.perf_counter()
+    audio_path, words = asyncio.run(engine._synthesize_voices(voices, tmp_path))
+    elapsed = time.perf_counter() - began
+
+    assert elapsed < 0.8  # two 0.4 s requests at once, not one after the other
+    assert words["words"] == ["First", "line", "here.", "Second", "line."]
+    second = backend.build_alignment("Second line.")["character_start_times_seconds"][0]
+    assert words["start_times"][3] == 3.0 + second
+    assert {p.name for p in tmp_path.iterdir()} == {"voice_0.mp3", "voice_1.mp3", "speech.mp3"}
+    # The mix runs until the later take ends: 3 s offset + its speech + 0.5 s tail
+    duration = len(asyncio.run(AudioProcessor.decode_pcm(audio_path, cache_dir=tmp_path / "pcm"))) / AudioProcessor.SAMPLE_RATE
+    assert 3.5 < duration < 5.0
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import shutil
+
+import pytest
+
+from src.processors.zvid_pool import ZVID_DIR, ZvidPool, ZvidRenderError
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+# Stand-in for the zvid package: reports progress and writes a placeholder file
+FAKE_ZVID = """
+import fs from "fs";
+import path from "path";
+export default async function renderVideo(project, outputDir, onProgress) {
+    if (project.fail) throw new Error("boom");
+    console.log("zvid chatter that must not reach the protocol channel");
+    onProgress(50);
+    onProgress(100);
+    fs.writeFileSync(path.join(outputDir, `${project.name}.mp4`), String(process.pid));
+}
+"""
+
+
+@pytest.fixture
+def worker_script(tmp_path):
+    shutil.copy(ZVID_DIR / "render-worker.js", tmp_path / "render-worker.js")
+    (tmp_path / "package.json").write_text(json.dumps({"type": "module"}))
+    package = tmp_path / "node_modules" / "zvid"
+    package.mkdir(parents=True)
+    (package / "package.json").write_text(json.dumps({"name": "zvid", "type": "module", "main": "index.js"}))
+    (package / "index.js").write_text(FAKE_ZVID)
+    return tmp_path / "render-worker.js"
+
+
+def test_pool_reuses_and_recycles_workers(worker_script, tmp_path):
+    async def scenario():
+        pool = ZvidPool(size=1, max_jobs=2, script=worker_script)
+        progress = []
+        outputs = []
+        for i in range(3):
+            outputs.append(await pool.render({"name": f"v{i}"}, str(tmp_path / "out"), progress.append))
+        await pool.close()
+        return progress, outputs
+
+    progress, outputs = asyncio.run(scenario())
+    assert progress == [50, 100] * 3
+    pids = [open(path).read() for path in outputs]
+    # Two jobs on the first worker, then a fresh one
+    assert pids[0] == pids[1] != pids[2]
+
+
+def test_failed_render_raises_and_replaces_worker(worker_script, tmp_path):
+    async def scenario():
+        pool = ZvidPool(size=1, script=worker_script)
+        with pytest.raises(ZvidRenderError, match="boom"):
+            await pool.render({"name": "bad", "fail": True}, str(tmp_path))
+        output = await pool.render({"name": "good"}, str(tmp_path))
+        await pool.close()
+        return output
+
+    assert open(asyncio.run(scenario())).read()
@@ -0,0 +1,67 @@
+import renderVideo from "zvid";
+import fs from "fs";
+import path from "path";
+import readline from "readline";
+
+// Long-lived renderer for the Python pool (src/processors/zvid_pool.py).
+//
+// Speaks newline-delimited JSON-RPC 2.0 on stdin/stdout:
+//   -> {"jsonrpc":"2.0","id":1,"method":"render","params":{"project":{...},"outputDir":"..."}}
+//   <- {"jsonrpc":"2.0","method":"progress","params":{"id":1,"progress":42}}   (PROGRESS: updates)
+//   <- {"jsonrpc":"2.0","id":1,"result":{"output":"...","rss":123456789}}
+// Other methods: "ping" (readiness) and "shutdown".
+// Jobs are handled one at a time; the pool never sends a second request early.
+// Exits when stdin closes, so workers never outlive the Python process.
+
+// stdout is reserved for the protocol; route zvid's own logging to stderr
+console.log = (...args) => console.error(...args);
+console.info = console.log;
+console.debug = console.log;
+
+function send(message) {
+    process.stdout.write(JSON.stringify({ jsonrpc: "2.0", ...message }) + "\n");
+}
+
+async function render(id, { project, outputDir }) {
+    fs.mkdirSync(outputDir, { recursive: true });
+    await renderVideo(project, outputDir, (progress) => {
+        send({ method: "progress", params: { id, progress: Math.round(progress) } });
+    });
+    return { output: path.join(outputDir, `${project.name}.mp4`) };
+}
+
+async function handle(request) {
+    const { id, method, params } = request;
+    try {
+        let result;
+        if (method === "render") {
+            result = await render(id, params);
+        } else if (method === "ping") {
+            result = {};
+        } else if (method === "shutdown") {
+            send({ id, result: {} });
+            process.exit(0);
+        } else {
+            send({ id, error: { code: -32601, message: `Unknown method: ${method}` } });
+            return;
+        }
+        send({ id, result: { ...result, rss: process.memoryUsage().rss } });
+    } catch (error) {
+        send({ id, error: { code: 1, message: error.message } });
+    }
+}
+
+const lines = readline.createInterface({ input: process.stdin });
+let chain = Promise.resolve();
+lines.on("line", (line) => {
+    if (!line.trim()) return;
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        send({ id: null, error: { code: -32700, message: "Parse error" } });
+        return;
+    }
+    chain = chain.then(() => handle(request));
+});
+lines.on("close", () => chain.then(() => process.exit(0)));